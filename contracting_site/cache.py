@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import pickle
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.base import BaseCache
+from django.utils.functional import cached_property
+
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    A bounded in-process LRU in front of a shared cache alias.
+
+    Reads are served from the local tier for at most ``LOCAL_TIMEOUT``
+    seconds. Every write through this backend also stores a random version
+    stamp for the key in the shared tier; a local entry remembers the stamp
+    it was filled with and, once it is older than ``BROADCAST_INTERVAL``,
+    re-reads the stamp and is dropped if another process has changed it.
+    Stamps are plain ``set``s of one small key each, so concurrent writers
+    never overwrite each other's invalidations. Counters (``add``/``incr``)
+    always go to the shared tier and are not stamped, so a counter read through
+    ``get`` elsewhere may lag by up to ``LOCAL_TIMEOUT``.
+
+    OPTIONS:
+        SHARED: alias of the shared cache (default "shared")
+        LOCAL_MAX_ENTRIES: local LRU capacity (default 1000)
+        LOCAL_TIMEOUT: local entry lifetime in seconds (default 5)
+        BROADCAST_INTERVAL: seconds a local entry is served before its
+            stamp is checked again (default 1)
+    """
+
+    stamp_prefix = "tiered-cache:stamp:"
+
+    def __init__(self, location: str, params: dict[str, Any]):
+        super().__init__(params)
+        options = params.get("OPTIONS") or {}
+        self._shared_alias = str(options.get("SHARED") or location or "shared")
+        self._max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+        self._broadcast_interval = float(options.get("BROADCAST_INTERVAL", 1))
+        # key -> (expires, checked at, stamp, pickled value)
+        self._local: OrderedDict[str, tuple[float, float, str | None, bytes]] = (
+            OrderedDict()
+        )
+        self._lock = threading.RLock()
+
+    @cached_property
+    def shared(self) -> BaseCache:
+        return caches[self._shared_alias]
+
+    # Version stamps
+
+    def _stamp_key(self, local_key: str) -> str:
+        digest = hashlib.md5(local_key.encode(), usedforsecurity=False).hexdigest()
+        return self.stamp_prefix + digest
+
+    def _read_stamp(self, local_key: str) -> str | None:
+        return self.shared.get(self._stamp_key(local_key))
+
+    def _broadcast(self, local_keys: list[str], timeout: Any = None) -> dict[str, str]:
+        # Written after the value, so a reader that sees the new stamp also
+        # sees the new value.
+        stamps = {self._stamp_key(k): secrets.token_hex(8) for k in local_keys}
+        if stamps:
+            self.shared.set_many(stamps, timeout=timeout)
+        return {k: stamps[self._stamp_key(k)] for k in local_keys}
+
+    # Local tier
+
+    def _local_get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires, checked_at, stamp, payload = entry
+            now = time.monotonic()
+            if expires <= now:
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+        if now - checked_at >= self._broadcast_interval:
+            if self._read_stamp(key) != stamp:
+                self._local_delete(key)
+                return _MISSING
+            with self._lock:
+                if self._local.get(key) is entry:
+                    self._local[key] = (expires, now, stamp, payload)
+        return pickle.loads(payload)
+
+    def _local_set(self, key: str, value: Any, timeout: Any, stamp: str | None) -> None:
+        if self._max_entries <= 0:
+            return
+        ttl = self._local_timeout
+        if timeout is not None and timeout is not DEFAULT_TIMEOUT:
+            ttl = min(ttl, float(timeout))
+        if ttl <= 0:
+            self._local_delete(key)
+            return
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        now = time.monotonic()
+        with self._lock:
+            self._local[key] = (now + ttl, now, stamp, payload)
+            self._local.move_to_end(key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key: str) -> None:
+        with self._lock:
+            self._local.pop(key, None)
+
+    # Cache API
+
+    def get(self, key: str, default: Any = None, version: int | None = None) -> Any:
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self._local_get(local_key)
+        if value is not _MISSING:
+            return value
+        # Stamp first, value second: the reverse of a writer's order.
+        stamp = self._read_stamp(local_key)
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        if stamp is not None:
+            # Unstamped values (written before this backend, or by another
+            # one) are not kept locally: nothing would announce a change.
+            self._local_set(local_key, value, None, stamp)
+        return value
+
+    def set(
+        self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None
+    ) -> None:
+        local_key = self.make_and_validate_key(key, version=version)
+        timeout = self._shared_timeout(timeout)
+        self.shared.set(key, value, timeout=timeout, version=version)
+        stamps = self._broadcast([local_key], timeout)
+        self._local_set(local_key, value, timeout, stamps[local_key])
+
+    def add(
+        self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None
+    ) -> bool:
+        local_key = self.make_and_validate_key(key, version=version)
+        added = self.shared.add(key, value, timeout=self._shared_timeout(timeout), version=version)
+        if added:
+            self._local_delete(local_key)
+        return added
+
+    def touch(self, key: str, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> bool:
+        return self.shared.touch(key, timeout=self._shared_timeout(timeout), version=version)
+
+    def delete(self, key: str, version: int | None = None) -> bool:
+        local_key = self.make_and_validate_key(key, version=version)
+        self._local_delete(local_key)
+        deleted = self.shared.delete(key, version=version)
+        self._broadcast([local_key], self.default_timeout)
+        return deleted
+
+    def has_key(self, key: str, version: int | None = None) -> bool:
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._local_get(local_key) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key: str, delta: int = 1, version: int | None = None) -> int:
+        local_key = self.make_and_validate_key(key, version=version)
+        value = self.shared.incr(key, delta, version=version)
+        self._local_delete(local_key)
+        return value
+
+    def set_many(
+        self, data: dict[str, Any], timeout: Any = DEFAULT_TIMEOUT, version: int | None = None
+    ) -> list[str]:
+        timeout = self._shared_timeout(timeout)
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        local_keys = {key: self.make_and_validate_key(key, version=version) for key in data}
+        stamps = self._broadcast(list(local_keys.values()), timeout)
+        for key, value in data.items():
+            local_key = local_keys[key]
+            if key in failed:
+                self._local_delete(local_key)
+            else:
+                self._local_set(local_key, value, timeout, stamps[local_key])
+        return failed
+
+    def delete_many(self, keys: Any, version: int | None = None) -> None:
+        local_keys = [self.make_and_validate_key(k, version=version) for k in keys]
+        for local_key in local_keys:
+            self._local_delete(local_key)
+        self.shared.delete_many(keys, version=version)
+        self._broadcast(local_keys, self.default_timeout)
+
+    def clear(self) -> None:
+        # Clearing the shared tier drops every stamp too, which invalidates
+        # the other processes' local entries on their next check.
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs: Any) -> None:
+        self.shared.close(**kwargs)
+
+    def _shared_timeout(self, timeout: Any) -> Any:
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
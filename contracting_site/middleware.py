@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.http import HttpResponseNotFound
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import SimpleLazyObject
 
 
 class BlockStaticDirectoryMiddleware:
@@ -14,3 +16,44 @@ class BlockStaticDirectoryMiddleware:
         if static_url and path.startswith(static_url) and path.endswith("/"):
             return HttpResponseNotFound()
         return self.get_response(request)
+
+
+class PrincipalMiddleware:
+    """
+    Attach ``request.principal``: the user's groups, role and linked worker,
+    resolved lazily with a single query the first time a view needs them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from website.principal import load_principal
+
+        request.principal = SimpleLazyObject(
+            lambda: load_principal(getattr(request, "user", None))
+        )
+        return self.get_response(request)
+
+
+class ApiEnvelopeMiddleware:
+    """
+    Let API clients opt into the single ``{"ok", "result"}`` envelope with
+    an ``X-Api-Envelope: single`` request header.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from website import api_json
+
+        if not (getattr(request, "path_info", "") or "").startswith("/api/"):
+            return self.get_response(request)
+        token = api_json.activate(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            api_json.deactivate(token)
+        patch_vary_headers(response, (api_json.ENVELOPE_HEADER,))
+        return response
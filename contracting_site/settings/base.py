@@ -71,6 +71,8 @@ MIDDLEWARE = [
     # Security
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "contracting_site.middleware.PrincipalMiddleware",
+    "contracting_site.middleware.ApiEnvelopeMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     # CMS functionality
     "wagtail.contrib.redirects.middleware.RedirectMiddleware",
@@ -242,3 +244,56 @@ TAGGIT_CASE_INSENSITIVE = True
 # Sets default for primary key IDs
 # See https://docs.djangoproject.com/en/5.2/ref/models/fields/#bigautofield
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Ops
+
+# How often each process checks the shared version stamp of the ops
+# permission rules table before trusting its in-memory copy.
+OPS_PERMISSION_RULES_RECHECK_SECONDS = float(
+    _env("OPS_PERMISSION_RULES_RECHECK_SECONDS", "2") or "2"
+)
+
+
+# Rate limiting
+# BACKEND: "sqlite" (node-local file shared by all workers), "redis" (needs the
+# redis package) or "memory" (single process, development only).
+# ALGORITHM: "token_bucket" or "sliding_log".
+
+RATE_LIMIT = {
+    "BACKEND": _env("RATE_LIMIT_BACKEND", "sqlite"),
+    "ALGORITHM": _env("RATE_LIMIT_ALGORITHM", "token_bucket"),
+    "PATH": _env("RATE_LIMIT_DB_PATH", str(BASE_DIR / "cache" / "ratelimit.sqlite3")),
+    "URL": _env("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"),
+}
+
+
+# Public site API
+
+# Lifetime of the cached /api/site/* snapshots. Content edits invalidate them
+# immediately through model signals; this only bounds how long unused
+# snapshots linger in the cache.
+SITE_API_SNAPSHOT_TIMEOUT = int(_env("SITE_API_SNAPSHOT_TIMEOUT", "3600") or "3600")
+
+
+# API responses
+# API_JSON_ENCODER: "auto" (orjson when installed, else the stdlib encoder),
+# "orjson", "stdlib" or "django" (DjangoJSONEncoder, ASCII-escaped).
+API_JSON_ENCODER = _env("API_JSON_ENCODER", "auto")
+
+
+# Ops analytics pivots (api/admin/ops/analytics/pivot)
+# OPS_ANALYTICS_ENGINE: "auto" (numpy when installed, else plain Python),
+# "numpy" or "python". Each web worker refreshes its in-memory copy of a
+# dataset at most every OPS_ANALYTICS_REFRESH_SECONDS.
+OPS_ANALYTICS_ENGINE = _env("OPS_ANALYTICS_ENGINE", "auto")
+OPS_ANALYTICS_REFRESH_SECONDS = float(_env("OPS_ANALYTICS_REFRESH_SECONDS", "10") or "10")
+
+
+# Background ops jobs (python manage.py run_jobs)
+# A running job whose worker has not sent a heartbeat for OPS_JOBS_STALE_SECONDS
+# is requeued; export files are kept for OPS_JOBS_OUTPUT_TTL seconds.
+OPS_JOBS_WORKERS = int(_env("OPS_JOBS_WORKERS", "2") or "2")
+OPS_JOBS_STALE_SECONDS = int(_env("OPS_JOBS_STALE_SECONDS", "300") or "300")
+OPS_JOBS_OUTPUT_TTL = int(_env("OPS_JOBS_OUTPUT_TTL", "86400") or "86400")
+OPS_JOBS_OUTPUT_DIR = _env("OPS_JOBS_OUTPUT_DIR", str(BASE_DIR / "cache" / "jobs"))
@@ -56,13 +56,41 @@ MANAGERS = ADMINS
 # Email address used to send error messages to ADMINS.
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
+# The default cache keeps a small in-process LRU in front of the file cache
+# shared by all gunicorn workers. Compare with:
+#   python manage.py bench_cache
 CACHES = {
     "default": {
+        "BACKEND": "contracting_site.cache.TieredCache",
+        "KEY_PREFIX": "coderedcms",
+        "TIMEOUT": 14400,  # in seconds
+        "OPTIONS": {
+            "SHARED": "shared",
+            "LOCAL_MAX_ENTRIES": int(_env("CACHE_LOCAL_MAX_ENTRIES", "1000") or "1000"),
+            "LOCAL_TIMEOUT": float(_env("CACHE_LOCAL_TIMEOUT", "5") or "5"),
+            "BROADCAST_INTERVAL": float(_env("CACHE_BROADCAST_INTERVAL", "1") or "1"),
+        },
+    },
+    "shared": {
         "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
         "LOCATION": BASE_DIR / "cache",  # noqa
         "KEY_PREFIX": "coderedcms",
         "TIMEOUT": 14400,  # in seconds
-    }
+    },
+}
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedStaticFilesStorage",
+    },
 }
 
-STATICFILES_STORAGE = "whitenoise.storage.CompressedStaticFilesStorage"
+# The SPA bundle is already content-hashed by Vite, so it can be cached for
+# good; everything else keeps WhiteNoise's short max-age. WhiteNoise treats a
+# string here as a regex matched against the file URL.
+WHITENOISE_IMMUTABLE_FILE_TEST = (
+    r"^" + STATIC_URL + r"website/samarqand_spa/assets/.+-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$"  # noqa: F405
+)
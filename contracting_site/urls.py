@@ -10,9 +10,13 @@ from django.urls import re_path
 from wagtail.documents import urls as wagtaildocs_urls
 
 from website import api_views
+from website.spa_shell import shell_response
 
 
 def spa_shell(request, *args, **kwargs):
+    response = shell_response(request)
+    if response is not None:
+        return response
     return render(request, "coderedcms/pages/spa_shell.html")
 
 
@@ -272,10 +276,26 @@ urlpatterns = [
     path("api/admin/ops/workers/<int:worker_id>/update", api_views.admin_ops_workers_update),
     path("api/admin/ops/workers/<int:worker_id>/delete", api_views.admin_ops_workers_delete),
     path("api/admin/ops/attendance", api_views.admin_ops_attendance),
+    path("api/admin/ops/attendance/matrix", api_views.admin_ops_attendance_matrix),
     path("api/admin/ops/attendance/create", api_views.admin_ops_attendance_create),
+    path("api/admin/ops/attendance/grid", api_views.admin_ops_attendance_grid),
+    path("api/admin/ops/attendance/range/submit", api_views.admin_ops_attendance_range_submit),
+    path("api/admin/ops/attendance/range/approve", api_views.admin_ops_attendance_range_approve),
+    path("api/admin/ops/attendance/range/lock", api_views.admin_ops_attendance_range_lock),
+    path("api/admin/ops/dashboard/project-days", api_views.admin_ops_dashboard_project_days),
+    path("api/admin/ops/dashboard/worker-months", api_views.admin_ops_dashboard_worker_months),
+    path("api/admin/ops/analytics/datasets", api_views.admin_ops_analytics_datasets),
+    path("api/admin/ops/analytics/pivot", api_views.admin_ops_analytics_pivot),
     path("api/admin/ops/timeclock/import", api_views.admin_ops_timeclock_import),
     path("api/admin/ops/timeclock/import-from-folder", api_views.admin_ops_timeclock_import_from_folder),
     path("api/admin/ops/timeclock/runs", api_views.admin_ops_timeclock_runs),
+    path("api/admin/ops/jobs", api_views.admin_ops_jobs),
+    path("api/admin/ops/jobs/enqueue", api_views.admin_ops_jobs_enqueue),
+    path("api/admin/ops/jobs/<int:job_id>", api_views.admin_ops_job),
+    path("api/admin/ops/jobs/<int:job_id>/cancel", api_views.admin_ops_job_cancel),
+    path("api/admin/ops/jobs/<int:job_id>/download", api_views.admin_ops_job_download),
+    path("api/admin/rate-limits", api_views.admin_rate_limits),
+    path("api/admin/rate-limits/reset", api_views.admin_rate_limits_reset),
     path("api/admin/ops/audit-logs", api_views.admin_ops_audit_logs),
     path("api/admin/ops/permission-rules", api_views.admin_ops_permission_rules),
     path("api/admin/ops/permission-rules/update", api_views.admin_ops_permission_rules_update),
@@ -286,6 +306,8 @@ urlpatterns = [
     path("api/admin/ops/attendance/<int:item_id>/lock", api_views.admin_ops_attendance_lock),
     path("api/admin/ops/payroll", api_views.admin_ops_payroll),
     path("api/admin/ops/payroll/generate-from-attendance", api_views.admin_ops_payroll_generate_from_attendance),
+    path("api/admin/ops/payroll/dirty", api_views.admin_ops_payroll_dirty),
+    path("api/admin/ops/payroll/close", api_views.admin_ops_payroll_close),
     path("api/admin/ops/payroll/create", api_views.admin_ops_payroll_create),
     path("api/admin/ops/payroll/<int:entry_id>/update", api_views.admin_ops_payroll_update),
     path("api/admin/ops/payroll/<int:entry_id>/delete", api_views.admin_ops_payroll_delete),
@@ -308,6 +330,7 @@ urlpatterns = [
     path("api/site/team", api_views.site_team),
     path("api/site/testimonials", api_views.site_testimonials),
     path("api/site/home-sections", api_views.site_home_sections),
+    path("api/site/bootstrap", api_views.site_bootstrap),
     path("@vite/client", lambda request: HttpResponse("", content_type="application/javascript")),
     path("admin/", spa_shell),
     path("services/", spa_shell),
@@ -102,8 +102,11 @@ export function apiUrl(input: string): string {
 }
 
 export function apiFetch(input: string, init?: RequestInit): Promise<Response> {
+  const headers = new Headers(init?.headers);
+  if (!headers.has("X-Api-Envelope")) headers.set("X-Api-Envelope", "single");
   return fetch(apiUrl(input), {
     ...init,
+    headers,
     credentials: init?.credentials || "same-origin",
   });
 }
@@ -124,6 +127,20 @@ async function fetchJson<T>(url: string): Promise<T> {
   return payload.result;
 }
 
+// Ops lists are keyset-paginated; follow nextCursor until the last page.
+async function fetchAllPages<T>(url: string): Promise<T[]> {
+  const items: T[] = [];
+  let cursor = "";
+  do {
+    const sep = url.includes("?") ? "&" : "?";
+    const pageUrl = cursor ? `${url}${sep}cursor=${encodeURIComponent(cursor)}` : url;
+    const data = await fetchJson<{ items: T[]; nextCursor?: string }>(pageUrl);
+    items.push(...data.items);
+    cursor = data.nextCursor || "";
+  } while (cursor);
+  return items;
+}
+
 async function readApiResponse<T>(res: Response): Promise<ApiResponse<T> | null> {
   try {
     return (await res.json()) as ApiResponse<T>;
@@ -147,8 +164,46 @@ function getCookie(name: string): string | null {
   return null;
 }
 
+type SiteBootstrapPayload = {
+  company: CompanyPayload;
+  config: SiteConfigPayload;
+  home: HomeSettingsPayload;
+  homeSections: HomeSectionPayload;
+  services: { items: ServicePayload[] };
+  projects: { items: ProjectPayload[] };
+  team: { items: TeamMemberPayload[] };
+  testimonials: { items: TestimonialPayload[] };
+};
+
+let _siteBootstrap: Promise<SiteBootstrapPayload> | null = null;
+
+function loadSiteBootstrap(): Promise<SiteBootstrapPayload> {
+  if (!_siteBootstrap) {
+    _siteBootstrap = fetchJson<SiteBootstrapPayload>("/api/site/bootstrap");
+    _siteBootstrap.catch(() => {
+      _siteBootstrap = null;
+    });
+  }
+  return _siteBootstrap;
+}
+
+// Reads one section from the shared bootstrap payload, so the first paint
+// costs a single request; falls back to the per-section endpoint on error.
+async function fetchSiteSection<K extends keyof SiteBootstrapPayload>(
+  key: K,
+  url: string,
+): Promise<SiteBootstrapPayload[K]> {
+  try {
+    const data = await loadSiteBootstrap();
+    if (data && data[key]) return data[key];
+  } catch {
+    // fall through
+  }
+  return fetchJson<SiteBootstrapPayload[K]>(url);
+}
+
 export async function fetchCompany(): Promise<CompanyPayload> {
-  return fetchJson<CompanyPayload>("/api/site/company");
+  return fetchSiteSection("company", "/api/site/company");
 }
 
 export type SiteConfigPayload = {
@@ -176,7 +231,7 @@ export type SiteConfigPayload = {
 };
 
 export async function fetchSiteConfig(): Promise<SiteConfigPayload> {
-  return fetchJson<SiteConfigPayload>("/api/site/config");
+  return fetchSiteSection("config", "/api/site/config");
 }
 
 export async function fetchAuthAccess(): Promise<{ canUseRestrictedTools: boolean }> {
@@ -1259,8 +1314,7 @@ export type AdminOpsClient = {
 };
 
 export async function fetchAdminOpsClients(): Promise<AdminOpsClient[]> {
-  const data = await fetchJson<{ items: AdminOpsClient[] }>("/api/admin/ops/clients");
-  return data.items;
+  return fetchAllPages<AdminOpsClient>("/api/admin/ops/clients");
 }
 
 export async function createAdminOpsClient(payload: {
@@ -1325,8 +1379,7 @@ export type AdminOpsSupplier = {
 };
 
 export async function fetchAdminOpsSuppliers(): Promise<AdminOpsSupplier[]> {
-  const data = await fetchJson<{ items: AdminOpsSupplier[] }>("/api/admin/ops/suppliers");
-  return data.items;
+  return fetchAllPages<AdminOpsSupplier>("/api/admin/ops/suppliers");
 }
 
 export async function createAdminOpsSupplier(payload: {
@@ -1398,8 +1451,7 @@ export type AdminOpsContract = {
 };
 
 export async function fetchAdminOpsContracts(): Promise<AdminOpsContract[]> {
-  const data = await fetchJson<{ items: AdminOpsContract[] }>("/api/admin/ops/contracts");
-  return data.items;
+  return fetchAllPages<AdminOpsContract>("/api/admin/ops/contracts");
 }
 
 export type AdminOpsContractAddendum = {
@@ -1584,8 +1636,7 @@ export type AdminOpsPurchaseOrder = {
 };
 
 export async function fetchAdminOpsPurchaseOrders(): Promise<AdminOpsPurchaseOrder[]> {
-  const data = await fetchJson<{ items: AdminOpsPurchaseOrder[] }>("/api/admin/ops/purchase-orders");
-  return data.items;
+  return fetchAllPages<AdminOpsPurchaseOrder>("/api/admin/ops/purchase-orders");
 }
 
 export async function createAdminOpsPurchaseOrder(payload: {
@@ -1654,8 +1705,7 @@ export type AdminOpsInventoryItem = {
 };
 
 export async function fetchAdminOpsInventoryItems(): Promise<AdminOpsInventoryItem[]> {
-  const data = await fetchJson<{ items: AdminOpsInventoryItem[] }>("/api/admin/ops/inventory/items");
-  return data.items;
+  return fetchAllPages<AdminOpsInventoryItem>("/api/admin/ops/inventory/items");
 }
 
 export async function createAdminOpsInventoryItem(payload: {
@@ -1729,8 +1779,7 @@ export async function fetchAdminOpsInventoryTransactions(input?: {
   itemId?: number;
 }): Promise<AdminOpsInventoryTransaction[]> {
   const qs = input?.itemId ? `?itemId=${encodeURIComponent(String(input.itemId))}` : "";
-  const data = await fetchJson<{ items: AdminOpsInventoryTransaction[] }>(`/api/admin/ops/inventory/transactions${qs}`);
-  return data.items;
+  return fetchAllPages<AdminOpsInventoryTransaction>(`/api/admin/ops/inventory/transactions${qs}`);
 }
 
 export async function createAdminOpsInventoryTransaction(payload: {
@@ -1770,8 +1819,7 @@ export type AdminOpsWorker = {
 };
 
 export async function fetchAdminOpsWorkers(): Promise<AdminOpsWorker[]> {
-  const data = await fetchJson<{ items: AdminOpsWorker[] }>("/api/admin/ops/workers");
-  return data.items;
+  return fetchAllPages<AdminOpsWorker>("/api/admin/ops/workers");
 }
 
 export async function createAdminOpsWorker(payload: {
@@ -1857,8 +1905,36 @@ export async function fetchAdminOpsAttendance(input?: {
   if (input?.year) qsParts.push(`year=${encodeURIComponent(String(input.year))}`);
   if (input?.month) qsParts.push(`month=${encodeURIComponent(String(input.month))}`);
   const qs = qsParts.length ? `?${qsParts.join("&")}` : "";
-  const data = await fetchJson<{ items: AdminOpsAttendance[] }>(`/api/admin/ops/attendance${qs}`);
-  return data.items;
+  return fetchAllPages<AdminOpsAttendance>(`/api/admin/ops/attendance${qs}`);
+}
+
+// Monthly sheet: workers x days. Cell codes in status/state are 1-based
+// indexes into statuses/states and project into projects; 0 means empty.
+export type AdminOpsAttendanceMatrix = {
+  year: number;
+  month: number;
+  days: number;
+  statuses: string[];
+  states: string[];
+  workers: { id: number; name: string }[];
+  projects: { id: number; title: string }[];
+  id: number[][];
+  status: number[][];
+  state: number[][];
+  hours: (number | null)[][];
+  project: number[][];
+};
+
+export async function fetchAdminOpsAttendanceMatrix(input: {
+  year: number;
+  month: number;
+  workerId?: number;
+  projectId?: number;
+}): Promise<AdminOpsAttendanceMatrix> {
+  const qsParts = [`year=${encodeURIComponent(String(input.year))}`, `month=${encodeURIComponent(String(input.month))}`];
+  if (input.workerId) qsParts.push(`workerId=${encodeURIComponent(String(input.workerId))}`);
+  if (input.projectId) qsParts.push(`projectId=${encodeURIComponent(String(input.projectId))}`);
+  return fetchJson<AdminOpsAttendanceMatrix>(`/api/admin/ops/attendance/matrix?${qsParts.join("&")}`);
 }
 
 export async function createAdminOpsAttendance(payload: {
@@ -1880,6 +1956,53 @@ export async function createAdminOpsAttendance(payload: {
   return { ok: true, id: data.result.id, created: data.result.created };
 }
 
+export type AdminOpsAttendanceGridCell = {
+  workerId: number;
+  date?: string;
+  status?: string;
+  hours?: number | string | null;
+  projectId?: number | null;
+  notes?: string;
+};
+
+export type AdminOpsAttendanceGridResult = {
+  dryRun: boolean;
+  createdCount: number;
+  updatedCount: number;
+  unchangedCount: number;
+  workerCount: number;
+  dateFrom: string;
+  dateTo: string;
+  results: { index: number; id: number; workerId: number; date: string; status: string }[];
+};
+
+// A whole crew-day (or week) in one request. "date", "projectId" and
+// "status" apply to cells that leave them out. Nothing is written unless
+// every cell is valid; the failing cells come back in "errors".
+export async function saveAdminOpsAttendanceGrid(payload: {
+  cells: AdminOpsAttendanceGridCell[];
+  date?: string;
+  projectId?: number | null;
+  status?: string;
+  dryRun?: boolean;
+}): Promise<
+  | ({ ok: true } & AdminOpsAttendanceGridResult)
+  | { ok: false; error: string; errors?: { index: number; error: string }[] }
+> {
+  const res = await apiFetch("/api/admin/ops/attendance/grid", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify(payload),
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<AdminOpsAttendanceGridResult>(res);
+  if (!res.ok || !data || data.ok !== true) {
+    const details = data && data.ok === false ? (data.error.details as { errors?: { index: number; error: string }[] }) : undefined;
+    return { ok: false, error: readApiErrorCode(data), errors: details?.errors };
+  }
+  return { ok: true, ...data.result };
+}
+
 export type AdminOpsTimeclockImportItem = {
   workerId?: number;
   timeClockId?: string;
@@ -1923,6 +2046,86 @@ export async function importAdminOpsTimeclock(
   return { ok: true, ...data.result };
 }
 
+export async function importAdminOpsTimeclockPunchLog(
+  file: File,
+  input?: { dryRun?: boolean; defaultProjectId?: number | null },
+): Promise<{
+  ok: boolean;
+  dryRun?: boolean;
+  createdCount?: number;
+  updatedCount?: number;
+  errors?: unknown[];
+  results?: unknown[];
+  error?: string;
+}> {
+  const form = new FormData();
+  form.append("file", file);
+  form.append("dryRun", input?.dryRun ? "true" : "false");
+  if (input?.defaultProjectId) form.append("defaultProjectId", String(input.defaultProjectId));
+  const res = await apiFetch("/api/admin/ops/timeclock/import", {
+    method: "POST",
+    headers: { "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: form,
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<{
+    dryRun: boolean;
+    createdCount: number;
+    updatedCount: number;
+    errors: unknown[];
+    results: unknown[];
+  }>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  return { ok: true, ...data.result };
+}
+
+export type AdminOpsJob = {
+  id: number;
+  kind: string;
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled";
+  createdAt: string;
+  startedAt: string;
+  finishedAt: string;
+  actorId: number;
+  params: Record<string, unknown>;
+  progress: Record<string, unknown>;
+  result: unknown;
+  error: string;
+  attempts: number;
+  cancelRequested: boolean;
+  downloadUrl: string;
+};
+
+export async function fetchAdminOpsJob(jobId: number): Promise<AdminOpsJob> {
+  const data = await fetchJson<{ job: AdminOpsJob }>(`/api/admin/ops/jobs/${jobId}`);
+  return data.job;
+}
+
+export async function cancelAdminOpsJob(jobId: number): Promise<{ ok: boolean; job?: AdminOpsJob; error?: string }> {
+  const res = await apiFetch(`/api/admin/ops/jobs/${jobId}/cancel`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify({}),
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<{ job: AdminOpsJob }>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  return { ok: true, job: data.result.job };
+}
+
+// Long ops actions are queued and run by the job worker; poll until done.
+async function awaitAdminOpsJob(res: Response): Promise<{ ok: boolean; job?: AdminOpsJob; error?: string }> {
+  const data = await readApiResponse<{ job: AdminOpsJob }>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  let job = data.result.job;
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+    job = await fetchAdminOpsJob(job.id);
+  }
+  if (job.status !== "succeeded") return { ok: false, job, error: job.error || job.status };
+  return { ok: true, job };
+}
+
 export async function importAdminOpsTimeclockFromFolder(input?: {
   dryRun?: boolean;
   defaultProjectId?: number | null;
@@ -1944,19 +2147,23 @@ export async function importAdminOpsTimeclockFromFolder(input?: {
       dryRun: Boolean(input?.dryRun),
       defaultProjectId: input?.defaultProjectId ?? null,
       limitFiles: input?.limitFiles ?? null,
+      async: true,
     }),
     credentials: "same-origin",
   });
-  const data = await readApiResponse<{
-    dryRun: boolean;
-    files: string[];
-    createdCount: number;
-    updatedCount: number;
-    errors: unknown[];
-    results: unknown[];
-  }>(res);
-  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
-  return { ok: true, ...data.result };
+  const done = await awaitAdminOpsJob(res);
+  if (!done.ok || !done.job) return { ok: false, error: done.error };
+  return {
+    ok: true,
+    ...(done.job.result as {
+      dryRun: boolean;
+      files: string[];
+      createdCount: number;
+      updatedCount: number;
+      errors: unknown[];
+      results: unknown[];
+    }),
+  };
 }
 
 export type AdminOpsTimeclockImportRun = {
@@ -2058,6 +2265,152 @@ export async function deleteAdminOpsAttendance(itemId: number): Promise<{ ok: bo
   return { ok: true };
 }
 
+export type AdminOpsAttendanceRangeResult = {
+  transition: "submit" | "approve" | "lock";
+  dryRun: boolean;
+  fromStates: string[];
+  toState: string;
+  byState: Record<string, number>;
+  matchedCount: number;
+  updatedCount: number;
+  totalCount: number;
+  dateFrom: string;
+  dateTo: string;
+  projectId: number;
+  workerIds: number[];
+};
+
+// Submit, approve or lock a whole month (or date range) in one call,
+// optionally narrowed to a project and/or workers.
+export async function transitionAdminOpsAttendanceRange(
+  transition: "submit" | "approve" | "lock",
+  input: {
+    year?: number;
+    month?: number;
+    dateFrom?: string;
+    dateTo?: string;
+    projectId?: number | null;
+    workerIds?: number[];
+    dryRun?: boolean;
+  },
+): Promise<({ ok: true } & AdminOpsAttendanceRangeResult) | { ok: false; error: string }> {
+  const res = await apiFetch(`/api/admin/ops/attendance/range/${transition}`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify(input),
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<AdminOpsAttendanceRangeResult>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  return { ok: true, ...data.result };
+}
+
+export type AdminOpsDashboardProjectDays = {
+  dateFrom: string;
+  dateTo: string;
+  projects: { id: number; title: string }[];
+  items: {
+    projectId: number;
+    date: string;
+    headcount: number;
+    present: number;
+    halfDay: number;
+    absent: number;
+    leave: number;
+    hours: number;
+  }[];
+};
+
+export async function fetchAdminOpsDashboardProjectDays(input?: {
+  dateFrom?: string;
+  dateTo?: string;
+  projectId?: number;
+}): Promise<AdminOpsDashboardProjectDays> {
+  const qsParts: string[] = [];
+  if (input?.dateFrom) qsParts.push(`dateFrom=${encodeURIComponent(input.dateFrom)}`);
+  if (input?.dateTo) qsParts.push(`dateTo=${encodeURIComponent(input.dateTo)}`);
+  if (input?.projectId) qsParts.push(`projectId=${encodeURIComponent(String(input.projectId))}`);
+  const qs = qsParts.length ? `?${qsParts.join("&")}` : "";
+  return fetchJson<AdminOpsDashboardProjectDays>(`/api/admin/ops/dashboard/project-days${qs}`);
+}
+
+export type AdminOpsDashboardWorkerMonth = {
+  workerId: number;
+  workerName: string;
+  year: number;
+  month: number;
+  present: number;
+  halfDay: number;
+  absent: number;
+  leave: number;
+  daysWorked: number;
+  hours: number;
+};
+
+export async function fetchAdminOpsDashboardWorkerMonths(input?: {
+  year?: number;
+  month?: number;
+  workerId?: number;
+}): Promise<AdminOpsDashboardWorkerMonth[]> {
+  const qsParts: string[] = [];
+  if (input?.year) qsParts.push(`year=${encodeURIComponent(String(input.year))}`);
+  if (input?.month) qsParts.push(`month=${encodeURIComponent(String(input.month))}`);
+  if (input?.workerId) qsParts.push(`workerId=${encodeURIComponent(String(input.workerId))}`);
+  const qs = qsParts.length ? `?${qsParts.join("&")}` : "";
+  return fetchAllPages<AdminOpsDashboardWorkerMonth>(`/api/admin/ops/dashboard/worker-months${qs}`);
+}
+
+export type AdminOpsAnalyticsDataset = {
+  name: string;
+  dimensions: string[];
+  measures: string[];
+  aggregates: string[];
+};
+
+export async function fetchAdminOpsAnalyticsDatasets(): Promise<{
+  items: AdminOpsAnalyticsDataset[];
+  engine: string;
+}> {
+  return fetchJson<{ items: AdminOpsAnalyticsDataset[]; engine: string }>("/api/admin/ops/analytics/datasets");
+}
+
+export type AdminOpsAnalyticsPivot = {
+  dataset: string;
+  groupBy: string[];
+  measures: string[];
+  engine: string;
+  rowCount: number;
+  truncated: boolean;
+  sourceRows: number;
+  rows: {
+    keys: Record<string, string | number | null>;
+    labels: Record<string, string>;
+    values: Record<string, number | null>;
+  }[];
+};
+
+// measures: "count" or "<sum|avg|min|max>:<measure>", e.g. "sum:hours".
+// filters: {dimension: value | values}, {year|quarter|month|day: label | labels}
+// and {date: {from, to}}.
+export async function runAdminOpsAnalyticsPivot(input: {
+  dataset: string;
+  groupBy?: string[];
+  measures?: string[];
+  filters?: Record<string, unknown>;
+  orderBy?: string;
+  limit?: number;
+}): Promise<({ ok: true } & AdminOpsAnalyticsPivot) | { ok: false; error: string }> {
+  const res = await apiFetch("/api/admin/ops/analytics/pivot", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify(input),
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<AdminOpsAnalyticsPivot>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  return { ok: true, ...data.result };
+}
+
 export type AdminOpsPayrollEntry = {
   id: number;
   workerId: number;
@@ -2080,21 +2433,93 @@ export async function fetchAdminOpsPayroll(input?: {
   if (input?.year) qsParts.push(`year=${encodeURIComponent(String(input.year))}`);
   if (input?.month) qsParts.push(`month=${encodeURIComponent(String(input.month))}`);
   const qs = qsParts.length ? `?${qsParts.join("&")}` : "";
-  const data = await fetchJson<{ items: AdminOpsPayrollEntry[] }>(`/api/admin/ops/payroll${qs}`);
-  return data.items;
+  return fetchAllPages<AdminOpsPayrollEntry>(`/api/admin/ops/payroll${qs}`);
+}
+
+export type AdminOpsPayrollDirtyPeriod = {
+  workerId: number;
+  workerName: string;
+  workerActive: boolean;
+  year: number;
+  month: number;
+  markedAt: string;
+  entryId: number;
+  entryStatus: string;
+};
+
+export async function fetchAdminOpsPayrollDirty(input?: {
+  workerId?: number;
+  year?: number;
+  month?: number;
+}): Promise<AdminOpsPayrollDirtyPeriod[]> {
+  const qsParts: string[] = [];
+  if (input?.workerId) qsParts.push(`workerId=${encodeURIComponent(String(input.workerId))}`);
+  if (input?.year) qsParts.push(`year=${encodeURIComponent(String(input.year))}`);
+  if (input?.month) qsParts.push(`month=${encodeURIComponent(String(input.month))}`);
+  const qs = qsParts.length ? `?${qsParts.join("&")}` : "";
+  return fetchAllPages<AdminOpsPayrollDirtyPeriod>(`/api/admin/ops/payroll/dirty${qs}`);
+}
+
+export type AdminOpsPayrollWorkerTotals = {
+  workerId: number;
+  workerName: string;
+  entryCount: number;
+  salary: number;
+  bonus: number;
+  advance: number;
+  deduction: number;
+  net: number;
+};
+
+export type AdminOpsPayrollCloseResult = {
+  year: number;
+  month: number;
+  dryRun: boolean;
+  markPaid: boolean;
+  blocked: boolean;
+  attendance: { byState: Record<string, number>; pendingCount: number; lockedCount: number };
+  generation?: { createdCount: number; updatedCount: number; skippedCount: number; errors: unknown[] };
+  entries?: { approvedCount: number; paidCount: number };
+  workers?: AdminOpsPayrollWorkerTotals[];
+  totals?: Omit<AdminOpsPayrollWorkerTotals, "workerId" | "workerName" | "entryCount">;
+};
+
+// Lock the month's approved attendance, regenerate draft salaries and
+// approve (optionally mark paid) the period's entries in one transaction.
+export async function closeAdminOpsPayrollPeriod(input: {
+  year: number;
+  month: number;
+  markPaid?: boolean;
+  allowPending?: boolean;
+  dryRun?: boolean;
+}): Promise<({ ok: true } & AdminOpsPayrollCloseResult) | { ok: false; error: string }> {
+  const res = await apiFetch("/api/admin/ops/payroll/close", {
+    method: "POST",
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify(input),
+    credentials: "same-origin",
+  });
+  const data = await readApiResponse<AdminOpsPayrollCloseResult>(res);
+  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
+  return { ok: true, ...data.result };
 }
 
 export async function generateAdminOpsPayrollFromAttendance(input: {
-  year: number | string;
-  month: number | string;
+  year?: number | string;
+  month?: number | string;
+  months?: number[] | "all";
   workerId?: number | null;
   dryRun?: boolean;
+  incremental?: boolean;
 }): Promise<{
   ok: boolean;
   dryRun?: boolean;
   year?: number;
   month?: number;
+  months?: number[];
   workerId?: number;
+  incremental?: boolean;
+  dirtyCount?: number;
   createdCount?: number;
   updatedCount?: number;
   skippedCount?: number;
@@ -2108,24 +2533,30 @@ export async function generateAdminOpsPayrollFromAttendance(input: {
     body: JSON.stringify({
       year: Number(input.year) || 0,
       month: Number(input.month) || 0,
+      months: input.months ?? null,
       workerId: input.workerId ?? null,
       dryRun: Boolean(input.dryRun),
+      incremental: Boolean(input.incremental),
+      async: true,
     }),
     credentials: "same-origin",
   });
-  const data = await readApiResponse<{
-    dryRun: boolean;
-    year: number;
-    month: number;
-    workerId: number;
-    createdCount: number;
-    updatedCount: number;
-    skippedCount: number;
-    errors: unknown[];
-    results: unknown[];
-  }>(res);
-  if (!res.ok || !data || data.ok !== true) return { ok: false, error: readApiErrorCode(data) };
-  return { ok: true, ...data.result };
+  const done = await awaitAdminOpsJob(res);
+  if (!done.ok || !done.job) return { ok: false, error: done.error };
+  return {
+    ok: true,
+    ...(done.job.result as {
+      dryRun: boolean;
+      year: number;
+      month: number;
+      workerId: number;
+      createdCount: number;
+      updatedCount: number;
+      skippedCount: number;
+      errors: unknown[];
+      results: unknown[];
+    }),
+  };
 }
 
 export async function createAdminOpsPayrollEntry(payload: {
@@ -2193,8 +2624,7 @@ export type AdminOpsEquipment = {
 };
 
 export async function fetchAdminOpsEquipment(): Promise<AdminOpsEquipment[]> {
-  const data = await fetchJson<{ items: AdminOpsEquipment[] }>("/api/admin/ops/equipment");
-  return data.items;
+  return fetchAllPages<AdminOpsEquipment>("/api/admin/ops/equipment");
 }
 
 export async function createAdminOpsEquipment(payload: {
@@ -2265,8 +2695,7 @@ export type AdminOpsAssignment = {
 };
 
 export async function fetchAdminOpsAssignments(): Promise<AdminOpsAssignment[]> {
-  const data = await fetchJson<{ items: AdminOpsAssignment[] }>("/api/admin/ops/assignments");
-  return data.items;
+  return fetchAllPages<AdminOpsAssignment>("/api/admin/ops/assignments");
 }
 
 export async function createAdminOpsAssignment(payload: {
@@ -2962,17 +3391,23 @@ export async function removeAdminCompanyDocument(itemId: number): Promise<{ ok:
 export async function downloadAdminBackup(): Promise<void> {
   const res = await apiFetch("/api/admin/backup/export", {
     method: "POST",
-    headers: { "X-CSRFToken": getCookie("csrftoken") || "" },
+    headers: { "Content-Type": "application/json", "X-CSRFToken": getCookie("csrftoken") || "" },
+    body: JSON.stringify({ async: true }),
     credentials: "same-origin",
   });
-  if (!res.ok) {
+  const done = await awaitAdminOpsJob(res);
+  if (!done.ok || !done.job?.downloadUrl) {
     throw new Error("export_failed");
   }
-  const blob = await res.blob();
+  const file = await apiFetch(done.job.downloadUrl);
+  if (!file.ok) {
+    throw new Error("export_failed");
+  }
+  const blob = await file.blob();
   const url = URL.createObjectURL(blob);
   const a = document.createElement("a");
   a.href = url;
-  a.download = "backup.json";
+  a.download = String((done.job.result as { filename?: string } | null)?.filename || "backup.json");
   a.click();
   URL.revokeObjectURL(url);
 }
@@ -3005,31 +3440,29 @@ export type HomeSettingsPayload = {
 };
 
 export async function fetchHomeSettings(): Promise<HomeSettingsPayload> {
-  return fetchJson<HomeSettingsPayload>("/api/site/home");
+  return fetchSiteSection("home", "/api/site/home");
 }
 
 export async function fetchServices(): Promise<ServicePayload[]> {
-  const data = await fetchJson<{ items: ServicePayload[] }>("/api/site/services");
+  const data = await fetchSiteSection("services", "/api/site/services");
   return data.items;
 }
 
 export async function fetchProjects(): Promise<ProjectPayload[]> {
-  const data = await fetchJson<{ items: ProjectPayload[] }>("/api/site/projects");
+  const data = await fetchSiteSection("projects", "/api/site/projects");
   return data.items;
 }
 
 export async function fetchTeam(): Promise<TeamMemberPayload[]> {
-  const data = await fetchJson<{ items: TeamMemberPayload[] }>("/api/site/team");
+  const data = await fetchSiteSection("team", "/api/site/team");
   return data.items;
 }
 
 export async function fetchTestimonials(): Promise<TestimonialPayload[]> {
-  const data = await fetchJson<{ items: TestimonialPayload[] }>(
-    "/api/site/testimonials",
-  );
+  const data = await fetchSiteSection("testimonials", "/api/site/testimonials");
   return data.items;
 }
 
 export async function fetchHomeSections(): Promise<HomeSectionPayload> {
-  return fetchJson<HomeSectionPayload>("/api/site/home-sections");
+  return fetchSiteSection("homeSections", "/api/site/home-sections");
 }
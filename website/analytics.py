@@ -0,0 +1,686 @@
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import date
+from datetime import timedelta
+from typing import Any
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from website.models import Client
+from website.models import ContractPayment
+from website.models import InventoryItem
+from website.models import InventoryTransaction
+from website.models import ProjectContract
+from website.models import ProjectPage
+from website.models import Worker
+from website.models import WorkerAttendance
+from website.models import WorkerPayrollEntry
+
+
+# Rows whose watermark is this close to the newest one seen are read again
+# on every refresh: a transaction that stamped updated_at before the last
+# refresh may only have committed after it.
+REFRESH_OVERLAP = timedelta(seconds=60)
+LOAD_CHUNK = 5000
+MAX_GROUP_BY = 3
+MAX_GROUPS = 10000
+DEFAULT_LIMIT = 1000
+AGGREGATES = ("sum", "avg", "min", "max")
+TIME_DIMENSIONS = ("year", "quarter", "month", "day")
+NO_PERIOD = -1
+
+
+class AnalyticsError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    model: type
+    # auto_now field the incremental refresh follows
+    watermark: str
+    # dimension -> values() path of its raw key
+    dims: dict[str, str]
+    # FK dimensions -> (model, label field), resolved per result
+    labels: dict[str, tuple[type, str]] = field(default_factory=dict)
+    # choice dimensions -> {value: label}
+    choices: dict[str, dict[str, str]] = field(default_factory=dict)
+    # measure -> values() path, or a tuple of paths multiplied together
+    measures: dict[str, str | tuple[str, ...]] = field(default_factory=dict)
+    # DateField behind the "day" dimension and the period dimensions...
+    date: str = ""
+    # ...unless the period comes from (year, month) fields instead.
+    period: tuple[str, str] | None = None
+
+    def time_dims(self) -> tuple[str, ...]:
+        dims = ("year", "quarter", "month")
+        return dims + ("day",) if self.date else dims
+
+
+DATASETS = {
+    ds.name: ds
+    for ds in (
+        Dataset(
+            name="attendance",
+            model=WorkerAttendance,
+            watermark="updated_at",
+            dims={"worker": "worker_id", "project": "project_id", "status": "status", "state": "state"},
+            labels={"worker": (Worker, "name"), "project": (ProjectPage, "title")},
+            choices={
+                "status": dict(WorkerAttendance.STATUS_CHOICES),
+                "state": dict(WorkerAttendance.STATE_CHOICES),
+            },
+            measures={"hours": "hours"},
+            date="date",
+        ),
+        Dataset(
+            name="inventory",
+            model=InventoryTransaction,
+            watermark="updated_at",
+            dims={"item": "item_id", "project": "project_id", "kind": "kind"},
+            labels={"item": (InventoryItem, "name"), "project": (ProjectPage, "title")},
+            choices={"kind": dict(InventoryTransaction.KIND_CHOICES)},
+            measures={"quantity": "quantity", "unitCost": "unit_cost", "value": ("quantity", "unit_cost")},
+            date="date",
+        ),
+        Dataset(
+            name="payroll",
+            model=WorkerPayrollEntry,
+            watermark="updated_at",
+            dims={"worker": "worker_id", "kind": "kind", "status": "status", "source": "source"},
+            labels={"worker": (Worker, "name")},
+            choices={
+                "kind": dict(WorkerPayrollEntry.KIND_CHOICES),
+                "status": dict(WorkerPayrollEntry.STATUS_CHOICES),
+                "source": dict(WorkerPayrollEntry.SOURCE_CHOICES),
+            },
+            measures={"amount": "amount"},
+            date="date",
+            period=("year", "month"),
+        ),
+        Dataset(
+            name="payments",
+            model=ContractPayment,
+            watermark="updated_at",
+            dims={
+                "contract": "contract_id",
+                "project": "contract__project_id",
+                "client": "contract__client_id",
+                "status": "status",
+            },
+            labels={
+                "contract": (ProjectContract, "title"),
+                "project": (ProjectPage, "title"),
+                "client": (Client, "name"),
+            },
+            choices={"status": dict(ContractPayment.STATUS_CHOICES)},
+            measures={"amount": "amount", "paidAmount": "paid_amount"},
+            date="due_date",
+        ),
+    )
+}
+
+
+# Engines
+
+
+def _numpy() -> Any:
+    try:
+        import numpy  # type: ignore[import-not-found]
+    except Exception:
+        return None
+    return numpy
+
+
+def engine() -> str:
+    """
+    The aggregation engine named by ``OPS_ANALYTICS_ENGINE``: "auto" uses
+    NumPy when it is installed and falls back to plain Python loops.
+    """
+    wanted = str(getattr(settings, "OPS_ANALYTICS_ENGINE", "auto") or "auto").lower()
+    if wanted == "python":
+        return "python"
+    if wanted not in {"auto", "numpy"}:
+        raise ImproperlyConfigured(f"Unknown OPS_ANALYTICS_ENGINE: {wanted!r}")
+    if _numpy() is not None:
+        return "numpy"
+    if wanted == "numpy":
+        raise ImproperlyConfigured("OPS_ANALYTICS_ENGINE 'numpy' requires the 'numpy' package.")
+    return "python"
+
+
+# Columnar snapshots
+
+
+def _float(raw: Any) -> float:
+    return float(raw) if raw is not None else float("nan")
+
+
+class Snapshot:
+    # One dataset held column by column. Dimensions are dictionary-encoded
+    # (codes index ``values``); ``day`` holds date ordinals (0 = none) and
+    # ``ym`` year * 12 + month - 1 (-1 = none). Published snapshots are
+    # never mutated, so readers need no lock.
+    def __init__(self, ds: Dataset):
+        self.ds = ds
+        self.ids = array("q")
+        self.pos: dict[int, int] = {}
+        self.codes: dict[str, array] = {name: array("i") for name in ds.dims}
+        self.values: dict[str, list[Any]] = {name: [] for name in ds.dims}
+        self.index: dict[str, dict[Any, int]] = {name: {} for name in ds.dims}
+        self.day = array("i")
+        self.ym = array("i")
+        self.measures: dict[str, array] = {name: array("d") for name in ds.measures}
+        self.watermark: Any = None
+        self.refreshed_at = 0.0
+
+    def copy(self) -> Snapshot:
+        new = Snapshot(self.ds)
+        new.ids = array("q", self.ids)
+        new.pos = dict(self.pos)
+        new.codes = {k: array("i", v) for k, v in self.codes.items()}
+        new.values = {k: list(v) for k, v in self.values.items()}
+        new.index = {k: dict(v) for k, v in self.index.items()}
+        new.day = array("i", self.day)
+        new.ym = array("i", self.ym)
+        new.measures = {k: array("d", v) for k, v in self.measures.items()}
+        new.watermark = self.watermark
+        return new
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def drop(self, ids: set[int]) -> None:
+        keep = [i for i, pk in enumerate(self.ids) if pk not in ids]
+        self.ids = array("q", (self.ids[i] for i in keep))
+        self.pos = {pk: i for i, pk in enumerate(self.ids)}
+        self.codes = {k: array("i", (v[i] for i in keep)) for k, v in self.codes.items()}
+        self.day = array("i", (self.day[i] for i in keep))
+        self.ym = array("i", (self.ym[i] for i in keep))
+        self.measures = {k: array("d", (v[i] for i in keep)) for k, v in self.measures.items()}
+
+    def _code(self, dim: str, value: Any) -> int:
+        index = self.index[dim]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self.values[dim])
+            self.values[dim].append(value)
+        return code
+
+    def put(self, row: dict[str, Any]) -> None:
+        ds = self.ds
+        day = row.get(ds.date) if ds.date else None
+        if ds.period:
+            year, month = row.get(ds.period[0]), row.get(ds.period[1])
+            ym = int(year) * 12 + int(month) - 1 if year and month else NO_PERIOD
+        else:
+            ym = day.year * 12 + day.month - 1 if day else NO_PERIOD
+        measures = {}
+        for name, path in ds.measures.items():
+            if isinstance(path, tuple):
+                parts = [row.get(p) for p in path]
+                measures[name] = _float(None if None in parts else _product(parts))
+            else:
+                measures[name] = _float(row.get(path))
+        pk = int(row["id"])
+        i = self.pos.get(pk)
+        if i is None:
+            self.pos[pk] = len(self.ids)
+            self.ids.append(pk)
+            for name, path in ds.dims.items():
+                self.codes[name].append(self._code(name, row.get(path)))
+            self.day.append(day.toordinal() if day else 0)
+            self.ym.append(ym)
+            for name, value in measures.items():
+                self.measures[name].append(value)
+        else:
+            for name, path in ds.dims.items():
+                self.codes[name][i] = self._code(name, row.get(path))
+            self.day[i] = day.toordinal() if day else 0
+            self.ym[i] = ym
+            for name, value in measures.items():
+                self.measures[name][i] = value
+        mark = row.get(ds.watermark)
+        if mark is not None and (self.watermark is None or mark > self.watermark):
+            self.watermark = mark
+
+
+def _product(parts: list[Any]) -> Any:
+    out = parts[0]
+    for p in parts[1:]:
+        out = out * p
+    return out
+
+
+def _fields(ds: Dataset) -> list[str]:
+    paths = ["id", ds.watermark, *ds.dims.values()]
+    if ds.date:
+        paths.append(ds.date)
+    if ds.period:
+        paths.extend(ds.period)
+    for path in ds.measures.values():
+        paths.extend(path if isinstance(path, tuple) else [path])
+    return list(dict.fromkeys(paths))
+
+
+class Cube:
+    # The in-process snapshot of one dataset. Each web worker keeps its own;
+    # a refresh reads the rows whose watermark moved, then diffs the table's
+    # ids against the snapshot's to drop deleted rows and pick up any row
+    # the watermark missed.
+    def __init__(self, ds: Dataset):
+        self.ds = ds
+        self.snapshot: Snapshot | None = None
+        self.lock = threading.Lock()
+
+    def current(self) -> Snapshot:
+        snap = self.snapshot
+        if snap is not None and time.monotonic() - snap.refreshed_at < _refresh_seconds():
+            return snap
+        with self.lock:
+            snap = self.snapshot
+            if snap is None or time.monotonic() - snap.refreshed_at >= _refresh_seconds():
+                snap = self.snapshot = self._refresh(snap)
+        return snap
+
+    def _load(self, snap: Snapshot, qs: Any) -> None:
+        for row in qs.values(*_fields(self.ds)).iterator(chunk_size=LOAD_CHUNK):
+            snap.put(row)
+
+    def _refresh(self, snap: Snapshot | None) -> Snapshot:
+        objects = self.ds.model.objects
+        if snap is None or snap.watermark is None:
+            new = Snapshot(self.ds)
+            self._load(new, objects.order_by("id"))
+            new.refreshed_at = time.monotonic()
+            return new
+        new = snap.copy()
+        since = snap.watermark - REFRESH_OVERLAP
+        self._load(new, objects.filter(**{f"{self.ds.watermark}__gte": since}).order_by())
+        ids = set(objects.order_by().values_list("id", flat=True).iterator(chunk_size=LOAD_CHUNK))
+        gone = new.pos.keys() - ids
+        if gone:
+            new.drop(gone)
+        missing = sorted(ids - new.pos.keys())
+        for i in range(0, len(missing), LOAD_CHUNK):
+            self._load(new, objects.filter(id__in=missing[i : i + LOAD_CHUNK]).order_by())
+        new.refreshed_at = time.monotonic()
+        return new
+
+
+def _refresh_seconds() -> float:
+    return float(getattr(settings, "OPS_ANALYTICS_REFRESH_SECONDS", 10) or 0)
+
+
+_cubes: dict[str, Cube] = {}
+_cubes_lock = threading.Lock()
+
+
+def cube(name: str) -> Cube:
+    ds = DATASETS.get(name)
+    if ds is None:
+        raise AnalyticsError("unknown_dataset")
+    with _cubes_lock:
+        c = _cubes.get(name)
+        if c is None:
+            c = _cubes[name] = Cube(ds)
+    return c
+
+
+# Pivot requests
+
+
+@dataclass
+class Measure:
+    key: str
+    agg: str
+    field: str
+
+
+def parse_measures(ds: Dataset, raw: Any) -> list[Measure]:
+    # "count" or "<agg>:<measure>", e.g. "sum:hours".
+    if raw is None:
+        raw = ["count"]
+    if not isinstance(raw, list) or not raw:
+        raise AnalyticsError("invalid_measures")
+    out: list[Measure] = []
+    for item in raw:
+        key = str(item or "").strip()
+        if key == "count":
+            out.append(Measure(key, "count", ""))
+            continue
+        agg, _sep, name = key.partition(":")
+        if agg not in AGGREGATES or name not in ds.measures:
+            raise AnalyticsError("invalid_measures")
+        out.append(Measure(key, agg, name))
+    return out
+
+
+def parse_group_by(ds: Dataset, raw: Any) -> list[str]:
+    if raw is None:
+        return []
+    if not isinstance(raw, list) or len(raw) > MAX_GROUP_BY:
+        raise AnalyticsError("invalid_group_by")
+    allowed = set(ds.dims) | set(ds.time_dims())
+    out = [str(g) for g in raw]
+    if any(g not in allowed for g in out) or len(set(out)) != len(out):
+        raise AnalyticsError("invalid_group_by")
+    return out
+
+
+def _time_key(dim: str, label: Any) -> int:
+    # Inverse of _time_label for filter values.
+    text = str(label).strip()
+    if dim == "year":
+        return int(text)
+    if dim == "quarter":
+        year, _sep, q = text.partition("-Q")
+        return int(year) * 4 + int(q) - 1
+    if dim == "month":
+        year, _sep, month = text.partition("-")
+        return int(year) * 12 + int(month) - 1
+    return date.fromisoformat(text).toordinal()
+
+
+def _time_label(dim: str, key: int) -> str:
+    if key < 0 or (dim == "day" and key == 0):
+        return ""
+    if dim == "year":
+        return str(key)
+    if dim == "quarter":
+        return f"{key // 4}-Q{key % 4 + 1}"
+    if dim == "month":
+        return f"{key // 12:04d}-{key % 12 + 1:02d}"
+    return date.fromordinal(key).isoformat()
+
+
+@dataclass
+class Filter:
+    dim: str
+    keys: set[int] | None = None
+    lo: int | None = None
+    hi: int | None = None
+
+
+def parse_filters(ds: Dataset, snap: Snapshot, raw: Any) -> list[Filter]:
+    """
+    ``{dim: value | [values]}`` for dimensions (raw keys: ids, statuses),
+    ``{"year"|"quarter"|"month"|"day": label | [labels]}`` and
+    ``{"date": {"from": ..., "to": ...}}`` (inclusive). Values are turned
+    into the snapshot's codes, so rows are matched on integers.
+    """
+    if raw is None:
+        return []
+    if not isinstance(raw, dict):
+        raise AnalyticsError("invalid_filter")
+    out: list[Filter] = []
+    for dim, value in raw.items():
+        if dim == "date" and ds.date:
+            if not isinstance(value, dict):
+                raise AnalyticsError("invalid_filter")
+            try:
+                lo = _time_key("day", value["from"]) if value.get("from") else None
+                hi = _time_key("day", value["to"]) if value.get("to") else None
+            except (TypeError, ValueError) as exc:
+                raise AnalyticsError("invalid_filter") from exc
+            out.append(Filter("day", lo=lo, hi=hi))
+            continue
+        values = value if isinstance(value, list) else [value]
+        if dim in ds.dims:
+            index = snap.index[dim]
+            keys = set()
+            for v in values:
+                # Lists and dicts are unhashable, so they can't be looked up.
+                bad = isinstance(v, bool) or not isinstance(v, (str, int))
+                if v is not None and bad:
+                    raise AnalyticsError("invalid_filter")
+                if v in index:
+                    keys.add(index[v])
+                elif isinstance(v, str) and v.isdigit() and int(v) in index:
+                    keys.add(index[int(v)])
+            out.append(Filter(dim, keys=keys))
+        elif dim in ds.time_dims():
+            try:
+                out.append(Filter(dim, keys={_time_key(dim, v) for v in values}))
+            except (TypeError, ValueError) as exc:
+                raise AnalyticsError("invalid_filter") from exc
+        else:
+            raise AnalyticsError("invalid_filter")
+    return out
+
+
+def _python_columns(snap: Snapshot) -> dict[str, Callable[[int], int]]:
+    cols: dict[str, Callable[[int], int]] = {name: codes.__getitem__ for name, codes in snap.codes.items()}
+    ym, day = snap.ym, snap.day
+    cols["year"] = lambda i: ym[i] // 12
+    cols["quarter"] = lambda i: ym[i] // 3
+    cols["month"] = ym.__getitem__
+    cols["day"] = day.__getitem__
+    return cols
+
+
+def _aggregate_python(
+    snap: Snapshot, group_by: list[str], measures: list[Measure], filters: list[Filter]
+) -> tuple[list[tuple[int, ...]], dict[str, list[float | None]]]:
+    cols = _python_columns(snap)
+    checks = [(cols[f.dim], f) for f in filters]
+    key_cols = [cols[g] for g in group_by]
+    fields = sorted({m.field for m in measures if m.field})
+    # group key -> [count, {field: [sum, n, min, max]}]
+    groups: dict[tuple[int, ...], list[Any]] = {}
+    if not group_by:
+        groups[()] = [0, {f: [0.0, 0, None, None] for f in fields}]
+    for i in range(len(snap)):
+        ok = True
+        for col, f in checks:
+            v = col(i)
+            if (f.keys is not None and v not in f.keys) or (f.lo is not None and v < f.lo) or (
+                f.hi is not None and v > f.hi
+            ):
+                ok = False
+                break
+        if not ok:
+            continue
+        key = tuple(col(i) for col in key_cols)
+        acc = groups.get(key)
+        if acc is None:
+            acc = groups[key] = [0, {f: [0.0, 0, None, None] for f in fields}]
+        acc[0] += 1
+        for name in fields:
+            v = snap.measures[name][i]
+            if v != v:
+                continue
+            s = acc[1][name]
+            s[0] += v
+            s[1] += 1
+            s[2] = v if s[2] is None or v < s[2] else s[2]
+            s[3] = v if s[3] is None or v > s[3] else s[3]
+    keys = list(groups)
+    out: dict[str, list[float | None]] = {}
+    for m in measures:
+        col: list[float | None] = []
+        for k in keys:
+            count, stats = groups[k]
+            if m.agg == "count":
+                col.append(count)
+                continue
+            total, n, lo, hi = stats[m.field]
+            col.append({"sum": total, "avg": total / n if n else None, "min": lo, "max": hi}[m.agg])
+        out[m.key] = col
+    return keys, out
+
+
+def _aggregate_numpy(
+    snap: Snapshot, group_by: list[str], measures: list[Measure], filters: list[Filter]
+) -> tuple[list[tuple[int, ...]], dict[str, list[float | None]]]:
+    np = _numpy()
+    n = len(snap)
+    ym = np.frombuffer(snap.ym, dtype=np.int32).astype(np.int64) if n else np.zeros(0, dtype=np.int64)
+
+    def column(dim: str) -> Any:
+        if not n:
+            return np.zeros(0, dtype=np.int64)
+        if dim == "year":
+            return ym // 12
+        if dim == "quarter":
+            return ym // 3
+        if dim == "month":
+            return ym
+        if dim == "day":
+            return np.frombuffer(snap.day, dtype=np.int32).astype(np.int64)
+        return np.frombuffer(snap.codes[dim], dtype=np.int32).astype(np.int64)
+
+    mask = np.ones(n, dtype=bool)
+    for f in filters:
+        col = column(f.dim)
+        if f.keys is not None:
+            mask &= np.isin(col, np.fromiter(f.keys, dtype=np.int64, count=len(f.keys)))
+        if f.lo is not None:
+            mask &= col >= f.lo
+        if f.hi is not None:
+            mask &= col <= f.hi
+    selected = int(mask.sum())
+    if group_by and not selected:
+        inverse = np.zeros(0, dtype=np.int64)
+        keys = []
+    elif group_by:
+        stacked = np.stack([column(g)[mask] for g in group_by], axis=1)
+        uniq, inverse = np.unique(stacked, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        keys = [tuple(int(v) for v in row) for row in uniq]
+    else:
+        inverse = np.zeros(selected, dtype=np.int64)
+        keys = [()]
+    size = len(keys)
+    counts = np.bincount(inverse, minlength=size)
+    out: dict[str, list[float | None]] = {}
+    for m in measures:
+        if m.agg == "count":
+            out[m.key] = [int(c) for c in counts]
+            continue
+        values = np.frombuffer(snap.measures[m.field], dtype=np.float64)[mask] if n else np.zeros(0)
+        present = ~np.isnan(values)
+        inv, vals = inverse[present], values[present]
+        n_present = np.bincount(inv, minlength=size)
+        if m.agg in {"sum", "avg"}:
+            totals = np.bincount(inv, weights=vals, minlength=size)
+            result = totals if m.agg == "sum" else np.divide(
+                totals, n_present, out=np.full(size, np.nan), where=n_present > 0
+            )
+        else:
+            result = np.full(size, np.inf if m.agg == "min" else -np.inf)
+            (np.minimum if m.agg == "min" else np.maximum).at(result, inv, vals)
+            result[n_present == 0] = np.nan
+        out[m.key] = [None if np.isnan(v) else float(v) for v in result]
+    return keys, out
+
+
+def _sort_key(snap: Snapshot, group_by: list[str], key: tuple[int, ...]) -> tuple[Any, ...]:
+    # Dimension values in their natural order (None last); time codes are
+    # already chronological.
+    out: list[Any] = []
+    for pos, dim in enumerate(group_by):
+        value = snap.values[dim][key[pos]] if dim in snap.values else key[pos]
+        out.append((value is None, value if value is not None else 0))
+    return tuple(out)
+
+
+def _labels(ds: Dataset, snap: Snapshot, group_by: list[str], keys: list[tuple[int, ...]]) -> list[dict[str, Any]]:
+    resolved: dict[str, dict[Any, str]] = {}
+    for pos, dim in enumerate(group_by):
+        if dim in ds.labels:
+            model, label_field = ds.labels[dim]
+            raw = {snap.values[dim][k[pos]] for k in keys} - {None}
+            resolved[dim] = {
+                pk: str(label or "")
+                for pk, label in model.objects.filter(pk__in=raw).values_list("pk", label_field)
+            }
+        elif dim in ds.choices:
+            resolved[dim] = ds.choices[dim]
+    rows: list[dict[str, Any]] = []
+    for k in keys:
+        row_keys: dict[str, Any] = {}
+        row_labels: dict[str, str] = {}
+        for pos, dim in enumerate(group_by):
+            if dim in ds.dims:
+                value = snap.values[dim][k[pos]]
+                row_keys[dim] = value
+                row_labels[dim] = resolved.get(dim, {}).get(value, "" if value is None else str(value))
+            else:
+                row_keys[dim] = row_labels[dim] = _time_label(dim, k[pos])
+        rows.append({"keys": row_keys, "labels": row_labels})
+    return rows
+
+
+def pivot(
+    dataset: str,
+    *,
+    group_by: Any = None,
+    measures: Any = None,
+    filters: Any = None,
+    order_by: str = "",
+    limit: int = DEFAULT_LIMIT,
+) -> dict[str, Any]:
+    """
+    Group ``dataset`` by up to three dimensions (its own and year, quarter,
+    month, day), filter it, and compute ``count`` and sum/avg/min/max of
+    its measures. ``order_by`` is a measure key, "-" prefixed for
+    descending; otherwise groups are sorted by their keys.
+    """
+    c = cube(dataset)
+    ds = c.ds
+    group = parse_group_by(ds, group_by)
+    wanted = parse_measures(ds, measures)
+    snap = c.current()
+    flt = parse_filters(ds, snap, filters)
+    used = engine()
+    aggregate = _aggregate_numpy if used == "numpy" else _aggregate_python
+    keys, values = aggregate(snap, group, wanted, flt)
+    if len(keys) > MAX_GROUPS:
+        raise AnalyticsError("too_many_groups")
+    desc = order_by.startswith("-")
+    sort_key = order_by.lstrip("-")
+    if sort_key and sort_key not in values:
+        raise AnalyticsError("invalid_order_by")
+    if sort_key:
+        col = values[sort_key]
+        order = sorted(range(len(keys)), key=lambda i: (col[i] is None, -(col[i] or 0) if desc else (col[i] or 0)))
+    else:
+        order = sorted(range(len(keys)), key=lambda i: _sort_key(snap, group, keys[i]))
+    limit = max(1, min(limit or DEFAULT_LIMIT, MAX_GROUPS))
+    shown = order[:limit]
+    rows = _labels(ds, snap, group, [keys[i] for i in shown])
+    for row, i in zip(rows, shown):
+        row["values"] = {key: col[i] for key, col in values.items()}
+    return {
+        "dataset": dataset,
+        "groupBy": group,
+        "measures": [m.key for m in wanted],
+        "engine": used,
+        "rowCount": len(keys),
+        "truncated": len(keys) > limit,
+        "rows": rows,
+        "sourceRows": len(snap),
+    }
+
+
+def describe() -> list[dict[str, Any]]:
+    return [
+        {
+            "name": ds.name,
+            "dimensions": [*ds.dims, *ds.time_dims()],
+            "measures": list(ds.measures),
+            "aggregates": ["count", *AGGREGATES],
+        }
+        for ds in DATASETS.values()
+    ]
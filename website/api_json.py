@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+import uuid
+from contextvars import ContextVar
+from contextvars import Token
+from typing import Any
+from typing import Callable
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import JsonResponse
+from django.utils.duration import duration_iso_string
+from django.utils.functional import Promise
+
+
+ENVELOPE_HEADER = "X-Api-Envelope"
+ENVELOPE_SINGLE = "single"
+
+_single_envelope: ContextVar[bool] = ContextVar("api_single_envelope", default=False)
+
+
+# Envelope negotiation
+
+
+def wants_single_envelope(request: HttpRequest) -> bool:
+    return str(request.headers.get(ENVELOPE_HEADER) or "").strip().lower() == ENVELOPE_SINGLE
+
+
+def activate(request: HttpRequest) -> Token[bool]:
+    return _single_envelope.set(wants_single_envelope(request))
+
+
+def deactivate(token: Token[bool]) -> None:
+    _single_envelope.reset(token)
+
+
+def single_envelope() -> bool:
+    return _single_envelope.get()
+
+
+def envelope(result: dict[str, Any]) -> dict[str, Any]:
+    # Older clients read "data"; clients that send X-Api-Envelope: single
+    # get the result once instead of twice.
+    if single_envelope():
+        return {"ok": True, "result": result}
+    return {"ok": True, "result": result, "data": result}
+
+
+# Encoders
+
+
+def _default(o: Any) -> Any:
+    # Same output as DjangoJSONEncoder, without going through its class.
+    if isinstance(o, datetime.datetime):
+        r = o.isoformat()
+        if o.microsecond:
+            r = r[:23] + r[26:]
+        if r.endswith("+00:00"):
+            r = r.removesuffix("+00:00") + "Z"
+        return r
+    if isinstance(o, datetime.date):
+        return o.isoformat()
+    if isinstance(o, datetime.time):
+        r = o.isoformat()
+        if o.microsecond:
+            r = r[:12]
+        return r
+    if isinstance(o, (decimal.Decimal, uuid.UUID, Promise)):
+        return str(o)
+    if isinstance(o, datetime.timedelta):
+        return duration_iso_string(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def _django_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, cls=DjangoJSONEncoder).encode("utf-8")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _orjson_dumps() -> Callable[[Any], bytes]:
+    try:
+        import orjson  # type: ignore[import-not-found]
+    except Exception as exc:
+        raise ImproperlyConfigured("API_JSON_ENCODER 'orjson' requires the 'orjson' package.") from exc
+    option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=option)
+
+    return dumps
+
+
+ENCODERS: dict[str, Callable[[], Callable[[Any], bytes]]] = {
+    "django": lambda: _django_dumps,
+    "stdlib": lambda: _stdlib_dumps,
+    "orjson": _orjson_dumps,
+}
+
+_dumps: Callable[[Any], bytes] | None = None
+
+
+def get_encoder(name: str | None = None) -> Callable[[Any], bytes]:
+    """
+    Return the encoder named by ``API_JSON_ENCODER``. "auto" picks orjson when
+    it is installed and falls back to the stdlib encoder.
+    """
+    global _dumps
+
+    if name is None and _dumps is not None:
+        return _dumps
+    wanted = str(name or getattr(settings, "API_JSON_ENCODER", "auto") or "auto").lower()
+    if wanted == "auto":
+        try:
+            encoder = _orjson_dumps()
+        except ImproperlyConfigured:
+            encoder = _stdlib_dumps
+    elif wanted in ENCODERS:
+        encoder = ENCODERS[wanted]()
+    else:
+        raise ImproperlyConfigured(f"Unknown API_JSON_ENCODER: {wanted!r}")
+    if name is None:
+        _dumps = encoder
+    return encoder
+
+
+def dumps(obj: Any) -> bytes:
+    return get_encoder()(obj)
+
+
+class EncodedJsonResponse(JsonResponse):
+    # JsonResponse.__init__ always encodes with DjangoJSONEncoder; this one
+    # takes its body from the configured encoder instead.
+    def __init__(self, data: Any, **kwargs: Any):
+        kwargs.setdefault("content_type", "application/json")
+        HttpResponse.__init__(self, content=dumps(data), **kwargs)
+
+
+def json_response(data: Any, *, status: int = 200) -> JsonResponse:
+    return EncodedJsonResponse(data, status=status)
@@ -9,11 +9,13 @@ import string
 import tempfile
 import time
 import zipfile
+from datetime import timedelta
 from decimal import Decimal
 from io import BytesIO
 from io import StringIO
 from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Iterator
 
 from django.conf import settings
@@ -22,10 +24,11 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth import login as django_login
 from django.contrib.auth import logout as django_logout
 from django.contrib.auth.models import Group
-from django.core.cache import cache
 from django.core.management import call_command
 from django.db import IntegrityError
 from django.db import transaction
+from django.db.models import Count
+from django.db.models import Q
 from django.db.models import Sum
 from django.http import FileResponse
 from django.http import HttpRequest
@@ -44,12 +47,24 @@ from PIL import ImageFont
 from wagtail.models import Page
 from wagtail.models import Site
 
+from website import analytics
+from website import api_json
+from website import attendance
+from website import jobs
+from website import payroll
+from website import permission_rules
+from website import punch_log
+from website import ratelimit
+from website import site_snapshots
+from website import timeclock_import
 from website.models import AIContentGeneratorPage
 from website.models import AIDesignAnalyzerPage
 from website.models import AISettings
 from website.models import ArchitecturalVisualizerPage
 from website.models import ArticleIndexPage
 from website.models import ArticlePage
+from website.models import AttendanceProjectDayRollup
+from website.models import AttendanceWorkerMonthRollup
 from website.models import CalculatorSettings
 from website.models import CertificationIndexPage
 from website.models import CertificationPage
@@ -73,6 +88,7 @@ from website.models import InventoryTransaction
 from website.models import LocationIndexPage
 from website.models import LocationPage
 from website.models import OpsAuditLog
+from website.models import OpsJob
 from website.models import OpsPermissionRule
 from website.models import OpsTimeclockImportRun
 from website.models import ProjectContract
@@ -96,6 +112,10 @@ from website.models import WebPage
 from website.models import Worker
 from website.models import WorkerAttendance
 from website.models import WorkerPayrollEntry
+from website.principal import ROLE_GROUPS
+from website.principal import Principal
+from website.principal import load_principal
+from website.principal import role_from_groups
 
 
 logger = logging.getLogger(__name__)
@@ -112,7 +132,7 @@ def _read_json(request: HttpRequest) -> dict[str, Any]:
 
 def _api_ok(payload: dict[str, Any] | None = None, *, status: int = 200) -> JsonResponse:
     result: dict[str, Any] = payload or {}
-    return JsonResponse({"ok": True, "result": result, "data": result}, status=status)
+    return api_json.json_response(api_json.envelope(result), status=status)
 
 
 def _api_error(
@@ -127,16 +147,14 @@ def _api_error(
         error_obj["message"] = message
     if details:
         error_obj["details"] = details
-    return JsonResponse({"ok": False, "error": error_obj, "errorCode": code}, status=status)
+    return api_json.json_response({"ok": False, "error": error_obj, "errorCode": code}, status=status)
 
 
-def _rate_limit_key(request: HttpRequest, *, scope: str, window_seconds: int) -> str:
+def _rate_limit_ident(request: HttpRequest) -> str:
     user = getattr(request, "user", None)
     user_id = getattr(user, "id", None) if user and getattr(user, "is_authenticated", False) else None
     ip = str(request.META.get("REMOTE_ADDR") or "").strip() or "unknown"
-    ident = f"u:{user_id}" if user_id else f"ip:{ip}"
-    bucket = int(time.time() // max(1, int(window_seconds)))
-    return f"rl:{scope}:{ident}:{bucket}"
+    return f"u:{user_id}" if user_id else f"ip:{ip}"
 
 
 def _check_rate_limit(
@@ -146,27 +164,27 @@ def _check_rate_limit(
     limit: int,
     window_seconds: int,
 ) -> JsonResponse | None:
-    lim = max(1, int(limit))
-    win = max(1, int(window_seconds))
-    key = _rate_limit_key(request, scope=scope, window_seconds=win)
     try:
-        added = cache.add(key, 1, timeout=win)
-        if added:
-            return None
-        current = cache.incr(key)
-        if int(current) <= lim:
-            return None
+        decision = ratelimit.hit(
+            scope,
+            _rate_limit_ident(request),
+            limit=limit,
+            window_seconds=window_seconds,
+        )
     except Exception:
+        logger.exception("Rate limiter unavailable", extra={"scope": scope})
+        return None
+    if decision.allowed:
         return None
 
-    now = int(time.time())
-    retry_after = win - (now % win)
-    return _api_error(
+    resp = _api_error(
         "rate_limited",
         status=429,
         message="تم تجاوز الحد المسموح من المحاولات. يرجى المحاولة لاحقاً.",
-        details={"retryAfterSeconds": retry_after},
+        details={"retryAfterSeconds": decision.retry_after},
     )
+    resp["Retry-After"] = str(decision.retry_after)
+    return resp
 
 
 def _safe_uploaded_filename(original_name: str, *, allowed_exts: set[str]) -> str:
@@ -176,90 +194,24 @@ def _safe_uploaded_filename(original_name: str, *, allowed_exts: set[str]) -> st
     return f"{token}{ext}" if ext else token
 
 
-ROLE_GROUPS: dict[str, set[str]] = {
-    "guest": {"Guests", "Guest", "ضيف"},
-    "registered_guest": {"Registered Guests", "Registered Guest", "ضيف مسجل", "ضيف مُسجل"},
-    "employee": {"Employees", "Employee", "موظف", "موظفين"},
-    "registrar": {"Registrars", "Registrar", "مسجل", "المسجل"},
-    "accountant": {"Accountants", "Accountant", "محاسب", "محاسبون", "الحسابات"},
-    "manager": {
-        "Managers",
-        "Manager",
-        "مدير",
-        "مدراء",
-        "المدراء",
-        "مدراء الموقع",
-        "مدير الموقع",
-    },
-}
-
-
-def _user_group_names(user: Any) -> set[str]:
-    try:
-        raw = user.groups.values_list("name", flat=True) if user else []
-        return {str(x) for x in raw if str(x).strip()}
-    except Exception:
-        return set()
-
-
-def _user_in_any_group(user: Any, group_names: set[str]) -> bool:
-    if not user:
-        return False
-    if not group_names:
-        return False
-    try:
-        return bool(user.groups.filter(name__in=group_names).exists())
-    except Exception:
-        existing = _user_group_names(user)
-        return any(name in existing for name in group_names)
-
-
-def _user_role(user: Any) -> str:
-    if not user or not getattr(user, "is_authenticated", False):
-        return "anonymous"
-    if getattr(user, "is_superuser", False):
-        return "superadmin"
-    if _user_in_any_group(user, ROLE_GROUPS["manager"]):
-        return "manager"
-    if _user_in_any_group(user, ROLE_GROUPS["accountant"]):
-        return "accountant"
-    if _user_in_any_group(user, ROLE_GROUPS["registrar"]):
-        return "registrar"
-    if _user_in_any_group(user, ROLE_GROUPS["employee"]):
-        return "employee"
-    if _user_in_any_group(user, ROLE_GROUPS["registered_guest"]):
-        return "registered_guest"
-    if _user_in_any_group(user, ROLE_GROUPS["guest"]):
-        return "guest"
-    return "staff"
-
-
-def _ops_rule_allowed_roles(code: str) -> set[str] | None:
-    key = f"ops_perm_rule:{code}"
-    cached = cache.get(key)
-    if isinstance(cached, list):
-        return {str(x) for x in cached if str(x).strip()}
-    if cached is False:
-        return None
-    rule = OpsPermissionRule.objects.filter(code=code).first()
-    roles = None
-    if rule and isinstance(rule.allowed_roles, list):
-        roles = {str(x) for x in rule.allowed_roles if str(x).strip()}
-    cache.set(key, list(roles) if roles is not None else False, 60)
-    return roles
+def _principal(request: HttpRequest) -> Principal:
+    principal = getattr(request, "principal", None)
+    if principal is None:
+        principal = load_principal(getattr(request, "user", None))
+        setattr(request, "principal", principal)
+    return principal
 
 
 def _require_ops_rule(request: HttpRequest, code: str, *, default_allowed_roles: set[str]) -> Any | None:
     forbidden = _require_staff(request)
     if forbidden:
         return forbidden
-    user = getattr(request, "user", None)
-    if user and getattr(user, "is_superuser", False):
+    principal = _principal(request)
+    if principal.is_superuser:
         return None
-    override = _ops_rule_allowed_roles(code)
+    override = permission_rules.allowed_roles(code)
     allowed_roles = override if override is not None else default_allowed_roles
-    role = _user_role(user)
-    if role in allowed_roles:
+    if principal.role in allowed_roles:
         return None
     return _api_error("forbidden", status=403)
 
@@ -279,7 +231,7 @@ def _audit_ops(
         actor = user if user and getattr(user, "is_authenticated", False) else None
         OpsAuditLog.objects.create(
             actor=actor,
-            role=_user_role(user),
+            role=_principal(request).role,
             action=str(action),
             entity_type=str(entity_type or ""),
             entity_id=str(entity_id or ""),
@@ -297,10 +249,10 @@ def _require_manager(request: HttpRequest) -> Any | None:
     forbidden = _require_staff(request)
     if forbidden:
         return forbidden
-    user = getattr(request, "user", None)
-    if user and getattr(user, "is_superuser", False):
+    principal = _principal(request)
+    if principal.is_superuser:
         return None
-    if _user_in_any_group(user, ROLE_GROUPS["manager"]):
+    if principal.in_any_group(ROLE_GROUPS["manager"]):
         return None
     return _api_error("forbidden", status=403)
 
@@ -357,6 +309,10 @@ def _require_ops_attendance_read(request: HttpRequest) -> Any | None:
     return _require_ops_management(request)
 
 
+def _require_ops_dashboard_read(request: HttpRequest) -> Any | None:
+    return _require_ops_management(request)
+
+
 def _require_ops_attendance_write(request: HttpRequest) -> Any | None:
     return _require_ops_rule(
         request,
@@ -425,14 +381,12 @@ def _require_rfq_management(request: HttpRequest) -> Any | None:
     forbidden = _require_staff(request)
     if forbidden:
         return forbidden
-    user = getattr(request, "user", None)
-    if user and getattr(user, "is_superuser", False):
-        return None
-    if _user_in_any_group(user, ROLE_GROUPS["manager"]):
+    principal = _principal(request)
+    if principal.is_superuser:
         return None
-    if _user_in_any_group(user, ROLE_GROUPS["accountant"]):
-        return None
-    if _user_in_any_group(user, ROLE_GROUPS["registrar"]):
+    if principal.in_any_group(
+        ROLE_GROUPS["manager"] | ROLE_GROUPS["accountant"] | ROLE_GROUPS["registrar"]
+    ):
         return None
     return _require_projects_management(request)
 
@@ -446,14 +400,7 @@ def _can_use_restricted_tools(request: HttpRequest) -> bool:
         return False
     if getattr(user, "is_superuser", False):
         return True
-
-    try:
-        group_names = set(user.groups.values_list("name", flat=True))
-    except Exception:
-        return False
-
-    allowed = ROLE_GROUPS["manager"]
-    return any(name in allowed for name in group_names)
+    return _principal(request).in_any_group(ROLE_GROUPS["manager"])
 
 
 def _require_restricted_tools(request: HttpRequest) -> Any | None:
@@ -464,14 +411,7 @@ def _require_restricted_tools(request: HttpRequest) -> Any | None:
         return _api_error("forbidden", status=403)
     if getattr(user, "is_superuser", False):
         return None
-
-    try:
-        group_names = set(user.groups.values_list("name", flat=True))
-    except Exception:
-        return _api_error("forbidden", status=403)
-
-    allowed = ROLE_GROUPS["manager"]
-    if any(name in allowed for name in group_names):
+    if _principal(request).in_any_group(ROLE_GROUPS["manager"]):
         return None
     return _api_error("forbidden", status=403)
 
@@ -523,25 +463,16 @@ def auth_me(request: HttpRequest) -> JsonResponse:
                 "workerId": 0,
             }
         )
-    try:
-        groups = list(user.groups.values_list("name", flat=True))
-    except Exception:
-        groups = []
-    worker_id = 0
-    try:
-        linked = Worker.objects.filter(user=user).values_list("id", flat=True).first()
-        worker_id = int(linked or 0)
-    except Exception:
-        worker_id = 0
+    principal = _principal(request)
     return _api_ok(
         {
             "authenticated": True,
-            "username": getattr(user, "username", "") or "",
-            "isStaff": bool(getattr(user, "is_staff", False)),
-            "isSuperuser": bool(getattr(user, "is_superuser", False)),
-            "role": _user_role(user),
-            "groups": groups,
-            "workerId": worker_id,
+            "username": principal.username,
+            "isStaff": principal.is_staff,
+            "isSuperuser": principal.is_superuser,
+            "role": principal.role,
+            "groups": sorted(principal.groups),
+            "workerId": principal.worker_id,
         }
     )
 
@@ -657,7 +588,7 @@ def _require_projects_management(request: HttpRequest) -> Any | None:
             "مدير مشروع",
             "مدير المشاريع",
         } | ROLE_GROUPS["manager"]
-        if user and user.groups.filter(name__in=group_names).exists():
+        if user and _principal(request).in_any_group(group_names):
             return None
     except Exception:
         pass
@@ -3416,21 +3347,25 @@ def _image_url(request: HttpRequest, image: Any | None) -> str:
     return _abs_url(request, image.file.url)
 
 
-def _project_cover_url(request: HttpRequest, project: Any) -> str:
-    cover = getattr(project, "cover_image", None)
-    cover_url = _image_url(request, cover)
-    if cover_url:
-        return cover_url
-    try:
-        qs = project.gallery_images.all().select_related("image").order_by("sort_order", "id")
-        for gi in qs:
-            img = getattr(gi, "image", None)
-            url = _image_url(request, img)
-            if url:
-                return url
-    except Exception:
-        return ""
-    return ""
+def _project_cover_urls(request: HttpRequest, projects: list[Any]) -> dict[int, str]:
+    # Expects cover_image to be select_related; projects without a cover fall
+    # back to their first gallery image, resolved for all of them in one query.
+    urls: dict[int, str] = {}
+    missing: list[int] = []
+    for project in projects:
+        urls[project.id] = _image_url(request, getattr(project, "cover_image", None))
+        if not urls[project.id]:
+            missing.append(project.id)
+    if missing:
+        gallery = (
+            ProjectGalleryImage.objects.filter(page_id__in=missing, image__isnull=False)
+            .select_related("image")
+            .order_by("page_id", "sort_order", "id")
+        )
+        for gi in gallery:
+            if not urls.get(gi.page_id):
+                urls[gi.page_id] = _image_url(request, gi.image)
+    return urls
 
 
 def _image_rendition_url(request: HttpRequest, image: Any | None, spec: str) -> str:
@@ -3458,13 +3393,14 @@ def admin_projects(request: HttpRequest) -> JsonResponse:
         ProjectPage.STATUS_ARCHIVED,
     }:
         return _api_error("invalid_project_status", status=400)
-    pages = ProjectPage.objects.child_of(idx).specific().order_by("path")
+    pages = ProjectPage.objects.child_of(idx).select_related("cover_image").order_by("path")
     if status:
         pages = pages.filter(status=status)
-    pages = pages.prefetch_related("gallery_images__image")
+    pages = list(pages)
+    cover_urls = _project_cover_urls(request, pages)
     items: list[dict[str, Any]] = []
     for p in pages:
-        cover_url = _project_cover_url(request, p)
+        cover_url = cover_urls.get(p.id, "")
         items.append(
             {
                 "id": p.id,
@@ -4888,22 +4824,12 @@ def admin_backup_export(request: HttpRequest) -> HttpResponse | JsonResponse:
     limited = _check_rate_limit(request, scope="admin_backup_export", limit=3, window_seconds=600)
     if limited:
         return limited
+    if _wants_async(request, _read_json(request)):
+        return _enqueue_job(request, jobs.KIND_BACKUP_EXPORT, {})
 
     out = StringIO()
     try:
-        call_command(
-            "dumpdata",
-            "website",
-            "wagtailcore",
-            "wagtailimages",
-            "wagtaildocs",
-            "coderedcms",
-            "taggit",
-            "auth",
-            indent=2,
-            stdout=out,
-            exclude=["contenttypes", "admin.logentry", "sessions"],
-        )
+        call_command("dumpdata", *jobs.BACKUP_APPS, indent=2, stdout=out, exclude=jobs.BACKUP_EXCLUDE)
     except Exception:
         return _api_error("export_failed", status=400)
 
@@ -5239,7 +5165,7 @@ def admin_users_list(request: HttpRequest) -> JsonResponse:
                 "id": int(u.id),
                 "username": getattr(u, "username", "") or "",
                 "isSuperuser": bool(getattr(u, "is_superuser", False)),
-                "role": _user_role(u),
+                "role": role_from_groups(u, set(groups)),
                 "groups": groups,
                 "workerId": int(worker_map.get(int(u.id), 0) or 0),
             }
@@ -5867,94 +5793,116 @@ def chat(request: HttpRequest) -> StreamingHttpResponse | JsonResponse:
     return resp
 
 
-def site_company(request: HttpRequest) -> JsonResponse:
-    site = _get_site(request)
-    if not site:
+def _site_snapshot(
+    request: HttpRequest,
+    name: str,
+    build: Callable[[HttpRequest, Site | None], dict[str, Any]],
+    *,
+    require_site: bool = True,
+    variant: str = "",
+    encoding: str = "",
+) -> HttpResponse:
+    site_id = site_snapshots.site_id_for_request(request, _get_site)
+    if require_site and not site_id:
         return _api_error("site_not_found", status=400)
+
+    def render() -> bytes:
+        site = _get_site(request)
+        return _api_ok(build(request, site)).content
+
+    if api_json.single_envelope():
+        variant = f"{variant}:single"
+    etag, body = site_snapshots.get_or_build(
+        request, name, site_id, render, variant=variant, encoding=encoding
+    )
+    return site_snapshots.conditional_response(request, etag, body, encoding=encoding)
+
+
+def _site_company_payload(request: HttpRequest, site: Site) -> dict[str, Any]:
     company = CompanySettings.for_site(site)
     logo_url = ""
     if company.logo_image and getattr(company.logo_image, "file", None):
         logo_url = _abs_url(request, company.logo_image.file.url)
-    return _api_ok(
-        {
-            "name": company.name,
-            "brandTitle": company.brand_title,
-            "brandSubtitle": company.brand_subtitle,
-            "slogan": company.slogan,
-            "description": company.description,
-            "mission": company.mission,
-            "vision": company.vision,
-            "topbarSlogan": company.topbar_slogan,
-            "address": company.address,
-            "registrationStatus": company.registration_status,
-            "chamberMembership": company.chamber_membership,
-            "classification": company.classification,
-            "email": company.email,
-            "phone1": company.phone_1,
-            "phone2": company.phone_2,
-            "facebookUrl": company.facebook_url,
-            "instagramUrl": company.instagram_url,
-            "linkedinUrl": company.linkedin_url,
-            "logoUrl": logo_url,
-        }
-    )
+    return {
+        "name": company.name,
+        "brandTitle": company.brand_title,
+        "brandSubtitle": company.brand_subtitle,
+        "slogan": company.slogan,
+        "description": company.description,
+        "mission": company.mission,
+        "vision": company.vision,
+        "topbarSlogan": company.topbar_slogan,
+        "address": company.address,
+        "registrationStatus": company.registration_status,
+        "chamberMembership": company.chamber_membership,
+        "classification": company.classification,
+        "email": company.email,
+        "phone1": company.phone_1,
+        "phone2": company.phone_2,
+        "facebookUrl": company.facebook_url,
+        "instagramUrl": company.instagram_url,
+        "linkedinUrl": company.linkedin_url,
+        "logoUrl": logo_url,
+    }
 
 
-def site_config(request: HttpRequest) -> JsonResponse:
-    site = _get_site(request)
-    if not site:
-        return _api_error("site_not_found", status=400)
+def site_company(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "company", _site_company_payload)
+
+
+def _site_config_payload(request: HttpRequest, site: Site) -> dict[str, Any]:
     v = SiteVisibilitySettings.for_site(site)
-    return _api_ok(
-        {
-            "visibility": {
-                "showServices": v.show_services,
-                "showProjects": v.show_projects,
-                "showTools": v.show_tools,
-                "showShowcase": v.show_showcase,
-                "showAbout": v.show_about,
-                "showContact": v.show_contact,
-                "showTeam": v.show_team,
-                "showTestimonials": v.show_testimonials,
-                "showHomeTrustBadges": v.show_home_trust_badges,
-                "showHomeStats": v.show_home_stats,
-                "showHomeTimeline": v.show_home_timeline,
-                "showHomeQuickLinks": v.show_home_quick_links,
-                "showRfqTemplates": v.show_rfq_templates,
-                "showHomeAIBanner": v.show_home_ai_banner,
-                "showNewsletter": v.show_newsletter,
-                "showAIChatbot": v.show_ai_chatbot,
-                "showWhatsAppButton": v.show_whatsapp_button,
-                "showFloatingCTA": v.show_floating_cta,
-                "showFooter": v.show_footer,
-                "showControlProjectsManagement": v.show_control_projects_management,
-            }
+    return {
+        "visibility": {
+            "showServices": v.show_services,
+            "showProjects": v.show_projects,
+            "showTools": v.show_tools,
+            "showShowcase": v.show_showcase,
+            "showAbout": v.show_about,
+            "showContact": v.show_contact,
+            "showTeam": v.show_team,
+            "showTestimonials": v.show_testimonials,
+            "showHomeTrustBadges": v.show_home_trust_badges,
+            "showHomeStats": v.show_home_stats,
+            "showHomeTimeline": v.show_home_timeline,
+            "showHomeQuickLinks": v.show_home_quick_links,
+            "showRfqTemplates": v.show_rfq_templates,
+            "showHomeAIBanner": v.show_home_ai_banner,
+            "showNewsletter": v.show_newsletter,
+            "showAIChatbot": v.show_ai_chatbot,
+            "showWhatsAppButton": v.show_whatsapp_button,
+            "showFloatingCTA": v.show_floating_cta,
+            "showFooter": v.show_footer,
+            "showControlProjectsManagement": v.show_control_projects_management,
         }
-    )
+    }
 
 
-def site_home(request: HttpRequest) -> JsonResponse:
-    site = _get_site(request)
-    if not site:
-        return _api_error("site_not_found", status=400)
+def site_config(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "config", _site_config_payload)
+
+
+def _site_home_payload(request: HttpRequest, site: Site) -> dict[str, Any]:
     home = HomePageSettings.for_site(site)
     bg_url = ""
     if home.hero_background_image and getattr(home.hero_background_image, "file", None):
         bg_url = _abs_url(request, home.hero_background_image.file.url)
-    return _api_ok(
-        {
-            "heroTitleLine1": home.hero_title_line_1,
-            "heroTitleLine2": home.hero_title_line_2,
-            "heroLead": home.hero_lead,
-            "heroPrimaryCtaLabel": home.hero_primary_cta_label,
-            "heroPrimaryCtaUrl": home.hero_primary_cta_url,
-            "heroSecondaryCtaLabel": home.hero_secondary_cta_label,
-            "heroSecondaryCtaUrl": home.hero_secondary_cta_url,
-            "heroBackgroundUrl": bg_url,
-            "newsletterTitle": home.newsletter_title,
-            "newsletterSubtitle": home.newsletter_subtitle,
-        }
-    )
+    return {
+        "heroTitleLine1": home.hero_title_line_1,
+        "heroTitleLine2": home.hero_title_line_2,
+        "heroLead": home.hero_lead,
+        "heroPrimaryCtaLabel": home.hero_primary_cta_label,
+        "heroPrimaryCtaUrl": home.hero_primary_cta_url,
+        "heroSecondaryCtaLabel": home.hero_secondary_cta_label,
+        "heroSecondaryCtaUrl": home.hero_secondary_cta_url,
+        "heroBackgroundUrl": bg_url,
+        "newsletterTitle": home.newsletter_title,
+        "newsletterSubtitle": home.newsletter_subtitle,
+    }
+
+
+def site_home(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "home", _site_home_payload)
 
 
 def _site_root(request: HttpRequest) -> Page | None:
@@ -5964,64 +5912,58 @@ def _site_root(request: HttpRequest) -> Page | None:
     return site.root_page
 
 
-def site_services(request: HttpRequest) -> JsonResponse:
-    root = _site_root(request)
-    if not root:
-        return _api_error("site_not_found", status=400)
-    services_index = root.get_children().live().filter(slug="services").first()
+def _site_services_payload(request: HttpRequest, site: Site) -> dict[str, Any]:
+    services_index = site.root_page.get_children().live().filter(slug="services").first()
     if not services_index:
-        return _api_ok({"items": []})
+        return {"items": []}
     pages = (
-        Page.objects.child_of(services_index).live().type(ServicePage).specific()
+        ServicePage.objects.child_of(services_index)
+        .live()
+        .select_related("cover_image")
+        .order_by("path")
     )
     items: list[dict[str, Any]] = []
     for p in pages:
-        cover_url = ""
-        cover = getattr(p, "cover_image", None)
-        if cover and getattr(cover, "file", None):
-            cover_url = _abs_url(request, cover.file.url)
         items.append(
             {
                 "id": p.id,
                 "title": p.title,
                 "slug": p.slug,
-                "url": p.url,
+                "url": p.get_url(request),
                 "description": getattr(p, "short_description", "") or "",
-                "imageUrl": cover_url,
+                "imageUrl": _image_url(request, p.cover_image),
             }
         )
-    return _api_ok({"items": items})
+    return {"items": items}
 
 
-def site_projects(request: HttpRequest) -> JsonResponse:
-    root = _site_root(request)
-    if not root:
-        return _api_error("site_not_found", status=400)
-    projects_index = root.get_children().live().filter(slug="projects").first()
+def site_services(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "services", _site_services_payload)
+
+
+def _site_projects_payload(request: HttpRequest, site: Site, status: str = "") -> dict[str, Any]:
+    projects_index = site.root_page.get_children().live().filter(slug="projects").first()
     if not projects_index:
-        return _api_ok({"items": []})
-    status = str(request.GET.get("status") or "").strip()
-    if status and status not in {ProjectPage.STATUS_ONGOING, ProjectPage.STATUS_COMPLETED}:
-        return _api_error("invalid_project_status", status=400)
+        return {"items": []}
     pages = (
         ProjectPage.objects.child_of(projects_index)
         .live()
         .exclude(status=ProjectPage.STATUS_ARCHIVED)
-        .specific()
+        .select_related("cover_image")
     )
     if status:
         pages = pages.filter(status=status)
-    pages = pages.order_by("path")
-    pages = pages.prefetch_related("gallery_images__image")
+    pages = list(pages.order_by("path"))
+    cover_urls = _project_cover_urls(request, pages)
     items: list[dict[str, Any]] = []
     for p in pages:
-        cover_url = _project_cover_url(request, p)
+        cover_url = cover_urls.get(p.id, "")
         items.append(
             {
                 "id": p.id,
                 "title": p.title,
                 "slug": p.slug,
-                "url": p.url,
+                "url": p.get_url(request),
                 "category": getattr(p, "client_name", "") or "",
                 "description": getattr(p, "short_description", "") or "",
                 "status": getattr(p, "status", ProjectPage.STATUS_COMPLETED) or ProjectPage.STATUS_COMPLETED,
@@ -6030,15 +5972,25 @@ def site_projects(request: HttpRequest) -> JsonResponse:
                 "imageUrl": cover_url,
             }
         )
-    return _api_ok({"items": items})
+    return {"items": items}
+
+
+def site_projects(request: HttpRequest) -> HttpResponse:
+    status = str(request.GET.get("status") or "").strip()
+    if status and status not in {ProjectPage.STATUS_ONGOING, ProjectPage.STATUS_COMPLETED}:
+        return _api_error("invalid_project_status", status=400)
+    return _site_snapshot(
+        request,
+        "projects",
+        lambda req, site: _site_projects_payload(req, site, status),
+        variant=status,
+    )
 
 
-def site_team(request: HttpRequest) -> JsonResponse:
+def _site_team_payload(request: HttpRequest, site: Site | None) -> dict[str, Any]:
     items: list[dict[str, Any]] = []
-    for m in TeamMember.objects.all():
-        image_url = ""
-        if m.image and getattr(m.image, "file", None):
-            image_url = _abs_url(request, m.image.file.url)
+    for m in TeamMember.objects.select_related("image"):
+        image_url = _image_url(request, m.image)
         items.append(
             {
                 "id": m.id,
@@ -6050,10 +6002,14 @@ def site_team(request: HttpRequest) -> JsonResponse:
                 "imageUrl": image_url,
             }
         )
-    return _api_ok({"items": items})
+    return {"items": items}
 
 
-def site_testimonials(request: HttpRequest) -> JsonResponse:
+def site_team(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "team", _site_team_payload, require_site=False)
+
+
+def _site_testimonials_payload(request: HttpRequest, site: Site | None) -> dict[str, Any]:
     items: list[dict[str, Any]] = []
     for t in Testimonial.objects.all():
         items.append(
@@ -6065,10 +6021,14 @@ def site_testimonials(request: HttpRequest) -> JsonResponse:
                 "rating": t.rating,
             }
         )
-    return _api_ok({"items": items})
+    return {"items": items}
+
 
+def site_testimonials(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "testimonials", _site_testimonials_payload, require_site=False)
 
-def site_home_sections(request: HttpRequest) -> JsonResponse:
+
+def _site_home_sections_payload(request: HttpRequest, site: Site | None) -> dict[str, Any]:
     badges = [
         {
             "id": b.id,
@@ -6113,14 +6073,54 @@ def site_home_sections(request: HttpRequest) -> JsonResponse:
         }
         for m in HomeAIMetric.objects.all()
     ]
-    return _api_ok(
-        {
-            "trustBadges": badges,
-            "stats": stats,
-            "timelineSteps": steps,
-            "aiFeatures": ai_features,
-            "aiMetrics": ai_metrics,
-        }
+    return {
+        "trustBadges": badges,
+        "stats": stats,
+        "timelineSteps": steps,
+        "aiFeatures": ai_features,
+        "aiMetrics": ai_metrics,
+    }
+
+
+def site_home_sections(request: HttpRequest) -> HttpResponse:
+    return _site_snapshot(request, "home_sections", _site_home_sections_payload, require_site=False)
+
+
+SITE_BOOTSTRAP_SECTIONS: dict[str, Callable[[HttpRequest, Site], dict[str, Any]]] = {
+    "company": _site_company_payload,
+    "config": _site_config_payload,
+    "home": _site_home_payload,
+    "homeSections": _site_home_sections_payload,
+    "services": _site_services_payload,
+    "projects": _site_projects_payload,
+    "team": _site_team_payload,
+    "testimonials": _site_testimonials_payload,
+}
+
+
+def site_bootstrap(request: HttpRequest) -> HttpResponse:
+    raw = str(request.GET.get("sections") or "").strip()
+    if raw:
+        sections = sorted({x.strip() for x in raw.split(",") if x.strip()})
+        unknown = [x for x in sections if x not in SITE_BOOTSTRAP_SECTIONS]
+        if unknown or not sections:
+            return _api_error(
+                "invalid_sections",
+                status=400,
+                details={"unknown": unknown, "allowed": list(SITE_BOOTSTRAP_SECTIONS)},
+            )
+    else:
+        sections = sorted(SITE_BOOTSTRAP_SECTIONS)
+
+    def build(req: HttpRequest, site: Site) -> dict[str, Any]:
+        return {name: SITE_BOOTSTRAP_SECTIONS[name](req, site) for name in sections}
+
+    return _site_snapshot(
+        request,
+        "bootstrap",
+        build,
+        variant=",".join(sections),
+        encoding=site_snapshots.accepted_encoding(request),
     )
 
 
@@ -6153,13 +6153,78 @@ def _to_dec(raw: Any, *, allow_none: bool = True) -> Decimal | None:
         return None if allow_none else Decimal("0")
 
 
+OPS_PAGE_SIZE = 200
+OPS_PAGE_SIZE_MAX = 1000
+
+
+def _encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(raw: str, size: int) -> list[Any]:
+    padded = raw + "=" * (-len(raw) % 4)
+    values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("invalid cursor")
+    return values
+
+
+def _cursor_value(val: Any) -> Any:
+    if isinstance(val, Decimal):
+        return str(val)
+    if hasattr(val, "isoformat"):
+        return val.isoformat()
+    return val
+
+
+def _keyset_page(
+    request: HttpRequest,
+    qs: Any,
+    ordering: list[str],
+) -> tuple[list[Any], str] | JsonResponse:
+    # ordering must end with a unique key ("id"/"-id") and use non-null columns.
+    try:
+        limit = int(request.GET.get("limit") or OPS_PAGE_SIZE)
+    except ValueError:
+        limit = OPS_PAGE_SIZE
+    limit = max(1, min(limit, OPS_PAGE_SIZE_MAX))
+    qs = qs.order_by(*ordering)
+    raw = str(request.GET.get("cursor") or "").strip()
+    if raw:
+        try:
+            values = _decode_cursor(raw, len(ordering))
+        except Exception:
+            return _api_error("invalid_cursor", status=400)
+        after = Q()
+        for i, key in enumerate(ordering):
+            op = "lt" if key.startswith("-") else "gt"
+            cond = Q(**{f"{key.lstrip('-')}__{op}": values[i]})
+            for prev_key, prev_val in zip(ordering[:i], values[:i]):
+                cond &= Q(**{prev_key.lstrip("-"): prev_val})
+            after |= cond
+        qs = qs.filter(after)
+    rows = list(qs[: limit + 1])
+    next_cursor = ""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(
+            [_cursor_value(getattr(rows[-1], key.lstrip("-"))) for key in ordering]
+        )
+    return rows, next_cursor
+
+
 @require_GET
 def admin_ops_clients(request: HttpRequest) -> JsonResponse:
     forbidden = _require_ops_crm_read(request)
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    for c in Client.objects.all():
+    page = _keyset_page(request, Client.objects.all(), ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for c in rows:
         items.append(
             {
                 "id": c.id,
@@ -6172,7 +6237,7 @@ def admin_ops_clients(request: HttpRequest) -> JsonResponse:
                 "updatedAt": _to_iso(c.updated_at),
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -6285,7 +6350,11 @@ def admin_ops_suppliers(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    for s in Supplier.objects.all():
+    page = _keyset_page(request, Supplier.objects.all(), ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for s in rows:
         items.append(
             {
                 "id": s.id,
@@ -6297,7 +6366,7 @@ def admin_ops_suppliers(request: HttpRequest) -> JsonResponse:
                 "notes": s.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -6404,7 +6473,11 @@ def admin_ops_subcontractors(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    for s in Subcontractor.objects.all():
+    page = _keyset_page(request, Subcontractor.objects.all(), ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for s in rows:
         items.append(
             {
                 "id": s.id,
@@ -6416,7 +6489,7 @@ def admin_ops_subcontractors(request: HttpRequest) -> JsonResponse:
                 "notes": s.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -6528,7 +6601,11 @@ def admin_ops_contracts(request: HttpRequest) -> JsonResponse:
         return forbidden
     items: list[dict[str, Any]] = []
     qs = ProjectContract.objects.select_related("client", "project")
-    for c in qs:
+    page = _keyset_page(request, qs, ["-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for c in rows:
         items.append(
             {
                 "id": c.id,
@@ -6545,7 +6622,7 @@ def admin_ops_contracts(request: HttpRequest) -> JsonResponse:
                 "notes": c.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -6979,7 +7056,11 @@ def admin_ops_purchase_orders(request: HttpRequest) -> JsonResponse:
         return forbidden
     items: list[dict[str, Any]] = []
     qs = PurchaseOrder.objects.select_related("supplier", "project")
-    for po in qs:
+    page = _keyset_page(request, qs, ["-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for po in rows:
         items.append(
             {
                 "id": po.id,
@@ -6994,7 +7075,7 @@ def admin_ops_purchase_orders(request: HttpRequest) -> JsonResponse:
                 "notes": po.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -7147,7 +7228,11 @@ def admin_ops_inventory_items(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    for it in InventoryItem.objects.all():
+    page = _keyset_page(request, InventoryItem.objects.all(), ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for it in rows:
         items.append(
             {
                 "id": it.id,
@@ -7159,7 +7244,7 @@ def admin_ops_inventory_items(request: HttpRequest) -> JsonResponse:
                 "notes": it.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -7284,7 +7369,11 @@ def admin_ops_inventory_transactions(request: HttpRequest) -> JsonResponse:
     if item_id:
         qs = qs.filter(item_id=item_id)
     items: list[dict[str, Any]] = []
-    for t in qs:
+    page = _keyset_page(request, qs, ["-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for t in rows:
         items.append(
             {
                 "id": t.id,
@@ -7300,7 +7389,7 @@ def admin_ops_inventory_transactions(request: HttpRequest) -> JsonResponse:
                 "notes": t.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -7386,20 +7475,19 @@ def admin_ops_workers(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    user = getattr(request, "user", None)
-    role = _user_role(user)
+    role = _principal(request).role
     qs = Worker.objects.select_related("user")
     if role == "employee":
-        linked_id = 0
-        try:
-            linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-        except Exception:
-            linked_id = 0
+        linked_id = _principal(request).worker_id
         if linked_id:
             qs = qs.filter(pk=linked_id)
         else:
             qs = qs.none()
-    for w in qs.all():
+    page = _keyset_page(request, qs, ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for w in rows:
         items.append(
             {
                 "id": w.id,
@@ -7416,7 +7504,7 @@ def admin_ops_workers(request: HttpRequest) -> JsonResponse:
                 "notes": w.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -7589,16 +7677,11 @@ def admin_ops_attendance(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     qs = WorkerAttendance.objects.select_related("worker", "project")
-    user = getattr(request, "user", None)
-    role = _user_role(user)
+    role = _principal(request).role
     if role == "employee":
-        linked_id = 0
-        try:
-            linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-        except Exception:
-            linked_id = 0
+        linked_id = _principal(request).worker_id
         if not linked_id:
-            return _api_ok({"items": []})
+            return _api_ok({"items": [], "nextCursor": ""})
         qs = qs.filter(worker_id=linked_id)
     else:
         worker_id = int(request.GET.get("workerId") or 0) or None
@@ -7607,9 +7690,14 @@ def admin_ops_attendance(request: HttpRequest) -> JsonResponse:
     year = int(request.GET.get("year") or 0) or None
     month = int(request.GET.get("month") or 0) or None
     if year and month and 1 <= month <= 12:
-        qs = qs.filter(date__year=year, date__month=month)
+        start, end = payroll.month_range(year, month)
+        qs = qs.filter(date__gte=start, date__lt=end)
     items: list[dict[str, Any]] = []
-    for a in qs.order_by("-date", "-id"):
+    page = _keyset_page(request, qs, ["-date", "-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for a in rows:
         items.append(
             {
                 "id": a.id,
@@ -7628,32 +7716,196 @@ def admin_ops_attendance(request: HttpRequest) -> JsonResponse:
                 "lockedAt": a.locked_at.isoformat() if getattr(a, "locked_at", None) else "",
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
-@require_POST
-def admin_ops_attendance_create(request: HttpRequest) -> JsonResponse:
-    forbidden = _require_ops_attendance_write(request)
+@require_GET
+def admin_ops_attendance_matrix(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_attendance_read(request)
     if forbidden:
         return forbidden
-    data = _read_json(request)
-    user = getattr(request, "user", None)
-    role = _user_role(user)
-    worker_id = int(data.get("workerId") or 0) or 0
-    if role == "employee":
-        linked_id = 0
-        try:
-            linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-        except Exception:
-            linked_id = 0
+    year = int(request.GET.get("year") or 0) or 0
+    month = int(request.GET.get("month") or 0) or 0
+    if not (1900 <= year <= 2200):
+        return _api_error("invalid_year", status=400)
+    if not (1 <= month <= 12):
+        return _api_error("invalid_month", status=400)
+    qs = WorkerAttendance.objects.all()
+    if _principal(request).role == "employee":
+        linked_id = _principal(request).worker_id
         if not linked_id:
             return _api_error("forbidden", status=403)
-        worker_id = linked_id
-    w = Worker.objects.filter(pk=worker_id).first()
-    if not w:
-        return _api_error("worker_not_found", status=404)
-    try:
-        att_date = _to_date(data.get("date"))
+        qs = qs.filter(worker_id=linked_id)
+    else:
+        worker_id = int(request.GET.get("workerId") or 0) or None
+        if worker_id:
+            qs = qs.filter(worker_id=worker_id)
+    project_id = int(request.GET.get("projectId") or 0) or None
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    return _api_ok(attendance.month_matrix(qs, year, month))
+
+
+@require_GET
+def admin_ops_dashboard_project_days(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_dashboard_read(request)
+    if forbidden:
+        return forbidden
+    # Served from the (project, day) rollup; defaults to the last 30 days.
+    try:
+        date_to = _to_date(request.GET.get("dateTo")) or timezone.localdate()
+        date_from = _to_date(request.GET.get("dateFrom")) or date_to - timedelta(days=29)
+    except Exception:
+        return _api_error("invalid_date", status=400)
+    if date_to < date_from or (date_to - date_from).days >= attendance.RANGE_MAX_DAYS:
+        return _api_error("invalid_period", status=400)
+    qs = AttendanceProjectDayRollup.objects.filter(date__gte=date_from, date__lte=date_to)
+    project_id = int(request.GET.get("projectId") or 0) or None
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    projects: dict[int, str] = {}
+    items: list[dict[str, Any]] = []
+    for r in qs.order_by("date", "project_id").values(
+        "project_id", "project__title", "date", "present", "half_day", "absent", "leave", "hours"
+    ):
+        projects.setdefault(r["project_id"], r["project__title"] or "")
+        items.append(
+            {
+                "projectId": r["project_id"],
+                "date": _to_iso(r["date"]),
+                "headcount": r["present"] + r["half_day"],
+                "present": r["present"],
+                "halfDay": r["half_day"],
+                "absent": r["absent"],
+                "leave": r["leave"],
+                "hours": float(r["hours"] or 0),
+            }
+        )
+    return _api_ok(
+        {
+            "dateFrom": _to_iso(date_from),
+            "dateTo": _to_iso(date_to),
+            "projects": [{"id": pk, "title": title} for pk, title in projects.items()],
+            "items": items,
+        }
+    )
+
+
+@require_GET
+def admin_ops_dashboard_worker_months(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_dashboard_read(request)
+    if forbidden:
+        return forbidden
+    # Served from the (worker, year, month) rollup.
+    qs = AttendanceWorkerMonthRollup.objects.select_related("worker")
+    year = int(request.GET.get("year") or 0) or None
+    if year:
+        qs = qs.filter(year=year)
+    month = int(request.GET.get("month") or 0) or None
+    if month and 1 <= month <= 12:
+        qs = qs.filter(month=month)
+    worker_id = int(request.GET.get("workerId") or 0) or None
+    if worker_id:
+        qs = qs.filter(worker_id=worker_id)
+    page = _keyset_page(request, qs, ["-year", "-month", "-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    items: list[dict[str, Any]] = []
+    for r in rows:
+        items.append(
+            {
+                "workerId": r.worker_id,
+                "workerName": r.worker.name if r.worker else "",
+                "year": r.year,
+                "month": r.month,
+                "present": r.present,
+                "halfDay": r.half_day,
+                "absent": r.absent,
+                "leave": r.leave,
+                "daysWorked": r.present + r.half_day * 0.5,
+                "hours": float(r.hours or 0),
+            }
+        )
+    return _api_ok({"items": items, "nextCursor": next_cursor})
+
+
+def _require_ops_analytics(request: HttpRequest) -> Any | None:
+    # The cube is not scoped per worker, so employees never get it.
+    return _require_ops_rule(request, "ops_analytics", default_allowed_roles={"manager", "accountant"})
+
+
+# dataset -> the read permission its source table already has.
+ANALYTICS_DATASET_RULES: dict[str, Callable[[HttpRequest], Any | None]] = {
+    "attendance": _require_ops_dashboard_read,
+    "inventory": _require_ops_procurement_read,
+    "payroll": _require_ops_payroll_read,
+    "payments": _require_ops_contracts_read,
+}
+
+
+@require_GET
+def admin_ops_analytics_datasets(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_analytics(request)
+    if forbidden:
+        return forbidden
+    items = [
+        d
+        for d in analytics.describe()
+        if not ANALYTICS_DATASET_RULES[d["name"]](request)
+    ]
+    return _api_ok({"items": items, "engine": analytics.engine()})
+
+
+@require_POST
+def admin_ops_analytics_pivot(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_analytics(request)
+    if forbidden:
+        return forbidden
+    data = _read_json(request)
+    dataset = str(data.get("dataset") or "").strip()
+    check = ANALYTICS_DATASET_RULES.get(dataset)
+    if check is None:
+        return _api_error("unknown_dataset", status=400)
+    forbidden = check(request)
+    if forbidden:
+        return forbidden
+    try:
+        limit = int(data.get("limit") or analytics.DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        return _api_error("invalid_limit", status=400)
+    try:
+        result = analytics.pivot(
+            dataset,
+            group_by=data.get("groupBy"),
+            measures=data.get("measures"),
+            filters=data.get("filters"),
+            order_by=str(data.get("orderBy") or ""),
+            limit=limit,
+        )
+    except analytics.AnalyticsError as exc:
+        return _api_error(exc.code, status=400)
+    return _api_ok(result)
+
+
+@require_POST
+def admin_ops_attendance_create(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_attendance_write(request)
+    if forbidden:
+        return forbidden
+    data = _read_json(request)
+    role = _principal(request).role
+    worker_id = int(data.get("workerId") or 0) or 0
+    if role == "employee":
+        linked_id = _principal(request).worker_id
+        if not linked_id:
+            return _api_error("forbidden", status=403)
+        worker_id = linked_id
+    w = Worker.objects.filter(pk=worker_id).first()
+    if not w:
+        return _api_error("worker_not_found", status=404)
+    try:
+        att_date = _to_date(data.get("date"))
     except Exception:
         return _api_error("invalid_date", status=400)
     if not att_date:
@@ -7698,272 +7950,47 @@ def admin_ops_attendance_create(request: HttpRequest) -> JsonResponse:
     return _api_ok({"id": a.id, "created": created})
 
 
-def _process_timeclock_items(
-    items: list[Any],
-    *,
-    dry_run: bool,
-    default_project: Any,
-) -> tuple[int, int, list[dict[str, Any]], list[dict[str, Any]]]:
-    from datetime import datetime as _dt
-
-    created_count = 0
-    updated_count = 0
-    errors: list[dict[str, Any]] = []
-    item_results: list[dict[str, Any]] = []
-
-    if dry_run:
-        for idx, raw in enumerate(items):
-            if not isinstance(raw, dict):
-                errors.append({"index": idx, "error": "invalid_item"})
-                continue
-
-            worker_id = int(raw.get("workerId") or 0) or 0
-            time_clock_id = str(raw.get("timeClockId") or "").strip()
-            w = None
-            if worker_id:
-                w = Worker.objects.filter(pk=worker_id).first()
-            elif time_clock_id:
-                w = Worker.objects.filter(time_clock_id=time_clock_id).first()
-            if not w:
-                errors.append(
-                    {
-                        "index": idx,
-                        "error": "worker_not_found",
-                        "workerId": worker_id or None,
-                        "timeClockId": time_clock_id or None,
-                    }
-                )
-                continue
-
-            try:
-                att_date = _to_date(raw.get("date"))
-            except Exception:
-                errors.append({"index": idx, "error": "invalid_date"})
-                continue
-            if not att_date:
-                errors.append({"index": idx, "error": "missing_date"})
-                continue
-
-            item_project = default_project
-            if raw.get("projectId") is not None:
-                pid = int(raw.get("projectId") or 0) or None
-                if pid:
-                    item_project = ProjectPage.objects.filter(pk=pid).specific().first()
-                    if not item_project:
-                        errors.append({"index": idx, "error": "project_not_found", "projectId": pid})
-                        continue
-                else:
-                    item_project = None
-
-            hours = None
-            if raw.get("hours") is not None:
-                hours = _to_dec(raw.get("hours"), allow_none=True)
-            else:
-                check_in = str(raw.get("checkIn") or "").strip()
-                check_out = str(raw.get("checkOut") or "").strip()
-                if check_in and check_out:
-                    try:
-                        t1 = _dt.strptime(check_in, "%H:%M")
-                        t2 = _dt.strptime(check_out, "%H:%M")
-                        minutes = int((t2 - t1).total_seconds() // 60)
-                        if minutes < 0:
-                            minutes += 24 * 60
-                        hours = _to_dec(round(minutes / 60, 2), allow_none=True)
-                    except Exception:
-                        errors.append({"index": idx, "error": "invalid_time_range"})
-                        continue
-                else:
-                    check_in_at = str(raw.get("checkInAt") or "").strip()
-                    check_out_at = str(raw.get("checkOutAt") or "").strip()
-                    if check_in_at and check_out_at:
-                        try:
-                            t1s = check_in_at.replace("Z", "+00:00")
-                            t2s = check_out_at.replace("Z", "+00:00")
-                            t1 = _dt.fromisoformat(t1s)
-                            t2 = _dt.fromisoformat(t2s)
-                            minutes = int((t2 - t1).total_seconds() // 60)
-                            if minutes < 0:
-                                errors.append({"index": idx, "error": "invalid_time_range"})
-                                continue
-                            hours = _to_dec(round(minutes / 60, 2), allow_none=True)
-                        except Exception:
-                            errors.append({"index": idx, "error": "invalid_time_range"})
-                            continue
-
-            status = str(raw.get("status") or "").strip()
-            if not status and hours is None:
-                errors.append({"index": idx, "error": "missing_status_or_time"})
-                continue
-            if not status:
-                status = (
-                    WorkerAttendance.STATUS_PRESENT
-                    if (hours is not None and hours > 0)
-                    else WorkerAttendance.STATUS_ABSENT
-                )
-            allowed_status = {
-                WorkerAttendance.STATUS_PRESENT,
-                WorkerAttendance.STATUS_ABSENT,
-                WorkerAttendance.STATUS_HALF_DAY,
-                WorkerAttendance.STATUS_LEAVE,
-            }
-            if status not in allowed_status:
-                errors.append({"index": idx, "error": "invalid_status"})
-                continue
-
-            existing = WorkerAttendance.objects.filter(worker=w, date=att_date).first()
-            if existing and getattr(existing, "state", "") == WorkerAttendance.STATE_LOCKED:
-                errors.append({"index": idx, "error": "attendance_locked", "id": existing.id})
-                continue
-            created = existing is None
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-            item_results.append(
-                {
-                    "index": idx,
-                    "id": getattr(existing, "id", None),
-                    "workerId": w.id,
-                    "workerName": w.name,
-                    "date": _to_iso(att_date),
-                    "created": created,
-                    "dryRun": True,
-                }
-            )
-    else:
-        with transaction.atomic():
-            for idx, raw in enumerate(items):
-                if not isinstance(raw, dict):
-                    errors.append({"index": idx, "error": "invalid_item"})
-                    continue
-
-                worker_id = int(raw.get("workerId") or 0) or 0
-                time_clock_id = str(raw.get("timeClockId") or "").strip()
-                w = None
-                if worker_id:
-                    w = Worker.objects.filter(pk=worker_id).first()
-                elif time_clock_id:
-                    w = Worker.objects.filter(time_clock_id=time_clock_id).first()
-                if not w:
-                    errors.append(
-                        {
-                            "index": idx,
-                            "error": "worker_not_found",
-                            "workerId": worker_id or None,
-                            "timeClockId": time_clock_id or None,
-                        }
-                    )
-                    continue
-
-                try:
-                    att_date = _to_date(raw.get("date"))
-                except Exception:
-                    errors.append({"index": idx, "error": "invalid_date"})
-                    continue
-                if not att_date:
-                    errors.append({"index": idx, "error": "missing_date"})
-                    continue
-
-                item_project = default_project
-                if raw.get("projectId") is not None:
-                    pid = int(raw.get("projectId") or 0) or None
-                    if pid:
-                        item_project = ProjectPage.objects.filter(pk=pid).specific().first()
-                        if not item_project:
-                            errors.append({"index": idx, "error": "project_not_found", "projectId": pid})
-                            continue
-                    else:
-                        item_project = None
-
-                hours = None
-                if raw.get("hours") is not None:
-                    hours = _to_dec(raw.get("hours"), allow_none=True)
-                else:
-                    check_in = str(raw.get("checkIn") or "").strip()
-                    check_out = str(raw.get("checkOut") or "").strip()
-                    if check_in and check_out:
-                        try:
-                            t1 = _dt.strptime(check_in, "%H:%M")
-                            t2 = _dt.strptime(check_out, "%H:%M")
-                            minutes = int((t2 - t1).total_seconds() // 60)
-                            if minutes < 0:
-                                minutes += 24 * 60
-                            hours = _to_dec(round(minutes / 60, 2), allow_none=True)
-                        except Exception:
-                            errors.append({"index": idx, "error": "invalid_time_range"})
-                            continue
-                    else:
-                        check_in_at = str(raw.get("checkInAt") or "").strip()
-                        check_out_at = str(raw.get("checkOutAt") or "").strip()
-                        if check_in_at and check_out_at:
-                            try:
-                                t1s = check_in_at.replace("Z", "+00:00")
-                                t2s = check_out_at.replace("Z", "+00:00")
-                                t1 = _dt.fromisoformat(t1s)
-                                t2 = _dt.fromisoformat(t2s)
-                                minutes = int((t2 - t1).total_seconds() // 60)
-                                if minutes < 0:
-                                    errors.append({"index": idx, "error": "invalid_time_range"})
-                                    continue
-                                hours = _to_dec(round(minutes / 60, 2), allow_none=True)
-                            except Exception:
-                                errors.append({"index": idx, "error": "invalid_time_range"})
-                                continue
-
-                status = str(raw.get("status") or "").strip()
-                if not status and hours is None:
-                    errors.append({"index": idx, "error": "missing_status_or_time"})
-                    continue
-                if not status:
-                    status = (
-                        WorkerAttendance.STATUS_PRESENT
-                        if (hours is not None and hours > 0)
-                        else WorkerAttendance.STATUS_ABSENT
-                    )
-                allowed_status = {
-                    WorkerAttendance.STATUS_PRESENT,
-                    WorkerAttendance.STATUS_ABSENT,
-                    WorkerAttendance.STATUS_HALF_DAY,
-                    WorkerAttendance.STATUS_LEAVE,
-                }
-                if status not in allowed_status:
-                    errors.append({"index": idx, "error": "invalid_status"})
-                    continue
-
-                notes = str(raw.get("notes") or "").strip()
-                import_note = "Imported from time clock"
-
-                a = WorkerAttendance.objects.select_for_update().filter(worker=w, date=att_date).first()
-                if a and getattr(a, "state", "") == WorkerAttendance.STATE_LOCKED:
-                    errors.append({"index": idx, "error": "attendance_locked", "id": a.id})
-                    continue
-                created = a is None
-                if not a:
-                    a = WorkerAttendance(worker=w, date=att_date)
-                    created_count += 1
-                else:
-                    updated_count += 1
-                a.status = status
-                a.hours = hours
-                a.project = item_project
-                if notes:
-                    a.notes = notes
-                else:
-                    if not a.notes:
-                        a.notes = import_note
-                a.save()
-                item_results.append(
-                    {
-                        "index": idx,
-                        "id": a.id,
-                        "workerId": w.id,
-                        "workerName": w.name,
-                        "date": _to_iso(att_date),
-                        "created": created,
-                    }
-                )
-
-    return created_count, updated_count, errors, item_results
+@require_POST
+def admin_ops_attendance_grid(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_attendance_write(request)
+    if forbidden:
+        return forbidden
+    data = _read_json(request)
+    cells = data.get("cells")
+    if not isinstance(cells, list) or not cells:
+        return _api_error("missing_cells", status=400)
+    if len(cells) > attendance.GRID_MAX_CELLS:
+        return _api_error("too_many_cells", status=400)
+    only_worker_id = 0
+    if _principal(request).role == "employee":
+        only_worker_id = _principal(request).worker_id or 0
+        if not only_worker_id:
+            return _api_error("forbidden", status=403)
+    defaults = {
+        "date": data.get("date"),
+        "projectId": data.get("projectId"),
+        "status": data.get("status"),
+    }
+    dry_run = bool(data.get("dryRun"))
+    result = attendance.upsert_grid(cells, defaults=defaults, dry_run=dry_run, only_worker_id=only_worker_id)
+    if result["errors"]:
+        # Nothing was written; report every failing cell at once.
+        return _api_error("invalid_grid", status=400, details={"errors": result["errors"]})
+    if not dry_run:
+        _audit_ops(
+            request,
+            action="ops_attendance_grid_upsert",
+            entity_type="attendance",
+            entity_id=f"{result['dateFrom']}..{result['dateTo']}",
+            meta={
+                "cellCount": len(cells),
+                "workerCount": result["workerCount"],
+                "createdCount": result["createdCount"],
+                "updatedCount": result["updatedCount"],
+                "unchangedCount": result["unchangedCount"],
+            },
+        )
+    return _api_ok(result)
 
 
 @require_POST
@@ -7972,8 +7999,19 @@ def admin_ops_timeclock_import(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
 
-    data = _read_json(request)
-    raw_items = data.get("items")
+    punch_file = request.FILES.get("file") if request.content_type == "multipart/form-data" else None
+    if punch_file:
+        # Raw punch log upload (CSV/TSV or ZK attlog): pair punches into items.
+        data: dict[str, Any] = {
+            "dryRun": str(request.POST.get("dryRun") or "").lower() in {"1", "true", "yes"},
+            "defaultProjectId": request.POST.get("defaultProjectId"),
+        }
+        raw_items: Any = punch_log.items_from_lines(
+            line.decode("utf-8-sig", errors="replace") for line in punch_file
+        )
+    else:
+        data = _read_json(request)
+        raw_items = data.get("items")
     if not isinstance(raw_items, list) or not raw_items:
         return _api_error("missing_items", status=400)
     dry_run = bool(data.get("dryRun"))
@@ -7986,7 +8024,7 @@ def admin_ops_timeclock_import(request: HttpRequest) -> JsonResponse:
     if default_project_id and not default_project:
         return _api_error("default_project_not_found", status=404)
 
-    created_count, updated_count, errors, item_results = _process_timeclock_items(
+    created_count, updated_count, errors, item_results = timeclock_import.process_items(
         raw_items, dry_run=dry_run, default_project=default_project
     )
 
@@ -8000,7 +8038,7 @@ def admin_ops_timeclock_import(request: HttpRequest) -> JsonResponse:
     user = getattr(request, "user", None)
     OpsTimeclockImportRun.objects.create(
         actor=user if user and getattr(user, "is_authenticated", False) else None,
-        role=_user_role(user),
+        role=_principal(request).role,
         source=OpsTimeclockImportRun.SOURCE_MANUAL,
         dry_run=dry_run,
         default_project=default_project,
@@ -8028,6 +8066,69 @@ def admin_ops_timeclock_import(request: HttpRequest) -> JsonResponse:
     return _api_ok(payload)
 
 
+def _timeclock_stream_response(request: HttpRequest, run: OpsTimeclockImportRun) -> JsonResponse:
+    _audit_ops(
+        request,
+        action="ops_timeclock_import_folder",
+        entity_type="timeclock",
+        entity_id=f"run:{run.id}",
+        meta=timeclock_import.run_summary(run),
+    )
+    return _api_ok(
+        {
+            **timeclock_import.run_summary(run),
+            "errors": run.errors or [],
+            "results": run.results or [],
+        }
+    )
+
+
+def _wants_async(request: HttpRequest, data: dict[str, Any]) -> bool:
+    return bool(data.get("async")) or str(request.GET.get("async") or "") == "1"
+
+
+def _enqueue_job(
+    request: HttpRequest,
+    kind: str,
+    params: dict[str, Any],
+    *,
+    dedupe: bool = False,
+) -> JsonResponse:
+    user = getattr(request, "user", None)
+    job, created = jobs.enqueue(
+        kind,
+        params,
+        actor=user if user and getattr(user, "is_authenticated", False) else None,
+        role=_principal(request).role,
+        dedupe=dedupe,
+    )
+    if created:
+        _audit_ops(
+            request,
+            action="ops_job_enqueue",
+            entity_type="job",
+            entity_id=str(job.id),
+            meta={"kind": kind, "params": params},
+        )
+    return _api_ok({"job": jobs.job_payload(job), "created": created}, status=202)
+
+
+def _timeclock_folder_params(data: dict[str, Any]) -> dict[str, Any] | JsonResponse:
+    default_project_id = int(data.get("defaultProjectId") or 0) or None
+    if default_project_id and not ProjectPage.objects.filter(pk=default_project_id).exists():
+        return _api_error("default_project_not_found", status=404)
+    limit_files = int(data.get("limitFiles") or 5) or 5
+    chunk_size = int(data.get("chunkSize") or 0) or timeclock_import.STREAM_CHUNK_SIZE
+    return {
+        "dryRun": bool(data.get("dryRun")),
+        "defaultProjectId": default_project_id or 0,
+        "limitFiles": max(1, min(limit_files, 50)),
+        "chunkSize": max(1, min(chunk_size, 5000)),
+        "resumeRunId": int(data.get("resumeRunId") or 0),
+        "reimport": bool(data.get("reimport")),
+    }
+
+
 @require_POST
 def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse:
     forbidden = _require_ops_timeclock_import(request)
@@ -8035,33 +8136,44 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
         return forbidden
 
     data = _read_json(request)
-    dry_run = bool(data.get("dryRun"))
-    default_project_id = int(data.get("defaultProjectId") or 0) or None
+    params = _timeclock_folder_params(data)
+    if isinstance(params, JsonResponse):
+        return params
+    try:
+        base_dir = timeclock_import.folder_dir()
+    except timeclock_import.StreamError as exc:
+        return _api_error(exc.code, status=400 if exc.code == "timeclock_import_dir_not_set" else 404)
+    if _wants_async(request, data):
+        return _enqueue_job(request, jobs.KIND_TIMECLOCK_FOLDER_IMPORT, params, dedupe=True)
+
+    dry_run = params["dryRun"]
+    limit_files = params["limitFiles"]
     default_project = (
-        ProjectPage.objects.filter(pk=default_project_id).specific().first()
-        if default_project_id
+        ProjectPage.objects.filter(pk=params["defaultProjectId"]).specific().first()
+        if params["defaultProjectId"]
         else None
     )
-    if default_project_id and not default_project:
-        return _api_error("default_project_not_found", status=404)
 
-    limit_files = int(data.get("limitFiles") or 5) or 5
-    limit_files = max(1, min(limit_files, 50))
-
-    dir_raw = str(os.environ.get("TIME_CLOCK_IMPORT_DIR") or "").strip()
-    if not dir_raw:
-        return _api_error("timeclock_import_dir_not_set", status=400)
-    base_dir = Path(dir_raw)
-    if not base_dir.exists() or not base_dir.is_dir():
-        return _api_error("timeclock_import_dir_not_found", status=404)
-
-    candidates = [
-        p
-        for p in base_dir.iterdir()
-        if p.is_file() and p.suffix.lower() == ".json" and not p.name.startswith(".")
-    ]
-    candidates.sort(key=lambda p: p.stat().st_mtime, reverse=False)
-    selected = candidates[:limit_files]
+    resume_run_id = params["resumeRunId"] or None
+    if resume_run_id:
+        run = timeclock_import.claim_for_resume(resume_run_id)
+        if not run:
+            return _api_error("run_not_resumable", status=409)
+        return _timeclock_stream_response(request, timeclock_import.run_stream(run, base_dir))
+
+    selected = timeclock_import.list_folder_files(base_dir, limit_files, skip_imported=not params["reimport"])
+    if selected and bool(data.get("stream")):
+        user = getattr(request, "user", None)
+        run = timeclock_import.start_stream_run(
+            selected,
+            actor=user if user and getattr(user, "is_authenticated", False) else None,
+            role=_principal(request).role,
+            source=OpsTimeclockImportRun.SOURCE_FOLDER,
+            dry_run=dry_run,
+            default_project=default_project,
+            chunk_size=params["chunkSize"],
+        )
+        return _timeclock_stream_response(request, timeclock_import.run_stream(run, base_dir))
     if not selected:
         return _api_ok(
             {
@@ -8076,11 +8188,15 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
 
     all_items: list[Any] = []
     file_errors: list[dict[str, Any]] = []
+    file_items: dict[str, int] = {}
     files: list[str] = []
     for p in selected:
         files.append(p.name)
         try:
-            raw = json.loads(p.read_text(encoding="utf-8"))
+            if p.suffix.lower() in punch_log.PUNCH_SUFFIXES:
+                raw = punch_log.items_from_file(p)
+            else:
+                raw = json.loads(p.read_text(encoding="utf-8"))
         except Exception:
             file_errors.append({"file": p.name, "error": "invalid_json"})
             continue
@@ -8092,12 +8208,16 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
         if not isinstance(items, list) or not items:
             file_errors.append({"file": p.name, "error": "missing_items"})
             continue
+        file_items[p.name] = len(items)
         for it in items:
             if isinstance(it, dict) and it.get("sourceFile") is None:
                 it = {**it, "sourceFile": p.name}
             all_items.append(it)
 
     if not all_items and file_errors:
+        if not dry_run:
+            for e in file_errors:
+                timeclock_import.record_imported_file(base_dir / e["file"], run=None, items_count=0, error=e["error"])
         return _api_ok(
             {
                 "dryRun": dry_run,
@@ -8109,7 +8229,7 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
             }
         )
 
-    created_count, updated_count, errors, item_results = _process_timeclock_items(
+    created_count, updated_count, errors, item_results = timeclock_import.process_items(
         all_items, dry_run=dry_run, default_project=default_project
     )
     combined_errors = file_errors + errors
@@ -8124,9 +8244,9 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
     }
 
     user = getattr(request, "user", None)
-    OpsTimeclockImportRun.objects.create(
+    run = OpsTimeclockImportRun.objects.create(
         actor=user if user and getattr(user, "is_authenticated", False) else None,
-        role=_user_role(user),
+        role=_principal(request).role,
         source=OpsTimeclockImportRun.SOURCE_FOLDER,
         dry_run=dry_run,
         default_project=default_project,
@@ -8137,6 +8257,12 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
         errors=combined_errors[:200],
         results=item_results[:200],
     )
+    if not dry_run:
+        file_error_codes = {e["file"]: e["error"] for e in file_errors}
+        for p in selected:
+            timeclock_import.record_imported_file(
+                p, run=run, items_count=file_items.get(p.name, 0), error=file_error_codes.get(p.name, "")
+            )
     _audit_ops(
         request,
         action="ops_timeclock_import_folder",
@@ -8144,7 +8270,7 @@ def admin_ops_timeclock_import_from_folder(request: HttpRequest) -> JsonResponse
         entity_id="import_from_folder",
         meta={
             "dryRun": dry_run,
-            "defaultProjectId": default_project_id,
+            "defaultProjectId": params["defaultProjectId"] or None,
             "files": files,
             "itemsCount": len(all_items),
             "createdCount": created_count,
@@ -8163,18 +8289,14 @@ def admin_ops_attendance_update(request: HttpRequest, item_id: int) -> JsonRespo
     a = WorkerAttendance.objects.select_related("worker").filter(pk=item_id).first()
     if not a:
         return _api_error("not_found", status=404)
-    user = getattr(request, "user", None)
-    role = _user_role(user)
+    role = _principal(request).role
     if role == "employee":
-        linked_id = 0
-        try:
-            linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-        except Exception:
-            linked_id = 0
+        linked_id = _principal(request).worker_id
         if not linked_id or int(getattr(a, "worker_id", 0) or 0) != linked_id:
             return _api_error("forbidden", status=403)
     if getattr(a, "state", "") == WorkerAttendance.STATE_LOCKED:
         return _api_error("attendance_locked", status=409)
+    previous_key = (a.worker_id, a.date)
     data = _read_json(request)
     if data.get("workerId") is not None:
         worker_id = int(data.get("workerId") or 0) or 0
@@ -8213,6 +8335,9 @@ def admin_ops_attendance_update(request: HttpRequest, item_id: int) -> JsonRespo
     if data.get("notes") is not None:
         a.notes = str(data.get("notes") or "").strip()
     a.save()
+    if previous_key != (a.worker_id, a.date):
+        # The save signal covers the new key; the old one changed too.
+        attendance.changed([previous_key])
     _audit_ops(
         request,
         action="ops_attendance_update",
@@ -8230,14 +8355,9 @@ def admin_ops_attendance_delete(request: HttpRequest, item_id: int) -> JsonRespo
     a = WorkerAttendance.objects.filter(pk=item_id).first()
     if not a:
         return _api_error("not_found", status=404)
-    user = getattr(request, "user", None)
-    role = _user_role(user)
+    role = _principal(request).role
     if role == "employee":
-        linked_id = 0
-        try:
-            linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-        except Exception:
-            linked_id = 0
+        linked_id = _principal(request).worker_id
         if not linked_id or int(getattr(a, "worker_id", 0) or 0) != linked_id:
             return _api_error("forbidden", status=403)
     if getattr(a, "state", "") == WorkerAttendance.STATE_LOCKED:
@@ -8266,12 +8386,8 @@ def admin_ops_attendance_submit(request: HttpRequest, item_id: int) -> JsonRespo
         a = WorkerAttendance.objects.select_for_update().filter(pk=item_id).first()
         if not a:
             return _api_error("not_found", status=404)
-        if _user_role(user) == "employee":
-            linked_id = 0
-            try:
-                linked_id = int(Worker.objects.filter(user=user).values_list("id", flat=True).first() or 0)
-            except Exception:
-                linked_id = 0
+        if _principal(request).role == "employee":
+            linked_id = _principal(request).worker_id
             if not linked_id or int(getattr(a, "worker_id", 0) or 0) != linked_id:
                 return _api_error("forbidden", status=403)
         if getattr(a, "state", "") == WorkerAttendance.STATE_LOCKED:
@@ -8377,182 +8493,291 @@ def admin_ops_attendance_lock(request: HttpRequest, item_id: int) -> JsonRespons
     return _api_ok({"state": getattr(a, "state", "")})
 
 
-@require_POST
-def admin_ops_payroll_generate_from_attendance(request: HttpRequest) -> JsonResponse:
-    forbidden = _require_ops_rule(
-        request, "ops_payroll_generate", default_allowed_roles={"manager", "accountant"}
-    )
+# transition -> (permission rule code, default roles), as for the per-row endpoints.
+ATTENDANCE_RANGE_RULES = {
+    attendance.TRANSITION_SUBMIT: ("ops_attendance_submit", {"employee", "manager", "accountant"}),
+    attendance.TRANSITION_APPROVE: ("ops_attendance_approve", {"manager", "accountant"}),
+    attendance.TRANSITION_LOCK: ("ops_attendance_lock", {"manager", "accountant"}),
+}
+
+
+def _attendance_range_scope(request: HttpRequest, data: dict[str, Any]) -> dict[str, Any] | JsonResponse:
+    # "year" + "month", or "dateFrom" + "dateTo" (inclusive); optionally
+    # narrowed to a project and/or a list of workers.
+    year = int(data.get("year") or 0) or 0
+    month = int(data.get("month") or 0) or 0
+    if year or month:
+        if not (1900 <= year <= 2200):
+            return _api_error("invalid_year", status=400)
+        if not (1 <= month <= 12):
+            return _api_error("invalid_month", status=400)
+        start, end = payroll.month_range(year, month)
+        date_from, date_to = start, end - timedelta(days=1)
+    else:
+        try:
+            date_from = _to_date(data.get("dateFrom"))
+            date_to = _to_date(data.get("dateTo"))
+        except Exception:
+            return _api_error("invalid_date", status=400)
+        if not date_from or not date_to:
+            return _api_error("missing_period", status=400)
+        if date_to < date_from or (date_to - date_from).days >= attendance.RANGE_MAX_DAYS:
+            return _api_error("invalid_period", status=400)
+    raw_workers = data.get("workerIds")
+    worker_ids: list[int] = []
+    if raw_workers is not None:
+        if not isinstance(raw_workers, list):
+            return _api_error("invalid_worker_ids", status=400)
+        try:
+            worker_ids = sorted({int(w) for w in raw_workers if w})
+        except (TypeError, ValueError):
+            return _api_error("invalid_worker_ids", status=400)
+        if not worker_ids:
+            return _api_error("invalid_worker_ids", status=400)
+    if _principal(request).role == "employee":
+        linked_id = _principal(request).worker_id
+        if not linked_id or any(w != linked_id for w in worker_ids):
+            return _api_error("forbidden", status=403)
+        worker_ids = [linked_id]
+    return {
+        "dateFrom": date_from,
+        "dateTo": date_to,
+        "projectId": int(data.get("projectId") or 0) or 0,
+        "workerIds": worker_ids,
+    }
+
+
+def _attendance_range_transition(request: HttpRequest, transition: str) -> JsonResponse:
+    code, default_roles = ATTENDANCE_RANGE_RULES[transition]
+    forbidden = _require_ops_rule(request, code, default_allowed_roles=default_roles)
     if forbidden:
         return forbidden
-
     data = _read_json(request)
+    scope = _attendance_range_scope(request, data)
+    if isinstance(scope, JsonResponse):
+        return scope
+    qs = attendance.range_queryset(
+        date_from=scope["dateFrom"],
+        date_to=scope["dateTo"],
+        project_id=scope["projectId"],
+        worker_ids=scope["workerIds"],
+    )
     dry_run = bool(data.get("dryRun"))
+    result = attendance.transition_range(qs, transition, user=getattr(request, "user", None), dry_run=dry_run)
+    result.update(
+        dateFrom=scope["dateFrom"].isoformat(),
+        dateTo=scope["dateTo"].isoformat(),
+        projectId=scope["projectId"],
+        workerIds=scope["workerIds"],
+    )
+    if not dry_run and result["updatedCount"]:
+        _audit_ops(
+            request,
+            action=f"ops_attendance_range_{transition}",
+            entity_type="attendance",
+            entity_id=f"{result['dateFrom']}..{result['dateTo']}",
+            meta={
+                "projectId": scope["projectId"] or None,
+                "workerIds": scope["workerIds"],
+                "byState": result["byState"],
+                "updatedCount": result["updatedCount"],
+            },
+        )
+    return _api_ok(result)
+
+
+@require_POST
+def admin_ops_attendance_range_submit(request: HttpRequest) -> JsonResponse:
+    return _attendance_range_transition(request, attendance.TRANSITION_SUBMIT)
+
+
+@require_POST
+def admin_ops_attendance_range_approve(request: HttpRequest) -> JsonResponse:
+    return _attendance_range_transition(request, attendance.TRANSITION_APPROVE)
+
+
+@require_POST
+def admin_ops_attendance_range_lock(request: HttpRequest) -> JsonResponse:
+    return _attendance_range_transition(request, attendance.TRANSITION_LOCK)
+
+
+def _require_ops_payroll_generate(request: HttpRequest) -> Any | None:
+    return _require_ops_rule(
+        request, "ops_payroll_generate", default_allowed_roles={"manager", "accountant"}
+    )
+
+
+def _payroll_generate_params(data: dict[str, Any]) -> dict[str, Any] | JsonResponse:
     year = int(data.get("year") or 0) or 0
     month = int(data.get("month") or 0) or 0
-    if not (1900 <= year <= 2200):
+    incremental = bool(data.get("incremental"))
+    months_raw = data.get("months")
+    # Either one "month", or "months": a list of months or "all" for the
+    # year. Incremental runs may leave them out: every dirty period of the
+    # year, or of all time when "year" is missing too.
+    if incremental and not (year or month or months_raw is not None):
+        months: list[int] = []
+    elif not (1900 <= year <= 2200):
         return _api_error("invalid_year", status=400)
-    if not (1 <= month <= 12):
-        return _api_error("invalid_month", status=400)
-
+    elif month or (months_raw is None and not incremental):
+        if not (1 <= month <= 12):
+            return _api_error("invalid_month", status=400)
+        months = [month]
+    elif months_raw is None or months_raw == "all":
+        months = list(range(1, 13))
+    else:
+        if not isinstance(months_raw, list) or not months_raw:
+            return _api_error("invalid_months", status=400)
+        try:
+            months = sorted({int(m) for m in months_raw})
+        except (TypeError, ValueError):
+            return _api_error("invalid_months", status=400)
+        if not all(1 <= m <= 12 for m in months):
+            return _api_error("invalid_months", status=400)
     worker_id = int(data.get("workerId") or 0) or None
-    workers_qs = Worker.objects.filter(active=True)
-    if worker_id:
-        workers_qs = workers_qs.filter(pk=worker_id)
-    workers = list(workers_qs.order_by("id"))
-    if worker_id and not workers:
+    if worker_id and not Worker.objects.filter(active=True, pk=worker_id).exists():
         return _api_error("worker_not_found", status=404)
+    return {
+        "year": year,
+        "month": month,
+        "months": months,
+        "workerId": worker_id or 0,
+        "dryRun": bool(data.get("dryRun")),
+        "incremental": incremental,
+    }
 
-    attendances = (
-        WorkerAttendance.objects.filter(worker__in=workers, date__year=year, date__month=month)
-        .exclude(state=WorkerAttendance.STATE_DRAFT)
-        .values("worker_id", "status")
-        .annotate(total=Sum(1))
-    )
-    att_counts: dict[int, dict[str, int]] = {}
-    for r in attendances:
-        wid = int(r.get("worker_id") or 0)
-        status = str(r.get("status") or "")
-        total = int(r.get("total") or 0)
-        att_counts.setdefault(wid, {})[status] = total
-
-    user = getattr(request, "user", None)
-    created_count = 0
-    updated_count = 0
-    skipped_count = 0
-    errors: list[dict[str, Any]] = []
-    results: list[dict[str, Any]] = []
-
-    def _calc_amount(w: Worker) -> Decimal | None:
-        monthly = getattr(w, "monthly_salary", None)
-        if monthly is not None:
-            try:
-                return Decimal(str(monthly))
-            except Exception:
-                return None
-        daily = getattr(w, "daily_cost", None)
-        if daily is None:
-            return None
-        try:
-            daily_dec = Decimal(str(daily))
-        except Exception:
-            return None
-        counts = att_counts.get(w.id, {})
-        present = Decimal(str(counts.get(WorkerAttendance.STATUS_PRESENT, 0)))
-        half = Decimal(str(counts.get(WorkerAttendance.STATUS_HALF_DAY, 0)))
-        return daily_dec * (present + (half * Decimal("0.5")))
 
-    with transaction.atomic():
-        for w in workers:
-            amount = _calc_amount(w)
-            counts = att_counts.get(w.id, {})
-            if amount is None:
-                errors.append({"workerId": w.id, "error": "missing_rate"})
-                continue
-            amount = max(Decimal("0"), amount)
-            existing = WorkerPayrollEntry.objects.select_for_update().filter(
-                worker=w,
-                year=year,
-                month=month,
-                kind=WorkerPayrollEntry.KIND_SALARY,
-                source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
-            ).first()
-            if existing and getattr(existing, "status", "") != WorkerPayrollEntry.STATUS_DRAFT:
-                skipped_count += 1
-                results.append(
-                    {
-                        "workerId": w.id,
-                        "workerName": w.name,
-                        "status": "skipped",
-                        "reason": "not_draft",
-                        "entryId": existing.id,
-                        "amount": float(existing.amount or 0) if existing.amount is not None else None,
-                    }
-                )
-                continue
+@require_POST
+def admin_ops_payroll_generate_from_attendance(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_payroll_generate(request)
+    if forbidden:
+        return forbidden
 
-            if dry_run:
-                results.append(
-                    {
-                        "workerId": w.id,
-                        "workerName": w.name,
-                        "status": "would_update" if existing else "would_create",
-                        "entryId": existing.id if existing else 0,
-                        "amount": float(amount),
-                        "attendance": counts,
-                    }
-                )
-                continue
+    data = _read_json(request)
+    params = _payroll_generate_params(data)
+    if isinstance(params, JsonResponse):
+        return params
+    if _wants_async(request, data):
+        return _enqueue_job(request, jobs.KIND_PAYROLL_GENERATE, params, dedupe=True)
 
-            if existing:
-                existing.amount = amount
-                existing.date = existing.date or timezone.localdate()
-                existing.notes = str(existing.notes or "") or "Generated from attendance"
-                existing.source_meta = {"attendance": counts}
-                existing.save(update_fields=["amount", "date", "notes", "source_meta", "updated_at"])
-                updated_count += 1
-                results.append(
-                    {
-                        "workerId": w.id,
-                        "workerName": w.name,
-                        "status": "updated",
-                        "entryId": existing.id,
-                        "amount": float(amount),
-                        "attendance": counts,
-                    }
-                )
-            else:
-                entry = WorkerPayrollEntry.objects.create(
-                    worker=w,
-                    year=year,
-                    month=month,
-                    kind=WorkerPayrollEntry.KIND_SALARY,
-                    amount=amount,
-                    date=timezone.localdate(),
-                    notes="Generated from attendance",
-                    source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
-                    source_meta={"attendance": counts},
-                    status=WorkerPayrollEntry.STATUS_DRAFT,
-                )
-                created_count += 1
-                results.append(
-                    {
-                        "workerId": w.id,
-                        "workerName": w.name,
-                        "status": "created",
-                        "entryId": entry.id,
-                        "amount": float(amount),
-                        "attendance": counts,
-                    }
-                )
+    result = payroll.generate_from_params(params)
 
+    user = getattr(request, "user", None)
     _audit_ops(
         request,
         action="ops_payroll_generate_from_attendance",
         entity_type="payroll",
-        entity_id=f"{year}-{month}",
+        entity_id=payroll.params_label(params),
         meta={
-            "dryRun": dry_run,
-            "workerId": worker_id or 0,
-            "createdCount": created_count,
-            "updatedCount": updated_count,
-            "skippedCount": skipped_count,
-            "errorCount": len(errors),
+            "dryRun": params["dryRun"],
+            "incremental": params["incremental"],
+            "workerId": params["workerId"],
+            "createdCount": result["createdCount"],
+            "updatedCount": result["updatedCount"],
+            "skippedCount": result["skippedCount"],
+            "errorCount": len(result["errors"]),
             "actorId": getattr(user, "id", None),
         },
     )
-    return _api_ok(
-        {
-            "dryRun": dry_run,
-            "year": year,
-            "month": month,
-            "workerId": worker_id or 0,
-            "createdCount": created_count,
-            "updatedCount": updated_count,
-            "skippedCount": skipped_count,
-            "errors": errors,
-            "results": results,
-        }
+    return _api_ok(result)
+
+
+def _require_ops_payroll_close(request: HttpRequest) -> Any | None:
+    return _require_ops_rule(request, "ops_payroll_close", default_allowed_roles={"manager", "accountant"})
+
+
+@require_POST
+def admin_ops_payroll_close(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_ops_payroll_close(request)
+    if forbidden:
+        return forbidden
+    data = _read_json(request)
+    year = int(data.get("year") or 0) or 0
+    month = int(data.get("month") or 0) or 0
+    if not (1900 <= year <= 2200):
+        return _api_error("invalid_year", status=400)
+    if not (1 <= month <= 12):
+        return _api_error("invalid_month", status=400)
+    dry_run = bool(data.get("dryRun"))
+    result = payroll.close_period(
+        year,
+        month,
+        user=getattr(request, "user", None),
+        mark_paid=bool(data.get("markPaid")),
+        allow_pending=bool(data.get("allowPending")),
+        dry_run=dry_run,
     )
+    if result["blocked"] and not dry_run:
+        return _api_error("attendance_pending", status=409, details=result["attendance"])
+    if not dry_run:
+        _audit_ops(
+            request,
+            action="ops_payroll_close",
+            entity_type="payroll",
+            entity_id=f"{year}-{month}",
+            meta={
+                "markPaid": result["markPaid"],
+                "lockedAttendance": result["attendance"]["lockedCount"],
+                "pendingAttendance": result["attendance"]["pendingCount"],
+                "createdCount": result["generation"]["createdCount"],
+                "updatedCount": result["generation"]["updatedCount"],
+                "errorCount": len(result["generation"]["errors"]),
+                "approvedCount": result["entries"]["approvedCount"],
+                "paidCount": result["entries"]["paidCount"],
+                "totals": result["totals"],
+            },
+        )
+    return _api_ok(result)
+
+
+@require_GET
+def admin_ops_payroll_dirty(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_accounting(request)
+    if forbidden:
+        return forbidden
+    year = int(request.GET.get("year") or 0) or 0
+    month = int(request.GET.get("month") or 0) or 0
+    worker_id = int(request.GET.get("workerId") or 0) or 0
+    qs = payroll.dirty_queryset(
+        year=year, months=[month] if 1 <= month <= 12 else None, worker_id=worker_id
+    ).select_related("worker")
+    page = _keyset_page(request, qs, ["-year", "-month", "-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    # The auto salary entry each stale period would refresh, if any.
+    entries: dict[tuple[int, int, int], WorkerPayrollEntry] = {}
+    if rows:
+        entry_qs = WorkerPayrollEntry.objects.filter(
+            worker_id__in={d.worker_id for d in rows},
+            year__in={d.year for d in rows},
+            month__in={d.month for d in rows},
+            kind=WorkerPayrollEntry.KIND_SALARY,
+            source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
+        ).order_by("id")
+        entries = {(e.worker_id, e.year, e.month): e for e in entry_qs}
+    items: list[dict[str, Any]] = []
+    for d in rows:
+        entry = entries.get((d.worker_id, d.year, d.month))
+        items.append(
+            {
+                "workerId": d.worker_id,
+                "workerName": d.worker.name if d.worker else "",
+                "workerActive": bool(getattr(d.worker, "active", False)),
+                "year": d.year,
+                "month": d.month,
+                "markedAt": d.marked_at.isoformat() if d.marked_at else "",
+                "entryId": entry.id if entry else 0,
+                "entryStatus": getattr(entry, "status", "") if entry else "",
+            }
+        )
+    out: dict[str, Any] = {"items": items, "nextCursor": next_cursor}
+    if not request.GET.get("cursor"):
+        out["periods"] = [
+            {"year": int(r["year"]), "month": int(r["month"]), "count": int(r["total"])}
+            for r in qs.order_by().values("year", "month").annotate(total=Count("id")).order_by("-year", "-month")
+        ]
+    return _api_ok(out)
 
 
 @require_GET
@@ -8571,7 +8796,11 @@ def admin_ops_payroll(request: HttpRequest) -> JsonResponse:
     if month and 1 <= month <= 12:
         qs = qs.filter(month=month)
     items: list[dict[str, Any]] = []
-    for p in qs.order_by("-year", "-month", "-id"):
+    page = _keyset_page(request, qs, ["-year", "-month", "-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for p in rows:
         items.append(
             {
                 "id": p.id,
@@ -8585,7 +8814,7 @@ def admin_ops_payroll(request: HttpRequest) -> JsonResponse:
                 "notes": p.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -8709,7 +8938,11 @@ def admin_ops_equipment(request: HttpRequest) -> JsonResponse:
     if forbidden:
         return forbidden
     items: list[dict[str, Any]] = []
-    for e in Equipment.objects.all():
+    page = _keyset_page(request, Equipment.objects.all(), ["name", "id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for e in rows:
         items.append(
             {
                 "id": e.id,
@@ -8720,7 +8953,7 @@ def admin_ops_equipment(request: HttpRequest) -> JsonResponse:
                 "notes": e.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -8792,7 +9025,11 @@ def admin_ops_assignments(request: HttpRequest) -> JsonResponse:
     qs = ResourceAssignment.objects.select_related(
         "project", "worker", "equipment"
     )
-    for a in qs:
+    page = _keyset_page(request, qs, ["-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    for a in rows:
         items.append(
             {
                 "id": a.id,
@@ -8810,7 +9047,7 @@ def admin_ops_assignments(request: HttpRequest) -> JsonResponse:
                 "notes": a.notes,
             }
         )
-    return _api_ok({"items": items})
+    return _api_ok({"items": items, "nextCursor": next_cursor})
 
 
 @require_POST
@@ -8987,6 +9224,7 @@ def admin_ops_permission_rules(request: HttpRequest) -> JsonResponse:
         "ops_workers_write",
         "ops_attendance_write",
         "ops_timeclock_import",
+        "ops_analytics",
         "ops_equipment_write",
         "ops_assignments_write",
         "accounting",
@@ -9037,7 +9275,7 @@ def admin_ops_permission_rules_update(request: HttpRequest) -> JsonResponse:
     rule, _ = OpsPermissionRule.objects.update_or_create(
         code=code, defaults={"allowed_roles": cleaned}
     )
-    cache.delete(f"ops_perm_rule:{code}")
+    permission_rules.bump_version()
     _audit_ops(
         request,
         action="ops_permissions_update",
@@ -9048,6 +9286,30 @@ def admin_ops_permission_rules_update(request: HttpRequest) -> JsonResponse:
     return _api_ok({"code": rule.code, "allowedRoles": rule.allowed_roles})
 
 
+@require_GET
+def admin_rate_limits(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_superuser(request)
+    if forbidden:
+        return forbidden
+    try:
+        items = ratelimit.scope_stats()
+    except Exception:
+        return _api_error("rate_limit_backend_unavailable", status=503)
+    return _api_ok({"items": items})
+
+
+@require_POST
+def admin_rate_limits_reset(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_superuser(request)
+    if forbidden:
+        return forbidden
+    try:
+        ratelimit.get_backend().reset_stats()
+    except Exception:
+        return _api_error("rate_limit_backend_unavailable", status=503)
+    return _api_ok()
+
+
 @require_GET
 def admin_ops_timeclock_runs(request: HttpRequest) -> JsonResponse:
     forbidden = _require_ops_timeclock_import(request)
@@ -9073,11 +9335,120 @@ def admin_ops_timeclock_runs(request: HttpRequest) -> JsonResponse:
                 "createdCount": int(r.created_count or 0),
                 "updatedCount": int(r.updated_count or 0),
                 "errorCount": int(r.error_count or 0),
+                "status": r.status,
+                "processedCount": int(r.processed_count or 0),
+                "lastError": r.last_error,
+                "finishedAt": r.finished_at.isoformat() if r.finished_at else "",
             }
         )
     return _api_ok({"items": items})
 
 
+def _no_job_params(data: dict[str, Any]) -> dict[str, Any] | JsonResponse:
+    return {}
+
+
+# kind -> (permission check, params parser). Reading, cancelling and
+# downloading a job need the same permission as queueing it.
+OPS_JOB_KINDS: dict[str, tuple[Callable[[HttpRequest], Any | None], Callable[[dict[str, Any]], Any]]] = {
+    jobs.KIND_TIMECLOCK_FOLDER_IMPORT: (_require_ops_timeclock_import, _timeclock_folder_params),
+    jobs.KIND_PAYROLL_GENERATE: (_require_ops_payroll_generate, _payroll_generate_params),
+    jobs.KIND_BACKUP_EXPORT: (_require_superuser, _no_job_params),
+    jobs.KIND_MEDIA_EXPORT: (_require_superuser, _no_job_params),
+}
+
+
+def _get_ops_job(request: HttpRequest, job_id: int) -> OpsJob | JsonResponse:
+    forbidden = _require_staff(request)
+    if forbidden:
+        return forbidden
+    job = OpsJob.objects.filter(pk=job_id).first()
+    if not job or job.kind not in OPS_JOB_KINDS:
+        return _api_error("not_found", status=404)
+    forbidden = OPS_JOB_KINDS[job.kind][0](request)
+    if forbidden:
+        return forbidden
+    if job.actor_id != getattr(request.user, "id", None) and not _principal(request).is_superuser:
+        return _api_error("forbidden", status=403)
+    return job
+
+
+@require_GET
+def admin_ops_jobs(request: HttpRequest) -> JsonResponse:
+    forbidden = _require_staff(request)
+    if forbidden:
+        return forbidden
+    qs = OpsJob.objects.all()
+    if not _principal(request).is_superuser:
+        qs = qs.filter(actor_id=getattr(request.user, "id", None))
+    kind = str(request.GET.get("kind") or "").strip()
+    if kind:
+        qs = qs.filter(kind=kind)
+    status = str(request.GET.get("status") or "").strip()
+    if status:
+        qs = qs.filter(status=status)
+    page = _keyset_page(request, qs, ["-id"])
+    if isinstance(page, JsonResponse):
+        return page
+    rows, next_cursor = page
+    return _api_ok({"items": [jobs.job_payload(j) for j in rows], "nextCursor": next_cursor})
+
+
+@require_POST
+def admin_ops_jobs_enqueue(request: HttpRequest) -> JsonResponse:
+    data = _read_json(request)
+    kind = str(data.get("kind") or "").strip()
+    if kind not in OPS_JOB_KINDS:
+        forbidden = _require_staff(request)
+        return forbidden or _api_error("invalid_kind", status=400)
+    permission, parse_params = OPS_JOB_KINDS[kind]
+    forbidden = permission(request)
+    if forbidden:
+        return forbidden
+    raw_params = data.get("params")
+    params = parse_params(raw_params if isinstance(raw_params, dict) else {})
+    if isinstance(params, JsonResponse):
+        return params
+    return _enqueue_job(request, kind, params, dedupe=True)
+
+
+@require_GET
+def admin_ops_job(request: HttpRequest, job_id: int) -> JsonResponse:
+    job = _get_ops_job(request, job_id)
+    if isinstance(job, JsonResponse):
+        return job
+    return _api_ok({"job": jobs.job_payload(job)})
+
+
+@require_POST
+def admin_ops_job_cancel(request: HttpRequest, job_id: int) -> JsonResponse:
+    job = _get_ops_job(request, job_id)
+    if isinstance(job, JsonResponse):
+        return job
+    if job.status not in OpsJob.ACTIVE_STATUSES:
+        return _api_error("job_finished", status=409)
+    job = jobs.cancel(job.id) or job
+    _audit_ops(request, action="ops_job_cancel", entity_type="job", entity_id=str(job.id), meta={"kind": job.kind})
+    return _api_ok({"job": jobs.job_payload(job)})
+
+
+@require_GET
+def admin_ops_job_download(request: HttpRequest, job_id: int) -> HttpResponse | JsonResponse:
+    job = _get_ops_job(request, job_id)
+    if isinstance(job, JsonResponse):
+        return job
+    path = Path(job.output_path) if job.output_path else None
+    if job.status != OpsJob.STATUS_SUCCEEDED or path is None or not path.is_file():
+        return _api_error("output_not_available", status=404)
+    result = job.result or {}
+    return FileResponse(
+        path.open("rb"),
+        as_attachment=True,
+        filename=str(result.get("filename") or path.name),
+        content_type=str(result.get("contentType") or "application/octet-stream"),
+    )
+
+
 @require_GET
 def admin_kpi_projects(request: HttpRequest) -> JsonResponse:
     forbidden = _require_projects_management(request)
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class WebsiteConfig(AppConfig):
     name = "website"
+
+    def ready(self):
+        from website import attendance
+        from website import site_snapshots
+
+        site_snapshots.connect_signals()
+        attendance.connect_signals()
@@ -0,0 +1,405 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from decimal import InvalidOperation
+from typing import Any
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.functions import ExtractMonth
+from django.db.models.functions import ExtractYear
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from website import payroll
+from website import rollups
+from website.models import ProjectPage
+from website.models import Worker
+from website.models import WorkerAttendance
+
+
+GRID_MAX_CELLS = 5000
+WRITE_BATCH_SIZE = 500
+ALLOWED_STATUSES = {
+    WorkerAttendance.STATUS_PRESENT,
+    WorkerAttendance.STATUS_ABSENT,
+    WorkerAttendance.STATUS_HALF_DAY,
+    WorkerAttendance.STATUS_LEAVE,
+}
+MAX_HOURS = Decimal("24")
+
+
+def changed(keys: Iterable[tuple[int, date]]) -> None:
+    """
+    Record that attendance of these (worker id, date) keys was written or
+    deleted: marks the payroll periods dirty and refreshes the rollups
+    after commit. Model signals call this for single-row saves; bulk
+    writers (``bulk_create``, ``bulk_update``) call it themselves.
+    """
+    keys = list(keys)
+    payroll.mark_dirty(keys)
+    rollups.refresh_later(keys)
+
+
+def _on_attendance_change(sender: Any, instance: WorkerAttendance, **kwargs: Any) -> None:
+    changed([(instance.worker_id, instance.date)])
+
+
+def connect_signals() -> None:
+    post_save.connect(_on_attendance_change, sender=WorkerAttendance, dispatch_uid="attendance:save")
+    post_delete.connect(_on_attendance_change, sender=WorkerAttendance, dispatch_uid="attendance:delete")
+
+
+@dataclass
+class GridCell:
+    index: int
+    worker_id: int
+    date: date
+    status: str
+    hours: Decimal | None
+    project_id: int | None
+    notes: str | None
+
+
+def _int(raw: Any) -> int:
+    try:
+        return int(raw or 0) or 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _parse_cell(index: int, raw: Any, defaults: dict[str, Any]) -> GridCell | dict[str, Any]:
+    if not isinstance(raw, dict):
+        return {"index": index, "error": "invalid_cell"}
+    worker_id = _int(raw.get("workerId"))
+    if not worker_id:
+        return {"index": index, "error": "missing_worker"}
+    raw_date = raw.get("date") if raw.get("date") is not None else defaults.get("date")
+    try:
+        att_date = date.fromisoformat(str(raw_date or "").strip()) if raw_date else None
+    except ValueError:
+        return {"index": index, "error": "invalid_date", "workerId": worker_id}
+    if att_date is None:
+        return {"index": index, "error": "missing_date", "workerId": worker_id}
+    status = str(raw.get("status") or defaults.get("status") or WorkerAttendance.STATUS_PRESENT).strip()
+    if status not in ALLOWED_STATUSES:
+        return {"index": index, "error": "invalid_status", "workerId": worker_id}
+    hours = None
+    if raw.get("hours") not in {"", None}:
+        try:
+            hours = Decimal(str(raw.get("hours")))
+        except InvalidOperation:
+            hours = None
+        if hours is None or not hours.is_finite() or not (0 <= hours <= MAX_HOURS):
+            return {"index": index, "error": "invalid_hours", "workerId": worker_id}
+        hours = hours.quantize(Decimal("0.01"))
+    project_raw = raw.get("projectId") if "projectId" in raw else defaults.get("projectId")
+    notes = raw.get("notes")
+    return GridCell(
+        index=index,
+        worker_id=worker_id,
+        date=att_date,
+        status=status,
+        hours=hours,
+        project_id=_int(project_raw) or None,
+        notes=str(notes).strip() if notes is not None else None,
+    )
+
+
+def upsert_grid(
+    cells: list[Any],
+    *,
+    defaults: dict[str, Any],
+    dry_run: bool,
+    only_worker_id: int = 0,
+) -> dict[str, Any]:
+    """
+    Validate a grid of attendance cells and upsert it in one transaction.
+
+    Every cell is checked first (worker, date, status, hours, project,
+    duplicates, locked rows); if any cell fails nothing is written and the
+    errors are returned. Otherwise the grid is applied with one
+    bulk_create and one bulk_update. ``defaults`` supplies ``date``,
+    ``projectId`` and ``status`` for cells that leave them out, and
+    ``only_worker_id`` restricts the grid to one worker (employees).
+    """
+    parsed: list[GridCell] = []
+    errors: list[dict[str, Any]] = []
+    seen: dict[tuple[int, date], int] = {}
+    for index, raw in enumerate(cells):
+        cell = _parse_cell(index, raw, defaults)
+        if isinstance(cell, dict):
+            errors.append(cell)
+            continue
+        if only_worker_id and cell.worker_id != only_worker_id:
+            errors.append({"index": index, "error": "forbidden", "workerId": cell.worker_id})
+            continue
+        key = (cell.worker_id, cell.date)
+        if key in seen:
+            errors.append({"index": index, "error": "duplicate_cell", "duplicateOf": seen[key]})
+            continue
+        seen[key] = index
+        parsed.append(cell)
+
+    worker_ids = {c.worker_id for c in parsed}
+    known_workers = (
+        set(Worker.objects.filter(pk__in=worker_ids).values_list("id", flat=True)) if worker_ids else set()
+    )
+    project_ids = {c.project_id for c in parsed if c.project_id}
+    known_projects = (
+        set(ProjectPage.objects.filter(pk__in=project_ids).values_list("pk", flat=True)) if project_ids else set()
+    )
+    valid: list[GridCell] = []
+    for c in parsed:
+        if c.worker_id not in known_workers:
+            errors.append({"index": c.index, "error": "worker_not_found", "workerId": c.worker_id})
+        elif c.project_id and c.project_id not in known_projects:
+            errors.append({"index": c.index, "error": "project_not_found", "projectId": c.project_id})
+        else:
+            valid.append(c)
+
+    created_count = 0
+    updated_count = 0
+    unchanged_count = 0
+    results: list[dict[str, Any]] = []
+    with transaction.atomic():
+        qs = WorkerAttendance.objects.filter(
+            worker_id__in={c.worker_id for c in valid},
+            date__in={c.date for c in valid},
+        )
+        if not dry_run:
+            qs = qs.select_for_update()
+        rows = {(a.worker_id, a.date): a for a in qs} if valid else {}
+        for c in valid:
+            row = rows.get((c.worker_id, c.date))
+            if row is not None and row.state == WorkerAttendance.STATE_LOCKED:
+                errors.append({"index": c.index, "error": "attendance_locked", "id": row.id})
+        if errors:
+            errors.sort(key=lambda e: e["index"])
+            return {"dryRun": dry_run, "errors": errors}
+
+        to_create: list[tuple[dict[str, Any], WorkerAttendance]] = []
+        to_update: list[WorkerAttendance] = []
+        now = timezone.now()
+        for c in valid:
+            row = rows.get((c.worker_id, c.date))
+            result = {"index": c.index, "id": 0, "workerId": c.worker_id, "date": c.date.isoformat()}
+            if row is None:
+                row = WorkerAttendance(
+                    worker_id=c.worker_id,
+                    date=c.date,
+                    status=c.status,
+                    hours=c.hours,
+                    project_id=c.project_id,
+                    notes=c.notes or "",
+                )
+                result["status"] = "created"
+                to_create.append((result, row))
+                created_count += 1
+                results.append(result)
+                continue
+            result["id"] = row.id
+            notes = c.notes if c.notes is not None else row.notes
+            if (c.status, c.hours, c.project_id, notes) == (row.status, row.hours, row.project_id, row.notes):
+                result["status"] = "unchanged"
+                unchanged_count += 1
+            else:
+                row.status = c.status
+                row.hours = c.hours
+                row.project_id = c.project_id
+                row.notes = notes
+                row.updated_at = now
+                to_update.append(row)
+                result["status"] = "updated"
+                updated_count += 1
+            results.append(result)
+
+        if not dry_run:
+            if to_create:
+                WorkerAttendance.objects.bulk_create([r for _res, r in to_create], batch_size=WRITE_BATCH_SIZE)
+                for result, row in to_create:
+                    result["id"] = row.id
+            if to_update:
+                WorkerAttendance.objects.bulk_update(
+                    to_update,
+                    ["status", "hours", "project", "notes", "updated_at"],
+                    batch_size=WRITE_BATCH_SIZE,
+                )
+            # Bulk writes send no model signals.
+            changed((r.worker_id, r.date) for r in [*(r for _res, r in to_create), *to_update])
+
+    dates = sorted({c.date for c in valid})
+    return {
+        "dryRun": dry_run,
+        "createdCount": created_count,
+        "updatedCount": updated_count,
+        "unchangedCount": unchanged_count,
+        "workerCount": len({c.worker_id for c in valid}),
+        "dateFrom": dates[0].isoformat() if dates else "",
+        "dateTo": dates[-1].isoformat() if dates else "",
+        "errors": [],
+        "results": results,
+    }
+
+
+# Range state transitions
+
+TRANSITION_SUBMIT = "submit"
+TRANSITION_APPROVE = "approve"
+TRANSITION_LOCK = "lock"
+# transition -> (states it applies to, resulting state); matches the
+# per-row endpoints, except that approving an approved row is a no-op here.
+TRANSITIONS = {
+    TRANSITION_SUBMIT: ((WorkerAttendance.STATE_DRAFT,), WorkerAttendance.STATE_REVIEW),
+    TRANSITION_APPROVE: (
+        (WorkerAttendance.STATE_DRAFT, WorkerAttendance.STATE_REVIEW),
+        WorkerAttendance.STATE_APPROVED,
+    ),
+    TRANSITION_LOCK: ((WorkerAttendance.STATE_APPROVED,), WorkerAttendance.STATE_LOCKED),
+}
+RANGE_MAX_DAYS = 366
+
+
+def range_queryset(
+    *,
+    date_from: date,
+    date_to: date,
+    project_id: int = 0,
+    worker_ids: list[int] | None = None,
+) -> Any:
+    # Inclusive date range; the (date, id) index serves it.
+    qs = WorkerAttendance.objects.filter(date__gte=date_from, date__lte=date_to)
+    if project_id:
+        qs = qs.filter(project_id=project_id)
+    if worker_ids:
+        qs = qs.filter(worker_id__in=worker_ids)
+    return qs
+
+
+def transition_range(qs: Any, transition: str, *, user: Any, dry_run: bool) -> dict[str, Any]:
+    """
+    Move every row of ``qs`` in one of the transition's source states to
+    its target state with a single conditional UPDATE. Returns the state
+    counts found in the range and the number of rows changed.
+    """
+    from_states, to_state = TRANSITIONS[transition]
+    with transaction.atomic():
+        by_state = {
+            str(r["state"]): int(r["total"])
+            for r in qs.order_by().values("state").annotate(total=Count("id"))
+        }
+        matched = sum(by_state.get(s, 0) for s in from_states)
+        updated = 0
+        if not dry_run and matched:
+            # Draft rows do not count towards payroll; once they leave draft
+            # their periods need recomputing.
+            if WorkerAttendance.STATE_DRAFT in from_states and by_state.get(WorkerAttendance.STATE_DRAFT):
+                payroll.mark_dirty(
+                    (w, date(y, m, 1))
+                    for w, y, m in qs.filter(state=WorkerAttendance.STATE_DRAFT)
+                    .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+                    .values_list("worker_id", "year", "month")
+                    .distinct()
+                )
+            now = timezone.now()
+            changes: dict[str, Any] = {"state": to_state, "updated_at": now}
+            actor = user if user is not None and getattr(user, "is_authenticated", False) else None
+            if to_state == WorkerAttendance.STATE_APPROVED:
+                changes.update(approved_by=actor, approved_at=now)
+            elif to_state == WorkerAttendance.STATE_LOCKED:
+                changes.update(locked_by=actor, locked_at=now)
+            updated = qs.filter(state__in=from_states).update(**changes)
+    return {
+        "transition": transition,
+        "dryRun": dry_run,
+        "fromStates": list(from_states),
+        "toState": to_state,
+        "byState": by_state,
+        "matchedCount": matched,
+        "updatedCount": updated,
+        "totalCount": sum(by_state.values()),
+    }
+
+
+# Monthly matrix
+
+# Cell codes are 1-based indexes into these lists; 0 means no row.
+MATRIX_STATUSES = [
+    WorkerAttendance.STATUS_PRESENT,
+    WorkerAttendance.STATUS_ABSENT,
+    WorkerAttendance.STATUS_HALF_DAY,
+    WorkerAttendance.STATUS_LEAVE,
+]
+MATRIX_STATES = [
+    WorkerAttendance.STATE_DRAFT,
+    WorkerAttendance.STATE_REVIEW,
+    WorkerAttendance.STATE_APPROVED,
+    WorkerAttendance.STATE_LOCKED,
+]
+
+
+def month_matrix(qs: Any, year: int, month: int) -> dict[str, Any]:
+    """
+    The month of ``qs`` as a workers x days sheet from one values_list
+    query. Workers and projects are dictionary-encoded; ``status``,
+    ``state``, ``hours``, ``project`` and ``id`` are dense per-worker rows
+    with one slot per day (``project`` holds 1-based indexes into
+    ``projects``).
+    """
+    start, end = payroll.month_range(year, month)
+    days = (end - start).days
+    status_code = {s: i + 1 for i, s in enumerate(MATRIX_STATUSES)}
+    state_code = {s: i + 1 for i, s in enumerate(MATRIX_STATES)}
+    rows = (
+        qs.filter(date__gte=start, date__lt=end)
+        .order_by("worker__name", "worker_id", "date")
+        .values_list(
+            "id", "worker_id", "worker__name", "project_id", "project__title", "date", "status", "state", "hours"
+        )
+    )
+    workers: list[dict[str, Any]] = []
+    projects: list[dict[str, Any]] = []
+    project_index: dict[int, int] = {}
+    ids: list[list[int]] = []
+    status: list[list[int]] = []
+    state: list[list[int]] = []
+    hours: list[list[float | None]] = []
+    project: list[list[int]] = []
+    current = 0
+    for pk, worker_id, worker_name, project_id, project_title, day, st, sta, hrs in rows:
+        if worker_id != current:
+            current = worker_id
+            workers.append({"id": worker_id, "name": worker_name or ""})
+            ids.append([0] * days)
+            status.append([0] * days)
+            state.append([0] * days)
+            hours.append([None] * days)
+            project.append([0] * days)
+        d = day.day - 1
+        ids[-1][d] = pk
+        status[-1][d] = status_code.get(st, 0)
+        state[-1][d] = state_code.get(sta, 0)
+        hours[-1][d] = float(hrs) if hrs is not None else None
+        if project_id:
+            if project_id not in project_index:
+                projects.append({"id": project_id, "title": project_title or ""})
+                project_index[project_id] = len(projects)
+            project[-1][d] = project_index[project_id]
+    return {
+        "year": year,
+        "month": month,
+        "days": days,
+        "statuses": MATRIX_STATUSES,
+        "states": MATRIX_STATES,
+        "workers": workers,
+        "projects": projects,
+        "id": ids,
+        "status": status,
+        "state": state,
+        "hours": hours,
+        "project": project,
+    }
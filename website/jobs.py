@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from typing import Callable
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from website import payroll
+from website import timeclock_import
+from website.models import OpsAuditLog
+from website.models import OpsJob
+from website.models import OpsTimeclockImportRun
+from website.models import ProjectPage
+
+
+logger = logging.getLogger(__name__)
+
+KIND_TIMECLOCK_FOLDER_IMPORT = "timeclock_folder_import"
+KIND_PAYROLL_GENERATE = "payroll_generate"
+KIND_BACKUP_EXPORT = "backup_export"
+KIND_MEDIA_EXPORT = "media_export"
+
+HEARTBEAT_SECONDS = 10
+BACKUP_APPS = ["website", "wagtailcore", "wagtailimages", "wagtaildocs", "coderedcms", "taggit", "auth"]
+BACKUP_EXCLUDE = ["contenttypes", "admin.logentry", "sessions"]
+
+
+class JobError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class JobCancelled(Exception):
+    pass
+
+
+def _stale_seconds() -> int:
+    return int(getattr(settings, "OPS_JOBS_STALE_SECONDS", 300) or 300)
+
+
+def _output_ttl_seconds() -> int:
+    return int(getattr(settings, "OPS_JOBS_OUTPUT_TTL", 86400) or 86400)
+
+
+def output_dir() -> Path:
+    path = Path(getattr(settings, "OPS_JOBS_OUTPUT_DIR", "") or Path(settings.BASE_DIR) / "cache" / "jobs")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+@dataclass
+class JobContext:
+    job: OpsJob
+    cancel_event: threading.Event
+
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def set_progress(self, **progress: Any) -> None:
+        self.job.progress = {**(self.job.progress or {}), **progress}
+        now = timezone.now()
+        OpsJob.objects.filter(pk=self.job.pk).update(progress=self.job.progress, heartbeat_at=now, updated_at=now)
+
+
+def _audit(job: OpsJob, *, action: str, entity_type: str, entity_id: str, meta: dict[str, Any]) -> None:
+    try:
+        OpsAuditLog.objects.create(
+            actor=job.actor,
+            role=job.role,
+            action=action,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            meta={**meta, "jobId": job.pk},
+        )
+    except Exception:
+        return None
+
+
+# Handlers
+
+
+def _timeclock_folder_import(ctx: JobContext) -> dict[str, Any]:
+    params = ctx.job.params or {}
+    base_dir = timeclock_import.folder_dir()
+    # A retried job continues the run its previous attempt started.
+    run_id = int((ctx.job.progress or {}).get("runId") or params.get("resumeRunId") or 0)
+    if run_id:
+        run = timeclock_import.claim_for_resume(run_id)
+        if run is None:
+            raise JobError("run_not_resumable")
+    else:
+        selected = timeclock_import.list_folder_files(
+            base_dir, int(params.get("limitFiles") or 5), skip_imported=not params.get("reimport")
+        )
+        if not selected:
+            return {"dryRun": bool(params.get("dryRun")), "files": [], "createdCount": 0, "updatedCount": 0}
+        default_project_id = int(params.get("defaultProjectId") or 0)
+        run = timeclock_import.start_stream_run(
+            selected,
+            actor=ctx.job.actor,
+            role=ctx.job.role,
+            source=OpsTimeclockImportRun.SOURCE_FOLDER,
+            dry_run=bool(params.get("dryRun")),
+            default_project=(
+                ProjectPage.objects.filter(pk=default_project_id).specific().first() if default_project_id else None
+            ),
+            chunk_size=int(params.get("chunkSize") or timeclock_import.STREAM_CHUNK_SIZE),
+        )
+        ctx.set_progress(runId=run.id)
+
+    run = timeclock_import.run_stream(run, base_dir, should_stop=ctx.cancelled)
+    ctx.check_cancelled()
+    if run.status == OpsTimeclockImportRun.STATUS_FAILED:
+        raise JobError(run.last_error or "import_failed")
+    summary = timeclock_import.run_summary(run)
+    _audit(
+        ctx.job,
+        action="ops_timeclock_import_folder",
+        entity_type="timeclock",
+        entity_id=f"run:{run.id}",
+        meta=summary,
+    )
+    return {**summary, "errors": run.errors or [], "results": run.results or []}
+
+
+def _payroll_generate(ctx: JobContext) -> dict[str, Any]:
+    params = ctx.job.params or {}
+    result = payroll.generate_from_params(params)
+    _audit(
+        ctx.job,
+        action="ops_payroll_generate_from_attendance",
+        entity_type="payroll",
+        entity_id=payroll.params_label(params),
+        meta={
+            "dryRun": bool(params.get("dryRun")),
+            "incremental": bool(params.get("incremental")),
+            "workerId": result["workerId"],
+            "createdCount": result["createdCount"],
+            "updatedCount": result["updatedCount"],
+            "skippedCount": result["skippedCount"],
+            "errorCount": len(result["errors"]),
+            "actorId": ctx.job.actor_id,
+        },
+    )
+    return result
+
+
+def _set_output(ctx: JobContext, path: Path) -> None:
+    ctx.job.output_path = str(path)
+    OpsJob.objects.filter(pk=ctx.job.pk).update(output_path=ctx.job.output_path, updated_at=timezone.now())
+
+
+def _backup_export(ctx: JobContext) -> dict[str, Any]:
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    path = output_dir() / f"job-{ctx.job.pk}-backup-{ts}.json"
+    _set_output(ctx, path)
+    call_command("dumpdata", *BACKUP_APPS, indent=2, output=str(path), exclude=BACKUP_EXCLUDE, verbosity=0)
+    return {"filename": f"backup-{ts}.json", "contentType": "application/json", "size": path.stat().st_size}
+
+
+def _media_export(ctx: JobContext) -> dict[str, Any]:
+    media_root = Path(settings.MEDIA_ROOT).resolve()
+    ts = time.strftime("%Y%m%d-%H%M%S")
+    path = output_dir() / f"job-{ctx.job.pk}-media-{ts}.zip"
+    _set_output(ctx, path)
+    count = 0
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        if media_root.exists():
+            for root, _dirs, files in os.walk(str(media_root)):
+                ctx.check_cancelled()
+                for filename in files:
+                    full_path = Path(root) / filename
+                    try:
+                        rel = full_path.resolve().relative_to(media_root)
+                    except Exception:
+                        continue
+                    zf.write(str(full_path), arcname=str(rel).replace("\\", "/"))
+                    count += 1
+                ctx.set_progress(filesDone=count)
+    return {
+        "filename": f"media-{ts}.zip",
+        "contentType": "application/zip",
+        "size": path.stat().st_size,
+        "filesCount": count,
+    }
+
+
+HANDLERS: dict[str, Callable[[JobContext], dict[str, Any]]] = {
+    KIND_TIMECLOCK_FOLDER_IMPORT: _timeclock_folder_import,
+    KIND_PAYROLL_GENERATE: _payroll_generate,
+    KIND_BACKUP_EXPORT: _backup_export,
+    KIND_MEDIA_EXPORT: _media_export,
+}
+
+
+# Queue
+
+
+def enqueue(
+    kind: str,
+    params: dict[str, Any],
+    *,
+    actor: Any,
+    role: str,
+    dedupe: bool = False,
+) -> tuple[OpsJob, bool]:
+    """
+    Queue a job and return ``(job, created)``. With ``dedupe`` an active job
+    of the same kind and params is returned instead of queueing another.
+    """
+    if kind not in HANDLERS:
+        raise JobError("unknown_kind")
+    if dedupe:
+        for job in OpsJob.objects.filter(kind=kind, status__in=OpsJob.ACTIVE_STATUSES).order_by("id"):
+            if (job.params or {}) == params:
+                return job, False
+    job = OpsJob.objects.create(kind=kind, params=params, actor=actor, role=role)
+    return job, True
+
+
+def claim_next(worker: str) -> OpsJob | None:
+    # Claim by conditional UPDATE rather than SELECT ... FOR UPDATE so it
+    # works the same on SQLite and PostgreSQL.
+    candidates = OpsJob.objects.filter(status=OpsJob.STATUS_QUEUED).order_by("id").values_list("id", flat=True)
+    for job_id in list(candidates[:10]):
+        now = timezone.now()
+        claimed = OpsJob.objects.filter(pk=job_id, status=OpsJob.STATUS_QUEUED).update(
+            status=OpsJob.STATUS_RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            updated_at=now,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return OpsJob.objects.select_related("actor").get(pk=job_id)
+    return None
+
+
+def cancel(job_id: int) -> OpsJob | None:
+    """
+    Cancel a queued job outright; ask a running one to stop at its next
+    checkpoint.
+    """
+    now = timezone.now()
+    OpsJob.objects.filter(pk=job_id, status=OpsJob.STATUS_QUEUED).update(
+        status=OpsJob.STATUS_CANCELLED, cancel_requested=True, finished_at=now, updated_at=now
+    )
+    OpsJob.objects.filter(pk=job_id, status=OpsJob.STATUS_RUNNING).update(cancel_requested=True, updated_at=now)
+    return OpsJob.objects.filter(pk=job_id).first()
+
+
+def recover_stale() -> int:
+    """
+    Requeue (or give up on) running jobs whose worker stopped sending
+    heartbeats.
+    """
+    now = timezone.now()
+    stale = OpsJob.objects.filter(
+        status=OpsJob.STATUS_RUNNING,
+        heartbeat_at__lt=now - timedelta(seconds=_stale_seconds()),
+    )
+    recovered = stale.filter(cancel_requested=True).update(
+        status=OpsJob.STATUS_CANCELLED, finished_at=now, updated_at=now
+    )
+    recovered += stale.filter(attempts__lt=F("max_attempts")).update(
+        status=OpsJob.STATUS_QUEUED, worker="", updated_at=now
+    )
+    recovered += stale.update(status=OpsJob.STATUS_FAILED, error="worker_lost", finished_at=now, updated_at=now)
+    return recovered
+
+
+def purge_outputs() -> int:
+    cutoff = timezone.now() - timedelta(seconds=_output_ttl_seconds())
+    expired = OpsJob.objects.filter(finished_at__lt=cutoff).exclude(output_path="")
+    count = 0
+    for job in expired:
+        Path(job.output_path).unlink(missing_ok=True)
+        OpsJob.objects.filter(pk=job.pk).update(output_path="")
+        count += 1
+    return count
+
+
+def _heartbeat(job_id: int, stop: threading.Event, cancel_event: threading.Event) -> None:
+    try:
+        while not stop.wait(HEARTBEAT_SECONDS):
+            try:
+                now = timezone.now()
+                OpsJob.objects.filter(pk=job_id, status=OpsJob.STATUS_RUNNING).update(heartbeat_at=now)
+                if OpsJob.objects.filter(pk=job_id, cancel_requested=True).exists():
+                    cancel_event.set()
+            except Exception:
+                # A missed beat is harmless; the stale cutoff spans many.
+                logger.warning("Heartbeat for job %s failed", job_id, exc_info=True)
+    finally:
+        connection.close()
+
+
+def run_job(job: OpsJob) -> OpsJob:
+    cancel_event = threading.Event()
+    stop = threading.Event()
+    beat = threading.Thread(target=_heartbeat, args=(job.pk, stop, cancel_event), daemon=True)
+    beat.start()
+    result: dict[str, Any] | None = None
+    error = ""
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise JobError("unknown_kind")
+        result = handler(JobContext(job=job, cancel_event=cancel_event))
+        status = OpsJob.STATUS_SUCCEEDED
+    except JobCancelled:
+        status = OpsJob.STATUS_CANCELLED
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        status = OpsJob.STATUS_FAILED
+        error = getattr(exc, "code", "") or str(exc)[:1000] or exc.__class__.__name__
+    finally:
+        stop.set()
+        beat.join()
+
+    now = timezone.now()
+    # Only the attempt that still owns the job may finish it.
+    OpsJob.objects.filter(pk=job.pk, status=OpsJob.STATUS_RUNNING, worker=job.worker).update(
+        status=status,
+        result=result,
+        error=error,
+        output_path=job.output_path if status == OpsJob.STATUS_SUCCEEDED else "",
+        finished_at=now,
+        updated_at=now,
+    )
+    if status != OpsJob.STATUS_SUCCEEDED and job.output_path:
+        Path(job.output_path).unlink(missing_ok=True)
+    job.refresh_from_db()
+    return job
+
+
+def work(worker: str, stop: threading.Event, *, poll_interval: float, once: bool = False) -> int:
+    """
+    Claim and run jobs until ``stop`` is set (or, with ``once``, until the
+    queue is empty). Returns the number of jobs run.
+    """
+    done = 0
+    last_maintenance = 0.0
+    try:
+        while not stop.is_set():
+            close_old_connections()
+            if time.monotonic() - last_maintenance > 60:
+                recover_stale()
+                purge_outputs()
+                last_maintenance = time.monotonic()
+            job = claim_next(worker)
+            if job is None:
+                if once:
+                    break
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+            done += 1
+    finally:
+        connection.close()
+    return done
+
+
+def job_payload(job: OpsJob) -> dict[str, Any]:
+    has_output = job.status == OpsJob.STATUS_SUCCEEDED and bool(job.output_path)
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "createdAt": job.created_at.isoformat() if job.created_at else "",
+        "startedAt": job.started_at.isoformat() if job.started_at else "",
+        "finishedAt": job.finished_at.isoformat() if job.finished_at else "",
+        "actorId": job.actor_id or 0,
+        "params": job.params or {},
+        "progress": job.progress or {},
+        "result": job.result,
+        "error": job.error,
+        "attempts": int(job.attempts or 0),
+        "cancelRequested": bool(job.cancel_requested),
+        "downloadUrl": f"/api/admin/ops/jobs/{job.id}/download" if has_output else "",
+    }
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import datetime
+import random
+import statistics
+import time
+from typing import Any
+from typing import Callable
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+
+from website import api_json
+
+
+NAMES = ["أحمد علي", "محمد حسن", "خالد يوسف", "سعيد عمر", "ياسر محمود", "فهد سالم"]
+PROJECTS = ["برج الرياض", "مجمع سكني - جدة", "مدرسة الدمام", ""]
+
+
+def _attendance_items(workers: int, days: int, rng: random.Random) -> list[dict[str, Any]]:
+    items = []
+    start = datetime.date(2026, 1, 1)
+    for w in range(1, workers + 1):
+        for d in range(days):
+            day = start + datetime.timedelta(days=d)
+            items.append(
+                {
+                    "id": w * 100 + d,
+                    "workerId": w,
+                    "workerName": rng.choice(NAMES),
+                    "projectId": rng.randint(0, 12),
+                    "projectTitle": rng.choice(PROJECTS),
+                    "date": day.isoformat(),
+                    "status": rng.choice(["present", "absent", "half_day", "leave"]),
+                    "hours": rng.choice([8.0, 4.0, 0.0, None]),
+                    "notes": "",
+                    "state": rng.choice(["draft", "review", "approved", "locked"]),
+                    "approvedById": rng.randint(0, 3),
+                    "approvedAt": datetime.datetime(2026, 2, 1, 9, 30, tzinfo=datetime.timezone.utc).isoformat(),
+                    "lockedById": 0,
+                    "lockedAt": "",
+                }
+            )
+    return items
+
+
+def _payroll_items(workers: int, days: int, rng: random.Random) -> list[dict[str, Any]]:
+    items = []
+    for w in range(1, workers + 1):
+        for n in range(max(1, days // 7)):
+            items.append(
+                {
+                    "id": w * 100 + n,
+                    "workerId": w,
+                    "workerName": rng.choice(NAMES),
+                    "year": 2026,
+                    "month": 1,
+                    "kind": rng.choice(["wage", "bonus", "deduction", "advance"]),
+                    "amount": round(rng.uniform(50, 900), 2),
+                    "date": datetime.date(2026, 1, 1 + n).isoformat(),
+                    "notes": "",
+                }
+            )
+    return items
+
+
+PAYLOADS: dict[str, Callable[[int, int, random.Random], list[dict[str, Any]]]] = {
+    "attendance": _attendance_items,
+    "payroll": _payroll_items,
+}
+
+
+class Command(BaseCommand):
+    help = "Compare API response encoders and envelopes on large ops list payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=200)
+        parser.add_argument("--days", type=int, default=31)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        iterations = max(1, int(options["iterations"]))
+        rng = random.Random(options["seed"])
+        modes: list[tuple[str, bool, Callable[[Any], bytes]]] = [
+            ("legacy/django", False, api_json.get_encoder("django")),
+            ("single/stdlib", True, api_json.get_encoder("stdlib")),
+        ]
+        try:
+            modes.append(("single/orjson", True, api_json.get_encoder("orjson")))
+        except ImproperlyConfigured:
+            self.stdout.write("orjson is not installed; skipping it.")
+
+        for name, build in PAYLOADS.items():
+            result = {"items": build(options["workers"], options["days"], rng)}
+            self.stdout.write(f"{name}: {len(result['items'])} rows")
+            baseline = 0.0
+            for label, single, dumps in modes:
+                body = {"ok": True, "result": result}
+                if not single:
+                    body["data"] = result
+                timings = []
+                size = 0
+                for _ in range(iterations):
+                    t0 = time.perf_counter()
+                    size = len(dumps(body))
+                    timings.append(time.perf_counter() - t0)
+                median = statistics.median(timings)
+                baseline = baseline or median
+                self.stdout.write(
+                    f"  {label:<14} {size / 1024:>9.1f} KiB  {median * 1000:>8.2f} ms"
+                    f"  x{baseline / median if median else 0:.2f}"
+                )
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+import random
+import statistics
+import tempfile
+import time
+from typing import Any
+from typing import Callable
+
+from django.core.cache.backends.base import BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management.base import BaseCommand
+
+from contracting_site.cache import TieredCache
+
+
+SITE_ENDPOINTS = {
+    "/api/site/company": 2_000,
+    "/api/site/config": 1_000,
+    "/api/site/home": 1_500,
+    "/api/site/home-sections": 6_000,
+    "/api/site/services": 8_000,
+    "/api/site/projects": 20_000,
+    "/api/site/team": 5_000,
+    "/api/site/testimonials": 4_000,
+}
+
+
+def _payload(size: int) -> bytes:
+    body = {"ok": True, "result": {"text": "س" * max(1, size // 2)}}
+    return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+def _site_workload(cache: BaseCache, rng: random.Random) -> Callable[[], None]:
+    payloads = {path: _payload(size) for path, size in SITE_ENDPOINTS.items()}
+    paths = list(payloads)
+
+    def step() -> None:
+        path = rng.choice(paths)
+        key = f"page:{path}"
+        if rng.random() < 0.02 or cache.get(key) is None:
+            cache.set(key, payloads[path], 300)
+
+    return step
+
+
+WORKLOADS = {
+    "site": _site_workload,
+}
+
+
+class Command(BaseCommand):
+    help = "Compare the file cache with the tiered cache on the site API page-cache workload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--workload",
+            action="append",
+            choices=sorted(WORKLOADS),
+            help="Workload(s) to run (default: all).",
+        )
+
+    def _backends(self, tmp: str) -> dict[str, BaseCache]:
+        params: dict[str, Any] = {"TIMEOUT": 14400, "KEY_PREFIX": "bench"}
+        tiered = TieredCache("", {**params, "OPTIONS": {"LOCAL_TIMEOUT": 5}})
+        tiered.shared = FileBasedCache(f"{tmp}/tiered", dict(params))
+        return {
+            "file": FileBasedCache(f"{tmp}/file", dict(params)),
+            "tiered": tiered,
+        }
+
+    def handle(self, *args, **options):
+        iterations = max(1, int(options["iterations"]))
+        workloads = options["workload"] or sorted(WORKLOADS)
+        with tempfile.TemporaryDirectory(prefix="bench-cache-") as tmp:
+            backends = self._backends(tmp)
+            for workload in workloads:
+                baseline = 0.0
+                for name, cache in backends.items():
+                    cache.clear()
+                    step = WORKLOADS[workload](cache, random.Random(options["seed"]))
+                    timings: list[float] = []
+                    started = time.perf_counter()
+                    for _ in range(iterations):
+                        t0 = time.perf_counter()
+                        step()
+                        timings.append(time.perf_counter() - t0)
+                    total = time.perf_counter() - started
+                    timings.sort()
+                    ops = iterations / total if total else 0.0
+                    baseline = baseline or ops
+                    self.stdout.write(
+                        f"{workload:<11} {name:<7} {ops:>10.0f} ops/s"
+                        f"  p50={statistics.median(timings) * 1e6:8.1f}us"
+                        f"  p95={timings[int(len(timings) * 0.95) - 1] * 1e6:8.1f}us"
+                        f"  x{ops / baseline:.2f}"
+                    )
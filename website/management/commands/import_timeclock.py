@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from website import timeclock_import
+from website.models import OpsTimeclockImportRun
+from website.models import ProjectPage
+
+
+class Command(BaseCommand):
+    help = "Stream time clock JSON exports into attendance, committing in chunks (resumable)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default="", help="Defaults to TIME_CLOCK_IMPORT_DIR.")
+        parser.add_argument("--limit-files", type=int, default=50)
+        parser.add_argument("--chunk-size", type=int, default=timeclock_import.STREAM_CHUNK_SIZE)
+        parser.add_argument("--default-project", type=int, default=0)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--resume", type=int, default=0, help="Resume a failed or abandoned run id.")
+
+    def handle(self, *args, **options):
+        dir_raw = str(options["dir"] or os.environ.get("TIME_CLOCK_IMPORT_DIR") or "").strip()
+        if not dir_raw:
+            raise CommandError("TIME_CLOCK_IMPORT_DIR is not set.")
+        base_dir = Path(dir_raw)
+        if not base_dir.is_dir():
+            raise CommandError(f"Not a directory: {base_dir}")
+
+        if options["resume"]:
+            run = timeclock_import.claim_for_resume(options["resume"])
+            if run is None:
+                raise CommandError(f"Run {options['resume']} cannot be resumed.")
+        else:
+            default_project = None
+            if options["default_project"]:
+                default_project = ProjectPage.objects.filter(pk=options["default_project"]).specific().first()
+                if default_project is None:
+                    raise CommandError("Default project not found.")
+            selected = timeclock_import.list_folder_files(base_dir, max(1, options["limit_files"]))
+            if not selected:
+                self.stdout.write("No files to import.")
+                return
+            run = timeclock_import.start_stream_run(
+                selected,
+                actor=None,
+                role="system",
+                source=OpsTimeclockImportRun.SOURCE_FOLDER,
+                dry_run=options["dry_run"],
+                default_project=default_project,
+                chunk_size=max(1, options["chunk_size"]),
+            )
+
+        run = timeclock_import.run_stream(run, base_dir)
+        self.stdout.write(
+            f"Run {run.pk}: {run.status}, {run.processed_count} items, "
+            f"{run.created_count} created, {run.updated_count} updated, {run.error_count} errors"
+        )
+        if run.status == OpsTimeclockImportRun.STATUS_FAILED:
+            raise CommandError(f"Run {run.pk} failed: {run.last_error} (resume with --resume {run.pk})")
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from website import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the attendance rollup tables (project/day and worker/month) from attendance."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="date_from", default="", help="First date (YYYY-MM-DD).")
+        parser.add_argument("--to", dest="date_to", default="", help="Last date (YYYY-MM-DD).")
+
+    def handle(self, *args, **options):
+        try:
+            date_from = date.fromisoformat(options["date_from"]) if options["date_from"] else None
+            date_to = date.fromisoformat(options["date_to"]) if options["date_to"] else None
+        except ValueError as exc:
+            raise CommandError(f"Invalid date: {exc}") from exc
+        stats = rollups.rebuild(date_from=date_from, date_to=date_to)
+        self.stdout.write(
+            f"Rebuilt {stats['months']} month(s): {stats['projectDays']} project-day and "
+            f"{stats['workerMonths']} worker-month rollup rows"
+        )
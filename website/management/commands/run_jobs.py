@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from website import jobs
+
+
+class Command(BaseCommand):
+    help = "Run queued ops jobs (imports, payroll generation, exports) outside the web workers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=int(getattr(settings, "OPS_JOBS_WORKERS", 2) or 2))
+        parser.add_argument("--poll-interval", type=float, default=2.0)
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+
+        def _stop(signum, frame):
+            # Finish the running jobs, claim no new ones.
+            stop.set()
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        counts: list[int] = []
+        threads = [
+            threading.Thread(
+                target=lambda worker=f"{name}:{i}": counts.append(
+                    jobs.work(worker, stop, poll_interval=options["poll_interval"], once=options["once"])
+                ),
+                name=f"run_jobs-{i}",
+            )
+            for i in range(max(1, options["workers"]))
+        ]
+        self.stdout.write(f"Running {len(threads)} job worker(s) as {name}")
+        for t in threads:
+            t.start()
+        # Join with a timeout so the main thread keeps handling signals.
+        while any(t.is_alive() for t in threads):
+            for t in threads:
+                t.join(0.5)
+        self.stdout.write(f"Stopped after {sum(counts)} job(s)")
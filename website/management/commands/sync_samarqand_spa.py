@@ -5,6 +5,8 @@ from pathlib import Path
 
 from django.core.management.base import BaseCommand
 
+from website import spa_shell
+
 
 class Command(BaseCommand):
     def add_arguments(self, parser):
@@ -18,12 +20,23 @@ class Command(BaseCommand):
             action="store_true",
             help="Skip npm install.",
         )
+        parser.add_argument(
+            "--skip-build",
+            action="store_true",
+            help="Only recompile the SPA shell and asset manifest from the existing build.",
+        )
 
     def handle(self, *args, **options):
         project_root = Path(__file__).resolve().parents[3]
         default_source = project_root / "frontend" / "samarqand"
         source = Path(options["source"]).resolve() if options["source"] else default_source
 
+        target = project_root / "website" / "static" / "website" / "samarqand_spa"
+        if options["skip_build"]:
+            self._compile_shell(target)
+            self._precompress(target)
+            return
+
         package_json = source / "package.json"
         if not package_json.exists():
             raise SystemExit(f"package.json not found at: {package_json}")
@@ -46,7 +59,6 @@ class Command(BaseCommand):
                 env=env,
             )
 
-        target = project_root / "website" / "static" / "website" / "samarqand_spa"
         target.parent.mkdir(parents=True, exist_ok=True)
 
         self.stdout.write("Building frontend...")
@@ -64,4 +76,23 @@ class Command(BaseCommand):
             env=env,
         )
 
+        self._compile_shell(target)
+        self._precompress(target)
         self.stdout.write(self.style.SUCCESS(f"Synced SPA to: {target}"))
+
+    def _compile_shell(self, target: Path) -> None:
+        written = spa_shell.write_artifacts(target)
+        if not written:
+            self.stdout.write(self.style.WARNING(f"No {spa_shell.INDEX_NAME} in {target}; shell not compiled."))
+            return
+        for path in written:
+            self.stdout.write(f"Compiled {path.name} ({path.stat().st_size} bytes)")
+
+    def _precompress(self, target: Path) -> None:
+        manifest = spa_shell.precompress_assets(target)
+        files = manifest["files"]
+        gz = sum(1 for f in files.values() if "gzip" in f["encodings"])
+        br = sum(1 for f in files.values() if "br" in f["encodings"])
+        self.stdout.write(
+            f"Wrote {spa_shell.MANIFEST_NAME}: {len(files)} assets, {gz} gzip, {br} brotli"
+        )
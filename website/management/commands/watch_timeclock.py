@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import signal
+import threading
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import close_old_connections
+
+from website import timeclock_import
+from website.models import OpsTimeclockImportRun
+from website.models import ProjectPage
+
+
+# IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO
+INOTIFY_MASK = 0x00000004 | 0x00000008 | 0x00000080
+
+
+class _Inotify:
+    # Minimal inotify binding: the watcher only needs "something in the
+    # directory changed", so events are drained rather than parsed.
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    @classmethod
+    def open(cls, directory: Path) -> _Inotify | None:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), INOTIFY_MASK) < 0:
+            os.close(fd)
+            return None
+        return cls(fd)
+
+    def wait(self, timeout: float) -> bool:
+        ready, _w, _x = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self.fd, 1 << 16):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Command(BaseCommand):
+    help = "Watch TIME_CLOCK_IMPORT_DIR and import new or changed export files as they arrive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", default="", help="Defaults to TIME_CLOCK_IMPORT_DIR.")
+        parser.add_argument("--batch-files", type=int, default=20, help="Files per import run.")
+        parser.add_argument("--chunk-size", type=int, default=timeclock_import.STREAM_CHUNK_SIZE)
+        parser.add_argument(
+            "--settle",
+            type=float,
+            default=5.0,
+            help="Seconds a file must be unmodified before it is imported.",
+        )
+        parser.add_argument("--poll-interval", type=float, default=30.0)
+        parser.add_argument("--no-inotify", action="store_true", help="Always poll.")
+        parser.add_argument("--default-project", type=int, default=0)
+
+    def handle(self, *args, **options):
+        dir_raw = str(options["dir"] or os.environ.get("TIME_CLOCK_IMPORT_DIR") or "").strip()
+        if not dir_raw:
+            raise CommandError("TIME_CLOCK_IMPORT_DIR is not set.")
+        base_dir = Path(dir_raw)
+        if not base_dir.is_dir():
+            raise CommandError(f"Not a directory: {base_dir}")
+        default_project = None
+        if options["default_project"]:
+            default_project = ProjectPage.objects.filter(pk=options["default_project"]).specific().first()
+            if default_project is None:
+                raise CommandError("Default project not found.")
+
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+
+        notifier = None if options["no_inotify"] else _Inotify.open(base_dir)
+        self.stdout.write(f"Watching {base_dir} ({'inotify' if notifier else 'polling'})")
+        settle = max(0.0, options["settle"])
+        poll_interval = max(1.0, options["poll_interval"])
+        failed_run_id = 0
+        dirty = True
+        try:
+            while not stop.is_set():
+                wait = poll_interval
+                if dirty:
+                    close_old_connections()
+                    run = None
+                    if failed_run_id:
+                        run = timeclock_import.claim_for_resume(failed_run_id)
+                        failed_run_id = 0
+                    else:
+                        # Back-pressure: one bounded batch at a time. Events that
+                        # arrive meanwhile only mark the directory dirty, so a
+                        # burst of exports collapses into the next rescan.
+                        selected = timeclock_import.list_folder_files(
+                            base_dir, max(1, options["batch_files"]), min_age=settle
+                        )
+                        if selected:
+                            run = timeclock_import.start_stream_run(
+                                selected,
+                                actor=None,
+                                role="system",
+                                source=OpsTimeclockImportRun.SOURCE_FOLDER,
+                                dry_run=False,
+                                default_project=default_project,
+                                chunk_size=max(1, options["chunk_size"]),
+                            )
+                    if run is not None:
+                        run = timeclock_import.run_stream(run, base_dir, should_stop=stop.is_set)
+                        self._report(run)
+                        if run.status != OpsTimeclockImportRun.STATUS_FAILED:
+                            continue
+                        # Resume it after a pause instead of hammering a
+                        # failing database or file.
+                        failed_run_id = run.pk
+                        dirty = True
+                    elif timeclock_import.list_folder_files(base_dir, 1):
+                        # A new file is still being written; look again once
+                        # it has settled even if no further event arrives.
+                        wait = min(poll_interval, settle or poll_interval)
+                        dirty = True
+                    else:
+                        dirty = False
+                if notifier is not None:
+                    dirty = notifier.wait(wait) or dirty
+                else:
+                    stop.wait(wait)
+                    dirty = True
+        finally:
+            if notifier is not None:
+                notifier.close()
+
+    def _report(self, run: OpsTimeclockImportRun) -> None:
+        self.stdout.write(
+            f"Run {run.pk}: {run.status}, {run.processed_count} items, "
+            f"{run.created_count} created, {run.updated_count} updated, {run.error_count} errors"
+            + (f" ({run.last_error})" if run.last_error else "")
+        )
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0026_worker_user_link"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="workerattendance",
+            index=models.Index(fields=["-date", "-id"], name="ops_att_date_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="workerpayrollentry",
+            index=models.Index(
+                fields=["worker", "year", "month", "kind", "source"],
+                name="ops_pay_worker_period_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="workerpayrollentry",
+            index=models.Index(fields=["-year", "-month", "-id"], name="ops_pay_period_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="inventorytransaction",
+            index=models.Index(fields=["item", "-id"], name="ops_invtx_item_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="contractpayment",
+            index=models.Index(fields=["contract", "due_date"], name="ops_cpay_contract_due_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="purchaseorder",
+            index=models.Index(fields=["project", "-id"], name="ops_po_project_id_idx"),
+        ),
+    ]
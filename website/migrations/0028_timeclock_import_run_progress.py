@@ -0,0 +1,54 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0027_ops_composite_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="finished_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="status",
+            field=models.CharField(
+                choices=[("running", "قيد التنفيذ"), ("completed", "مكتمل"), ("failed", "متوقف")],
+                default="completed",
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="chunk_size",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="processed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="progress",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="opstimeclockimportrun",
+            name="last_error",
+            field=models.TextField(blank=True),
+        ),
+    ]
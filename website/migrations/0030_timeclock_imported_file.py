@@ -0,0 +1,43 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0029_ops_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OpsTimeclockImportedFile",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("name", models.CharField(max_length=255, unique=True)),
+                ("sha256", models.CharField(db_index=True, max_length=64)),
+                ("size", models.BigIntegerField(default=0)),
+                ("mtime_ns", models.BigIntegerField(default=0)),
+                ("items_count", models.PositiveIntegerField(default=0)),
+                ("error", models.CharField(blank=True, max_length=64)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="imported_files",
+                        to="website.opstimeclockimportrun",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ملف ساعة دوام مستورد",
+                "verbose_name_plural": "ملفات ساعة الدوام المستوردة",
+                "ordering": ["-id"],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0030_timeclock_imported_file"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkerPayrollDirtyPeriod",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("marked_at", models.DateTimeField()),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="payroll_dirty_periods",
+                        to="website.worker",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "فترة رواتب تحتاج إعادة احتساب",
+                "verbose_name_plural": "فترات رواتب تحتاج إعادة احتساب",
+                "ordering": ["-year", "-month", "-id"],
+                "constraints": [
+                    models.UniqueConstraint(fields=("worker", "year", "month"), name="uniq_payroll_dirty_period")
+                ],
+                "indexes": [
+                    models.Index(fields=["-year", "-month", "-id"], name="ops_pay_dirty_period_idx")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0031_payroll_dirty_period"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceProjectDayRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("half_day", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("leave", models.PositiveIntegerField(default=0)),
+                ("hours", models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="website.projectpage",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ملخص دوام مشروع يومي",
+                "verbose_name_plural": "ملخصات دوام المشاريع اليومية",
+                "ordering": ["date", "id"],
+                "constraints": [
+                    models.UniqueConstraint(fields=("project", "date"), name="uniq_att_project_day_rollup")
+                ],
+                "indexes": [
+                    models.Index(fields=["date", "project"], name="ops_att_proj_day_date_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="AttendanceWorkerMonthRollup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("present", models.PositiveIntegerField(default=0)),
+                ("half_day", models.PositiveIntegerField(default=0)),
+                ("absent", models.PositiveIntegerField(default=0)),
+                ("leave", models.PositiveIntegerField(default=0)),
+                ("hours", models.DecimalField(decimal_places=2, default=0, max_digits=10)),
+                ("refreshed_at", models.DateTimeField()),
+                (
+                    "worker",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="website.worker",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "ملخص دوام عامل شهري",
+                "verbose_name_plural": "ملخصات دوام العمال الشهرية",
+                "ordering": ["-year", "-month", "id"],
+                "constraints": [
+                    models.UniqueConstraint(fields=("worker", "year", "month"), name="uniq_att_worker_month_rollup")
+                ],
+                "indexes": [
+                    models.Index(fields=["year", "month"], name="ops_att_worker_month_idx")
+                ],
+            },
+        ),
+    ]
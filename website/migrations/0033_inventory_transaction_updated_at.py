@@ -0,0 +1,18 @@
+# Generated by Django 5.2.10 on 2026-10-17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("website", "0032_attendance_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="inventorytransaction",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
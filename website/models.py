@@ -1358,6 +1358,9 @@ class ContractPayment(models.Model):
         ordering = ["-id"]
         verbose_name = "دفعة/مستخلص"
         verbose_name_plural = "الدفعات/المستخلصات"
+        indexes = [
+            models.Index(fields=["contract", "due_date"], name="ops_cpay_contract_due_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.title or str(self.pk or "")
@@ -1401,6 +1404,9 @@ class PurchaseOrder(models.Model):
         ordering = ["-id"]
         verbose_name = "أمر شراء"
         verbose_name_plural = "أوامر الشراء"
+        indexes = [
+            models.Index(fields=["project", "-id"], name="ops_po_project_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.number or str(self.pk or "")
@@ -1440,6 +1446,7 @@ class InventoryTransaction(models.Model):
     ]
 
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
     item: models.ForeignKey["InventoryItem", "InventoryItem"] = models.ForeignKey(
         InventoryItem, on_delete=models.CASCADE, related_name="transactions"
     )
@@ -1474,6 +1481,9 @@ class InventoryTransaction(models.Model):
         ordering = ["-id"]
         verbose_name = "حركة مخزون"
         verbose_name_plural = "حركات المخزون"
+        indexes = [
+            models.Index(fields=["item", "-id"], name="ops_invtx_item_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return self.reference or str(self.pk or "")
@@ -1625,6 +1635,9 @@ class WorkerAttendance(models.Model):
                 fields=["worker", "date"], name="uniq_worker_attendance_per_day"
             )
         ]
+        indexes = [
+            models.Index(fields=["-date", "-id"], name="ops_att_date_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.worker.name} - {self.date.isoformat()}"
@@ -1692,11 +1705,105 @@ class WorkerPayrollEntry(models.Model):
         ordering = ["-year", "-month", "-id"]
         verbose_name = "دفعة رواتب"
         verbose_name_plural = "دفعات الرواتب"
+        indexes = [
+            models.Index(
+                fields=["worker", "year", "month", "kind", "source"],
+                name="ops_pay_worker_period_idx",
+            ),
+            models.Index(fields=["-year", "-month", "-id"], name="ops_pay_period_id_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.worker.name} - {self.year}/{self.month}"
 
 
+class WorkerPayrollDirtyPeriod(models.Model):
+    # A (worker, year, month) whose attendance changed after its
+    # auto-attendance salary entry was last generated. Rows are written
+    # whenever attendance changes and removed by the generation run that
+    # recomputes the period.
+    worker: models.ForeignKey["Worker", "Worker"] = models.ForeignKey(
+        Worker, on_delete=models.CASCADE, related_name="payroll_dirty_periods"
+    )
+    year: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField()
+    month: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField()
+    marked_at: models.DateTimeField = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-year", "-month", "-id"]
+        verbose_name = "فترة رواتب تحتاج إعادة احتساب"
+        verbose_name_plural = "فترات رواتب تحتاج إعادة احتساب"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["worker", "year", "month"], name="uniq_payroll_dirty_period"
+            )
+        ]
+        indexes = [
+            models.Index(fields=["-year", "-month", "-id"], name="ops_pay_dirty_period_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.worker_id} - {self.year}/{self.month}"
+
+
+class AttendanceProjectDayRollup(models.Model):
+    # Attendance per (project, day), kept current from WorkerAttendance by
+    # website.rollups; rows without a project are not rolled up here.
+    project: models.ForeignKey["ProjectPage", "ProjectPage"] = models.ForeignKey(
+        "website.ProjectPage", on_delete=models.CASCADE, related_name="+"
+    )
+    date: models.DateField = models.DateField()
+    present: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    half_day: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    absent: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    leave: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    hours: models.DecimalField = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    refreshed_at: models.DateTimeField = models.DateTimeField()
+
+    class Meta:
+        ordering = ["date", "id"]
+        verbose_name = "ملخص دوام مشروع يومي"
+        verbose_name_plural = "ملخصات دوام المشاريع اليومية"
+        constraints = [
+            models.UniqueConstraint(fields=["project", "date"], name="uniq_att_project_day_rollup")
+        ]
+        indexes = [
+            models.Index(fields=["date", "project"], name="ops_att_proj_day_date_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.project_id} - {self.date.isoformat()}"
+
+
+class AttendanceWorkerMonthRollup(models.Model):
+    # Attendance per (worker, year, month), kept current by website.rollups.
+    worker: models.ForeignKey["Worker", "Worker"] = models.ForeignKey(
+        Worker, on_delete=models.CASCADE, related_name="+"
+    )
+    year: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField()
+    month: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField()
+    present: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    half_day: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    absent: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    leave: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    hours: models.DecimalField = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    refreshed_at: models.DateTimeField = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-year", "-month", "id"]
+        verbose_name = "ملخص دوام عامل شهري"
+        verbose_name_plural = "ملخصات دوام العمال الشهرية"
+        constraints = [
+            models.UniqueConstraint(fields=["worker", "year", "month"], name="uniq_att_worker_month_rollup")
+        ]
+        indexes = [
+            models.Index(fields=["year", "month"], name="ops_att_worker_month_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.worker_id} - {self.year}/{self.month}"
+
+
 class ResourceAssignment(models.Model):
     RESOURCE_WORKER = "worker"
     RESOURCE_EQUIPMENT = "equipment"
@@ -1796,8 +1903,18 @@ class OpsTimeclockImportRun(models.Model):
         (SOURCE_MANUAL, "يدوي"),
         (SOURCE_FOLDER, "مجلد"),
     ]
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_RUNNING, "قيد التنفيذ"),
+        (STATUS_COMPLETED, "مكتمل"),
+        (STATUS_FAILED, "متوقف"),
+    ]
 
     created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+    finished_at: models.DateTimeField = models.DateTimeField(blank=True, null=True)
     actor: models.ForeignKey["Any | None", "Any | None"] = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -1823,6 +1940,15 @@ class OpsTimeclockImportRun(models.Model):
     error_count: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
     errors: models.JSONField = models.JSONField(blank=True, null=True)
     results: models.JSONField = models.JSONField(blank=True, null=True)
+    status: models.CharField = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_COMPLETED
+    )
+    chunk_size: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    processed_count: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    # Streaming runs: per-file fingerprint and how many items of it are
+    # committed, so an interrupted run can resume after the last chunk.
+    progress: models.JSONField = models.JSONField(blank=True, null=True)
+    last_error: models.TextField = models.TextField(blank=True)
 
     class Meta:
         ordering = ["-id"]
@@ -1831,3 +1957,89 @@ class OpsTimeclockImportRun(models.Model):
 
     def __str__(self) -> str:
         return f"{self.created_at.isoformat()} - {self.source}"
+
+
+class OpsTimeclockImportedFile(models.Model):
+    # One row per file name in TIME_CLOCK_IMPORT_DIR that a (non dry-run)
+    # folder import has consumed; a file is only imported again when its
+    # content hash changes.
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+    name: models.CharField = models.CharField(max_length=255, unique=True)
+    sha256: models.CharField = models.CharField(max_length=64, db_index=True)
+    size: models.BigIntegerField = models.BigIntegerField(default=0)
+    mtime_ns: models.BigIntegerField = models.BigIntegerField(default=0)
+    items_count: models.PositiveIntegerField = models.PositiveIntegerField(default=0)
+    error: models.CharField = models.CharField(max_length=64, blank=True)
+    run: models.ForeignKey["OpsTimeclockImportRun | None", "OpsTimeclockImportRun | None"] = models.ForeignKey(
+        OpsTimeclockImportRun,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="imported_files",
+    )
+
+    class Meta:
+        ordering = ["-id"]
+        verbose_name = "ملف ساعة دوام مستورد"
+        verbose_name_plural = "ملفات ساعة الدوام المستوردة"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class OpsJob(models.Model):
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CANCELLED = "cancelled"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "في الانتظار"),
+        (STATUS_RUNNING, "قيد التنفيذ"),
+        (STATUS_SUCCEEDED, "مكتملة"),
+        (STATUS_FAILED, "فشلت"),
+        (STATUS_CANCELLED, "ملغاة"),
+    ]
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+    started_at: models.DateTimeField = models.DateTimeField(blank=True, null=True)
+    finished_at: models.DateTimeField = models.DateTimeField(blank=True, null=True)
+    heartbeat_at: models.DateTimeField = models.DateTimeField(blank=True, null=True)
+    actor: models.ForeignKey["Any | None", "Any | None"] = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+    )
+    role: models.CharField = models.CharField(max_length=32, blank=True)
+    kind: models.CharField = models.CharField(max_length=64)
+    status: models.CharField = models.CharField(
+        max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED
+    )
+    params: models.JSONField = models.JSONField(blank=True, null=True)
+    progress: models.JSONField = models.JSONField(blank=True, null=True)
+    result: models.JSONField = models.JSONField(blank=True, null=True)
+    error: models.TextField = models.TextField(blank=True)
+    attempts: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField(default=0)
+    max_attempts: models.PositiveSmallIntegerField = models.PositiveSmallIntegerField(default=3)
+    cancel_requested: models.BooleanField = models.BooleanField(default=False)
+    worker: models.CharField = models.CharField(max_length=128, blank=True)
+    # Exports write their file here; it is served by the job download
+    # endpoint and removed once the job expires.
+    output_path: models.CharField = models.CharField(max_length=512, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="ops_job_status_id_idx"),
+            models.Index(fields=["kind", "status"], name="ops_job_kind_status_idx"),
+        ]
+        verbose_name = "مهمة خلفية"
+        verbose_name_plural = "المهام الخلفية"
+
+    def __str__(self) -> str:
+        return f"{self.kind} #{self.pk} - {self.status}"
@@ -0,0 +1,532 @@
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import DecimalField
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import ExtractMonth
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from website.models import Worker
+from website.models import WorkerAttendance
+from website.models import WorkerPayrollDirtyPeriod
+from website.models import WorkerPayrollEntry
+
+
+logger = logging.getLogger(__name__)
+
+GENERATED_NOTE = "Generated from attendance"
+WRITE_BATCH_SIZE = 500
+
+Period = tuple[int, int]
+PeriodKey = tuple[int, int, int]
+
+
+def month_range(year: int, month: int) -> tuple[date, date]:
+    # Half-open [first day, first day of next month): unlike date__year /
+    # date__month this compiles to a plain range the date index can serve.
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start, end
+
+
+def _date_ranges(periods: list[Period]) -> list[tuple[date, date]]:
+    # Merge consecutive months so a whole year is a single range.
+    ranges: list[tuple[date, date]] = []
+    for year, month in sorted(set(periods)):
+        start, end = month_range(year, month)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], end)
+        else:
+            ranges.append((start, end))
+    return ranges
+
+
+def attendance_counts(worker_ids: list[int], periods: list[Period]) -> dict[PeriodKey, dict[str, int]]:
+    """
+    Non-draft attendance counts per (worker, year, month) and status, in
+    one grouped query over all requested periods.
+    """
+    in_periods = Q()
+    for start, end in _date_ranges(periods):
+        in_periods |= Q(date__gte=start, date__lt=end)
+    rows = (
+        WorkerAttendance.objects.filter(in_periods, worker_id__in=worker_ids)
+        .exclude(state=WorkerAttendance.STATE_DRAFT)
+        .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("worker_id", "year", "month", "status")
+        .annotate(total=Count("id"))
+    )
+    counts: dict[PeriodKey, dict[str, int]] = {}
+    for r in rows:
+        key = (int(r["worker_id"]), int(r["year"]), int(r["month"]))
+        counts.setdefault(key, {})[str(r.get("status") or "")] = int(r.get("total") or 0)
+    return counts
+
+
+def _existing_entries(
+    worker_ids: list[int], periods: list[Period], *, for_update: bool
+) -> dict[PeriodKey, WorkerPayrollEntry]:
+    months_by_year: dict[int, set[int]] = {}
+    for year, month in periods:
+        months_by_year.setdefault(year, set()).add(month)
+    in_periods = Q()
+    for year, months in months_by_year.items():
+        in_periods |= Q(year=year, month__in=sorted(months))
+    qs = WorkerPayrollEntry.objects.filter(
+        in_periods,
+        worker_id__in=worker_ids,
+        kind=WorkerPayrollEntry.KIND_SALARY,
+        source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
+    ).order_by("id")
+    if for_update:
+        qs = qs.select_for_update()
+    # Should there be duplicates, the newest entry wins, as before.
+    return {(e.worker_id, e.year, e.month): e for e in qs}
+
+
+def salary_amount(worker: Worker, counts: dict[str, int]) -> Decimal | None:
+    monthly = getattr(worker, "monthly_salary", None)
+    if monthly is not None:
+        try:
+            return Decimal(str(monthly))
+        except Exception:
+            return None
+    daily = getattr(worker, "daily_cost", None)
+    if daily is None:
+        return None
+    try:
+        daily_dec = Decimal(str(daily))
+    except Exception:
+        return None
+    present = Decimal(str(counts.get(WorkerAttendance.STATUS_PRESENT, 0)))
+    half = Decimal(str(counts.get(WorkerAttendance.STATUS_HALF_DAY, 0)))
+    return daily_dec * (present + (half * Decimal("0.5")))
+
+
+def generate_periods(
+    workers: list[Worker],
+    *,
+    periods: list[Period],
+    dry_run: bool,
+) -> dict[str, Any]:
+    """
+    Create or refresh the draft attendance-based salary entry of each worker
+    for each (year, month) in ``periods``. Entries that have left draft are
+    reported as skipped.
+    """
+    keys = [(w.id, year, month) for year, month in sorted(set(periods)) for w in workers]
+    return _generate({w.id: w for w in workers}, keys, dry_run=dry_run)
+
+
+def _generate(
+    workers_by_id: dict[int, Worker],
+    keys: list[PeriodKey],
+    *,
+    dry_run: bool,
+) -> dict[str, Any]:
+    # A fixed number of queries whatever the size: attendance counts,
+    # existing entries, one bulk_create, one bulk_update and the dirty marks.
+    periods = sorted({(year, month) for _w, year, month in keys})
+    worker_ids = sorted({w for w, _y, _m in keys})
+    started_at = timezone.now()
+    att_counts = attendance_counts(worker_ids, periods)
+    created_count = 0
+    updated_count = 0
+    skipped_count = 0
+    errors: list[dict[str, Any]] = []
+    results: list[dict[str, Any]] = []
+    to_create: list[tuple[dict[str, Any], WorkerPayrollEntry]] = []
+    to_update: list[WorkerPayrollEntry] = []
+    done: set[PeriodKey] = set()
+    today = timezone.localdate()
+
+    with transaction.atomic():
+        existing_by_key = _existing_entries(worker_ids, periods, for_update=not dry_run)
+        for key in keys:
+            worker_id, year, month = key
+            w = workers_by_id[worker_id]
+            counts = att_counts.get(key, {})
+            amount = salary_amount(w, counts)
+            if amount is None:
+                errors.append({"workerId": w.id, "year": year, "month": month, "error": "missing_rate"})
+                continue
+            amount = max(Decimal("0"), amount)
+            existing = existing_by_key.get(key)
+            base = {"workerId": w.id, "workerName": w.name, "year": year, "month": month}
+            if existing and getattr(existing, "status", "") != WorkerPayrollEntry.STATUS_DRAFT:
+                skipped_count += 1
+                results.append(
+                    {
+                        **base,
+                        "status": "skipped",
+                        "reason": "not_draft",
+                        "entryId": existing.id,
+                        "amount": float(existing.amount or 0) if existing.amount is not None else None,
+                    }
+                )
+                continue
+
+            if dry_run:
+                # Counted like the real run, so previews report what it
+                # would create and update.
+                if existing:
+                    updated_count += 1
+                else:
+                    created_count += 1
+                results.append(
+                    {
+                        **base,
+                        "status": "would_update" if existing else "would_create",
+                        "entryId": existing.id if existing else 0,
+                        "amount": float(amount),
+                        "attendance": counts,
+                    }
+                )
+                continue
+
+            done.add(key)
+            if existing:
+                existing.amount = amount
+                existing.date = existing.date or today
+                existing.notes = str(existing.notes or "") or GENERATED_NOTE
+                existing.source_meta = {"attendance": counts}
+                existing.updated_at = started_at
+                to_update.append(existing)
+                updated_count += 1
+                results.append(
+                    {
+                        **base,
+                        "status": "updated",
+                        "entryId": existing.id,
+                        "amount": float(amount),
+                        "attendance": counts,
+                    }
+                )
+            else:
+                entry = WorkerPayrollEntry(
+                    worker=w,
+                    year=year,
+                    month=month,
+                    kind=WorkerPayrollEntry.KIND_SALARY,
+                    amount=amount,
+                    date=today,
+                    notes=GENERATED_NOTE,
+                    source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
+                    source_meta={"attendance": counts},
+                    status=WorkerPayrollEntry.STATUS_DRAFT,
+                )
+                result = {
+                    **base,
+                    "status": "created",
+                    "entryId": 0,
+                    "amount": float(amount),
+                    "attendance": counts,
+                }
+                to_create.append((result, entry))
+                created_count += 1
+                results.append(result)
+
+        if to_create:
+            WorkerPayrollEntry.objects.bulk_create([e for _r, e in to_create], batch_size=WRITE_BATCH_SIZE)
+            for result, entry in to_create:
+                result["entryId"] = entry.id
+        if to_update:
+            WorkerPayrollEntry.objects.bulk_update(
+                to_update,
+                ["amount", "date", "notes", "source_meta", "updated_at"],
+                batch_size=WRITE_BATCH_SIZE,
+            )
+        _clear_dirty(done, before=started_at)
+
+    return {
+        "dryRun": dry_run,
+        "periods": [{"year": y, "month": m} for y, m in periods],
+        "createdCount": created_count,
+        "updatedCount": updated_count,
+        "skippedCount": skipped_count,
+        "errors": errors,
+        "results": results,
+    }
+
+
+def generate_from_attendance(
+    workers: list[Worker],
+    *,
+    year: int,
+    month: int,
+    dry_run: bool,
+) -> dict[str, Any]:
+    result = generate_periods(workers, periods=[(year, month)], dry_run=dry_run)
+    result.pop("periods")
+    return {"year": year, "month": month, **result}
+
+
+def generate(
+    workers: list[Worker],
+    *,
+    year: int,
+    months: list[int],
+    dry_run: bool,
+) -> dict[str, Any]:
+    """
+    Single month: the ``generate_from_attendance`` result. Several months
+    of one year: a ``generate_periods`` result with ``year`` and ``months``.
+    """
+    months = sorted(set(months))
+    if len(months) == 1:
+        return generate_from_attendance(workers, year=year, month=months[0], dry_run=dry_run)
+    result = generate_periods(workers, periods=[(year, m) for m in months], dry_run=dry_run)
+    return {"year": year, "months": months, **result}
+
+
+def period_label(year: int, months: list[int]) -> str:
+    months = sorted(set(months))
+    if months == list(range(1, 13)):
+        return str(year)
+    return f"{year}-{','.join(str(m) for m in months)}"
+
+
+def generate_from_params(params: dict[str, Any]) -> dict[str, Any]:
+    """
+    Run a generation described by the generate endpoint's parsed params:
+    every active worker (or ``workerId``) over ``year``/``months``, or with
+    ``incremental`` only the dirty periods inside that scope.
+    """
+    year = int(params.get("year") or 0)
+    months = [int(m) for m in params.get("months") or [params.get("month")] if m]
+    worker_id = int(params.get("workerId") or 0)
+    dry_run = bool(params.get("dryRun"))
+    if params.get("incremental"):
+        result = generate_dirty(year=year, months=months, worker_id=worker_id, dry_run=dry_run)
+    else:
+        workers_qs = Worker.objects.filter(active=True)
+        if worker_id:
+            workers_qs = workers_qs.filter(pk=worker_id)
+        result = generate(list(workers_qs.order_by("id")), year=year, months=months, dry_run=dry_run)
+    return {**result, "workerId": worker_id}
+
+
+def params_label(params: dict[str, Any]) -> str:
+    year = int(params.get("year") or 0)
+    months = [int(m) for m in params.get("months") or [params.get("month")] if m]
+    label = period_label(year, months) if year else "all"
+    return f"dirty:{label}" if params.get("incremental") else label
+
+
+# Dirty tracking
+
+
+def mark_dirty(keys: Iterable[tuple[int, date]]) -> None:
+    """
+    Flag the payroll periods of these (worker id, attendance date) keys as
+    needing recomputation. Attendance writes reach this through
+    ``attendance.changed``; state-only updates call it directly.
+    """
+    periods = {(int(w), d.year, d.month) for w, d in keys if w and d}
+    if periods:
+        # Mark after commit: the mark is then always newer than the change,
+        # so a generation run that started before the commit (and may not
+        # have seen it) cannot clear it.
+        transaction.on_commit(lambda: _write_dirty(periods))
+
+
+def _write_dirty(periods: set[PeriodKey]) -> None:
+    try:
+        existing_workers = set(
+            Worker.objects.filter(pk__in={w for w, _y, _m in periods}).values_list("id", flat=True)
+        )
+        now = timezone.now()
+        WorkerPayrollDirtyPeriod.objects.bulk_create(
+            [
+                WorkerPayrollDirtyPeriod(worker_id=w, year=y, month=m, marked_at=now)
+                for w, y, m in sorted(periods)
+                if w in existing_workers
+            ],
+            batch_size=WRITE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=["worker", "year", "month"],
+            update_fields=["marked_at"],
+        )
+    except Exception:
+        # The attendance change itself is committed; a lost mark only means
+        # the next full generation is needed to pick it up.
+        logger.exception("Failed to mark payroll periods dirty")
+
+
+def _clear_dirty(keys: set[PeriodKey], *, before: Any) -> None:
+    if not keys:
+        return
+    rows = WorkerPayrollDirtyPeriod.objects.filter(
+        worker_id__in={w for w, _y, _m in keys}, marked_at__lte=before
+    ).values_list("id", "worker_id", "year", "month")
+    ids = [pk for pk, w, y, m in rows if (w, y, m) in keys]
+    for i in range(0, len(ids), WRITE_BATCH_SIZE):
+        WorkerPayrollDirtyPeriod.objects.filter(id__in=ids[i : i + WRITE_BATCH_SIZE]).delete()
+
+
+def dirty_queryset(*, year: int = 0, months: list[int] | None = None, worker_id: int = 0) -> Any:
+    qs = WorkerPayrollDirtyPeriod.objects.all()
+    if year:
+        qs = qs.filter(year=year)
+        if months:
+            qs = qs.filter(month__in=months)
+    if worker_id:
+        qs = qs.filter(worker_id=worker_id)
+    return qs
+
+
+def generate_dirty(
+    *,
+    year: int = 0,
+    months: list[int] | None = None,
+    worker_id: int = 0,
+    dry_run: bool,
+) -> dict[str, Any]:
+    """
+    Recompute only the dirty (worker, year, month) periods of active
+    workers, optionally narrowed to a year, months or one worker. Periods
+    whose entry has left draft stay dirty so they remain visible.
+    """
+    keys = sorted(
+        dirty_queryset(year=year, months=months, worker_id=worker_id)
+        .filter(worker__active=True)
+        .values_list("worker_id", "year", "month")
+    )
+    workers_by_id = Worker.objects.in_bulk({w for w, _y, _m in keys})
+    result = _generate(workers_by_id, keys, dry_run=dry_run)
+    return {"incremental": True, "dirtyCount": len(keys), **result}
+
+
+# Period close
+
+
+def _period_totals(year: int, month: int) -> list[dict[str, Any]]:
+    zero = Value(Decimal("0"), output_field=DecimalField(max_digits=14, decimal_places=2))
+
+    def total(kind: str) -> Any:
+        return Coalesce(Sum("amount", filter=Q(kind=kind)), zero)
+
+    rows = (
+        WorkerPayrollEntry.objects.filter(year=year, month=month)
+        .order_by()
+        .values("worker_id", "worker__name")
+        .annotate(
+            entries=Count("id"),
+            salary=total(WorkerPayrollEntry.KIND_SALARY),
+            bonus=total(WorkerPayrollEntry.KIND_BONUS),
+            advance=total(WorkerPayrollEntry.KIND_ADVANCE),
+            deduction=total(WorkerPayrollEntry.KIND_DEDUCTION),
+        )
+        .annotate(net=F("salary") + F("bonus") - F("advance") - F("deduction"))
+        .order_by("worker__name", "worker_id")
+    )
+    return [
+        {
+            "workerId": r["worker_id"],
+            "workerName": r["worker__name"] or "",
+            "entryCount": int(r["entries"]),
+            "salary": float(r["salary"]),
+            "bonus": float(r["bonus"]),
+            "advance": float(r["advance"]),
+            "deduction": float(r["deduction"]),
+            "net": float(r["net"]),
+        }
+        for r in rows
+    ]
+
+
+def close_period(
+    year: int,
+    month: int,
+    *,
+    user: Any,
+    mark_paid: bool,
+    allow_pending: bool,
+    dry_run: bool,
+) -> dict[str, Any]:
+    """
+    Close a pay period in one transaction: lock the approved attendance of
+    the month, regenerate the draft auto-attendance salaries of active
+    workers, approve every draft entry of the period and, with
+    ``mark_paid``, mark approved entries paid. Each step is a set-based
+    UPDATE over the rows still in its source state, so closing again is a
+    no-op. Attendance still in draft or review blocks the close unless
+    ``allow_pending``; the result then carries ``blocked``. The per-worker
+    totals are summed in SQL; in a dry run they are the stored amounts.
+    """
+    start, end = month_range(year, month)
+    attendance_qs = WorkerAttendance.objects.filter(date__gte=start, date__lt=end)
+    entries_qs = WorkerPayrollEntry.objects.filter(year=year, month=month)
+    actor = user if user is not None and getattr(user, "is_authenticated", False) else None
+    now = timezone.now()
+    with transaction.atomic():
+        by_state = {
+            str(r["state"]): int(r["total"])
+            for r in attendance_qs.order_by().values("state").annotate(total=Count("id"))
+        }
+        pending = by_state.get(WorkerAttendance.STATE_DRAFT, 0) + by_state.get(WorkerAttendance.STATE_REVIEW, 0)
+        result: dict[str, Any] = {
+            "year": year,
+            "month": month,
+            "dryRun": dry_run,
+            "markPaid": mark_paid,
+            "blocked": bool(pending and not allow_pending),
+            "attendance": {"byState": by_state, "pendingCount": pending, "lockedCount": 0},
+        }
+        if result["blocked"]:
+            return result
+
+        approved = by_state.get(WorkerAttendance.STATE_APPROVED, 0)
+        if not dry_run and approved:
+            approved = attendance_qs.filter(state=WorkerAttendance.STATE_APPROVED).update(
+                state=WorkerAttendance.STATE_LOCKED, locked_by=actor, locked_at=now, updated_at=now
+            )
+        result["attendance"]["lockedCount"] = approved
+
+        workers = list(Worker.objects.filter(active=True).order_by("id"))
+        generated = generate_periods(workers, periods=[(year, month)], dry_run=dry_run)
+        result["generation"] = {
+            "createdCount": generated["createdCount"],
+            "updatedCount": generated["updatedCount"],
+            "skippedCount": generated["skippedCount"],
+            "errors": generated["errors"],
+        }
+
+        if dry_run:
+            by_status = {
+                str(r["status"]): int(r["total"])
+                for r in entries_qs.order_by().values("status").annotate(total=Count("id"))
+            }
+            drafts = by_status.get(WorkerPayrollEntry.STATUS_DRAFT, 0) + generated["createdCount"]
+            approved_count = drafts
+            paid_count = drafts + by_status.get(WorkerPayrollEntry.STATUS_APPROVED, 0) if mark_paid else 0
+        else:
+            approved_count = entries_qs.filter(status=WorkerPayrollEntry.STATUS_DRAFT).update(
+                status=WorkerPayrollEntry.STATUS_APPROVED, approved_by=actor, approved_at=now, updated_at=now
+            )
+            paid_count = 0
+            if mark_paid:
+                paid_count = entries_qs.filter(status=WorkerPayrollEntry.STATUS_APPROVED).update(
+                    status=WorkerPayrollEntry.STATUS_PAID, paid_at=now, updated_at=now
+                )
+        result["entries"] = {"approvedCount": approved_count, "paidCount": paid_count}
+
+        workers_totals = _period_totals(year, month)
+    result["workers"] = workers_totals
+    result["totals"] = {
+        key: round(sum(w[key] for w in workers_totals), 2)
+        for key in ("salary", "bonus", "advance", "deduction", "net")
+    }
+    return result
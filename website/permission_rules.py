@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+VERSION_KEY = "ops_perm_rules:version"
+
+_lock = threading.Lock()
+_rules: dict[str, frozenset[str]] = {}
+_loaded_version: int | None = None
+_checked_at = 0.0
+
+
+def _recheck_seconds() -> float:
+    try:
+        return max(0.0, float(getattr(settings, "OPS_PERMISSION_RULES_RECHECK_SECONDS", 2)))
+    except Exception:
+        return 2.0
+
+
+def _shared_version() -> int:
+    try:
+        return int(cache.get(VERSION_KEY) or 0)
+    except Exception:
+        return 0
+
+
+def _load(version: int) -> None:
+    global _rules, _loaded_version
+
+    from website.models import OpsPermissionRule
+
+    table: dict[str, frozenset[str]] = {}
+    for code, allowed in OpsPermissionRule.objects.values_list("code", "allowed_roles"):
+        if isinstance(allowed, list):
+            table[str(code)] = frozenset(str(x) for x in allowed if str(x).strip())
+    _rules = table
+    _loaded_version = version
+
+
+def _ensure_fresh() -> None:
+    global _checked_at
+
+    now = time.monotonic()
+    if _loaded_version is not None and now - _checked_at < _recheck_seconds():
+        return
+    version = _shared_version()
+    with _lock:
+        if version != _loaded_version:
+            _load(version)
+        _checked_at = now
+
+
+def allowed_roles(code: str) -> set[str] | None:
+    """
+    Return the role override for ``code``, or None when the defaults apply.
+
+    Rules live in a per-process table. The shared version stamp is only
+    consulted once every ``OPS_PERMISSION_RULES_RECHECK_SECONDS``, so
+    permission checks in between touch neither the cache nor the DB.
+    """
+    _ensure_fresh()
+    roles = _rules.get(code)
+    return set(roles) if roles is not None else None
+
+
+def bump_version() -> int:
+    # A wall-clock stamp rather than a plain incr: the version key can be
+    # culled from the file cache, and a restarted counter could collide
+    # with a version some worker has already loaded.
+    version = max(_shared_version() + 1, time.time_ns())
+    try:
+        cache.set(VERSION_KEY, version, None)
+    except Exception:
+        pass
+    global _checked_at
+    with _lock:
+        _load(version)
+        _checked_at = time.monotonic()
+    return version
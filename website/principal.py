@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from django.contrib.auth import get_user_model
+
+
+ROLE_GROUPS: dict[str, set[str]] = {
+    "guest": {"Guests", "Guest", "ضيف"},
+    "registered_guest": {"Registered Guests", "Registered Guest", "ضيف مسجل", "ضيف مُسجل"},
+    "employee": {"Employees", "Employee", "موظف", "موظفين"},
+    "registrar": {"Registrars", "Registrar", "مسجل", "المسجل"},
+    "accountant": {"Accountants", "Accountant", "محاسب", "محاسبون", "الحسابات"},
+    "manager": {
+        "Managers",
+        "Manager",
+        "مدير",
+        "مدراء",
+        "المدراء",
+        "مدراء الموقع",
+        "مدير الموقع",
+    },
+}
+
+ROLE_PRIORITY = ["manager", "accountant", "registrar", "employee", "registered_guest", "guest"]
+
+
+def role_from_groups(user: Any, group_names: set[str]) -> str:
+    if not user or not getattr(user, "is_authenticated", False):
+        return "anonymous"
+    if getattr(user, "is_superuser", False):
+        return "superadmin"
+    for role in ROLE_PRIORITY:
+        if group_names & ROLE_GROUPS[role]:
+            return role
+    return "staff"
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int = 0
+    username: str = ""
+    is_authenticated: bool = False
+    is_staff: bool = False
+    is_superuser: bool = False
+    role: str = "anonymous"
+    groups: frozenset[str] = field(default_factory=frozenset)
+    worker_id: int = 0
+
+    def in_any_group(self, group_names: set[str]) -> bool:
+        return bool(self.groups & group_names)
+
+
+ANONYMOUS = Principal()
+
+
+def load_principal(user: Any) -> Principal:
+    if not user or not getattr(user, "is_authenticated", False):
+        return ANONYMOUS
+    groups: set[str] = set()
+    worker_id = 0
+    try:
+        rows = (
+            get_user_model()
+            .objects.filter(pk=user.pk)
+            .values_list("groups__name", "linked_worker__id")
+        )
+        for group_name, linked_id in rows:
+            if group_name and str(group_name).strip():
+                groups.add(str(group_name))
+            if linked_id:
+                worker_id = int(linked_id)
+    except Exception:
+        groups = set()
+        worker_id = 0
+    return Principal(
+        user_id=int(getattr(user, "pk", 0) or 0),
+        username=getattr(user, "username", "") or "",
+        is_authenticated=True,
+        is_staff=bool(getattr(user, "is_staff", False)),
+        is_superuser=bool(getattr(user, "is_superuser", False)),
+        role=role_from_groups(user, groups),
+        groups=frozenset(groups),
+        worker_id=worker_id,
+    )
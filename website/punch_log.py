@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import csv
+import itertools
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+from typing import Any
+from typing import Iterable
+
+
+PUNCH_SUFFIXES = {".csv", ".tsv", ".txt", ".dat"}
+# Two punches this close together are one double-tap on the terminal.
+DEBOUNCE = timedelta(minutes=2)
+# An open punch with no partner within this window is left unpaired; a
+# pair may cross midnight and counts for the day it started.
+MAX_SHIFT = timedelta(hours=16)
+UNPAIRED_NOTE = "Unpaired punch"
+
+# Header names are compared lower-cased with spaces, "_" and "-" removed.
+CLOCK_ID_COLUMNS = (
+    "timeclockid",
+    "clockid",
+    "userid",
+    "pin",
+    "badge",
+    "badgenumber",
+    "enrollnumber",
+    "employeeid",
+    "empid",
+    "acno",
+    "id",
+)
+TIMESTAMP_COLUMNS = ("timestamp", "datetime", "punchtime", "checktime", "logtime")
+DATE_COLUMNS = ("date", "punchdate", "logdate")
+TIME_COLUMNS = ("time", "punchtime", "logtime")
+DIRECTION_COLUMNS = ("direction", "inout", "checktype", "punch", "state", "status", "type")
+
+IN = "in"
+OUT = "out"
+# ZK terminals: 0 check-in, 1 check-out, 2/3 break out/in, 4/5 overtime in/out.
+# Break punches are paired by order, which subtracts the break.
+DIRECTIONS = {
+    "0": IN,
+    "4": IN,
+    "i": IN,
+    "in": IN,
+    "checkin": IN,
+    "c/in": IN,
+    "clockin": IN,
+    "1": OUT,
+    "5": OUT,
+    "o": OUT,
+    "out": OUT,
+    "checkout": OUT,
+    "c/out": OUT,
+    "clockout": OUT,
+}
+
+# Punch: (time clock id, timestamp, direction or "", source line)
+Punch = tuple[str, datetime, str, int]
+
+
+def _norm(name: str) -> str:
+    return name.strip().lower().replace(" ", "").replace("_", "").replace("-", "")
+
+
+def _find(header: list[str], names: tuple[str, ...]) -> int:
+    for name in names:
+        if name in header:
+            return header.index(name)
+    return -1
+
+
+def _delimiter(line: str) -> str:
+    if "\t" in line:
+        return "\t"
+    if ";" in line and "," not in line:
+        return ";"
+    return ","
+
+
+def parse_timestamp(raw: str) -> datetime:
+    try:
+        ts = datetime.fromisoformat(raw)
+    except ValueError:
+        value = raw.strip().replace("/", "-")
+        if len(value) >= 10 and value[2] == "-" and value[5] == "-":
+            # DD-MM-YYYY
+            value = f"{value[6:10]}-{value[3:5]}-{value[0:2]}{value[10:]}"
+        ts = datetime.fromisoformat(value)
+    return ts.replace(tzinfo=None) if ts.tzinfo else ts
+
+
+def parse_punches(lines: Iterable[str]) -> tuple[list[Punch], list[dict[str, Any]]]:
+    """
+    Parse a CSV/TSV punch export (with a header row) or a headerless ZK
+    ``attlog`` file (``id<TAB>timestamp<TAB>verify<TAB>punch...``). Returns
+    the punches and one error per unreadable row.
+    """
+    punches: list[Punch] = []
+    errors: list[dict[str, Any]] = []
+    it = iter(lines)
+    first = next((line for line in it if line.strip()), "")
+    if not first:
+        return punches, errors
+    # One reader over the whole stream; csv does the splitting in C.
+    reader = csv.reader(itertools.chain([first], it), delimiter=_delimiter(first))
+    id_col, ts_col, date_col, time_col, dir_col = 0, 1, -1, -1, 3
+    header = [_norm(c) for c in next(csv.reader([first], delimiter=_delimiter(first)))]
+    if _find(header, CLOCK_ID_COLUMNS) >= 0:
+        next(reader)
+        id_col = _find(header, CLOCK_ID_COLUMNS)
+        ts_col = _find(header, TIMESTAMP_COLUMNS)
+        date_col = _find(header, DATE_COLUMNS)
+        time_col = _find(header, TIME_COLUMNS) if ts_col < 0 else -1
+        dir_col = _find(header, DIRECTION_COLUMNS)
+        if ts_col < 0 and (date_col < 0 or time_col < 0):
+            errors.append({"line": 1, "error": "missing_timestamp_column"})
+            return punches, errors
+    for cells in reader:
+        if not cells:
+            continue
+        line_no = reader.line_num
+        clock_id = cells[id_col].strip() if id_col < len(cells) else ""
+        try:
+            if ts_col >= 0:
+                ts = parse_timestamp(cells[ts_col])
+            else:
+                ts = parse_timestamp(f"{cells[date_col].strip()} {cells[time_col].strip()}")
+        except (IndexError, ValueError):
+            errors.append({"line": line_no, "error": "invalid_timestamp", "timeClockId": clock_id})
+            continue
+        if not clock_id:
+            errors.append({"line": line_no, "error": "missing_time_clock_id"})
+            continue
+        direction = ""
+        if 0 <= dir_col < len(cells):
+            direction = DIRECTIONS.get(_norm(cells[dir_col]), "")
+        punches.append((clock_id, ts, direction, line_no))
+    return punches, errors
+
+
+def pair_punches(punches: list[Punch]) -> list[dict[str, Any]]:
+    """
+    Pair punches into shifts and fold them into one attendance item per
+    (time clock id, day). One sort over all punches, then a single linear
+    sweep; no per-row date parsing after ``parse_punches``.
+    """
+    punches = sorted(punches, key=lambda p: (p[0], p[1]))
+    days: dict[tuple[str, date], dict[str, Any]] = {}
+
+    def day_for(clock_id: str, start: datetime) -> dict[str, Any]:
+        key = (clock_id, start.date())
+        day = days.get(key)
+        if day is None:
+            day = days[key] = {"minutes": 0, "first": start, "last": start, "pairs": 0, "unpaired": 0}
+        return day
+
+    def close(clock_id: str, start: datetime, end: datetime | None) -> None:
+        day = day_for(clock_id, start)
+        if end is None:
+            day["unpaired"] += 1
+            return
+        day["minutes"] += int((end - start).total_seconds() // 60)
+        day["pairs"] += 1
+        day["last"] = max(day["last"], end)
+
+    current = ""
+    open_at: datetime | None = None
+    last_at: datetime | None = None
+    for clock_id, ts, direction, _line in punches:
+        if clock_id != current:
+            if open_at is not None:
+                close(current, open_at, None)
+            current, open_at, last_at = clock_id, None, None
+        if last_at is not None and ts - last_at < DEBOUNCE:
+            continue
+        last_at = ts
+        if open_at is None:
+            if direction == OUT:
+                close(clock_id, ts, None)
+            else:
+                open_at = ts
+        elif direction == IN or ts - open_at > MAX_SHIFT:
+            # The previous check-in never got its check-out.
+            close(clock_id, open_at, None)
+            open_at = ts
+        else:
+            close(clock_id, open_at, ts)
+            open_at = None
+    if open_at is not None:
+        close(current, open_at, None)
+
+    items: list[dict[str, Any]] = []
+    for (clock_id, day_date), day in sorted(days.items()):
+        item: dict[str, Any] = {"timeClockId": clock_id, "date": day_date.isoformat()}
+        if day["pairs"]:
+            item["hours"] = round(day["minutes"] / 60, 2)
+            item["checkInAt"] = day["first"].isoformat()
+            item["checkOutAt"] = day["last"].isoformat()
+        else:
+            item["status"] = "present"
+        if day["unpaired"]:
+            item["notes"] = UNPAIRED_NOTE
+        items.append(item)
+    return items
+
+
+def items_from_lines(lines: Iterable[str]) -> list[dict[str, Any]]:
+    """
+    Attendance items for the importer. Unreadable rows come back as items
+    carrying ``sourceError`` so they are reported next to the others.
+    """
+    punches, errors = parse_punches(lines)
+    items = pair_punches(punches)
+    for e in errors:
+        items.append(
+            {
+                "timeClockId": e.get("timeClockId") or "",
+                "sourceError": e["error"],
+                "sourceLine": e["line"],
+            }
+        )
+    return items
+
+
+def items_from_file(path: Path) -> list[dict[str, Any]]:
+    with path.open("r", encoding="utf-8-sig", errors="replace", newline="") as fh:
+        return items_from_lines(fh)
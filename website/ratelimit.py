@@ -0,0 +1,418 @@
+from __future__ import annotations
+
+import math
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+ALGORITHM_TOKEN_BUCKET = "token_bucket"
+ALGORITHM_SLIDING_LOG = "sliding_log"
+ALGORITHMS = {ALGORITHM_TOKEN_BUCKET, ALGORITHM_SLIDING_LOG}
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    remaining: int
+    retry_after: int
+    usage: float
+
+
+def _token_bucket_step(
+    tokens: float | None, updated: float | None, *, limit: int, window: int, now: float
+) -> tuple[float, Decision]:
+    rate = limit / window
+    if tokens is None or updated is None:
+        tokens = float(limit)
+    else:
+        tokens = min(float(limit), tokens + max(0.0, now - updated) * rate)
+    allowed = tokens >= 1.0
+    if allowed:
+        tokens -= 1.0
+        retry_after = 0
+    else:
+        retry_after = max(1, math.ceil((1.0 - tokens) / rate))
+    usage = 1.0 - (tokens / limit)
+    return tokens, Decision(allowed, int(tokens), retry_after, round(usage, 4))
+
+
+class MemoryBackend:
+    """Process-local store; for development and tests only."""
+
+    def __init__(self, options: dict[str, Any]):
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[float, float]] = {}
+        self._logs: dict[str, list[float]] = {}
+        self._stats: dict[str, dict[str, Any]] = {}
+
+    def _record(self, scope: str, decision: Decision, now: float, limit: int, window: int) -> None:
+        row = self._stats.setdefault(
+            scope, {"allowed": 0, "limited": 0, "peakUsage": 0.0, "lastUsage": 0.0, "updatedAt": 0.0}
+        )
+        row["limit"] = limit
+        row["windowSeconds"] = window
+        row["allowed" if decision.allowed else "limited"] += 1
+        row["peakUsage"] = max(row["peakUsage"], decision.usage)
+        row["lastUsage"] = decision.usage
+        row["updatedAt"] = now
+
+    def hit(self, scope: str, key: str, *, limit: int, window: int, algorithm: str) -> Decision:
+        now = time.time()
+        with self._lock:
+            if algorithm == ALGORITHM_SLIDING_LOG:
+                log = [ts for ts in self._logs.get(key, []) if ts > now - window]
+                if len(log) < limit:
+                    log.append(now)
+                    decision = Decision(True, limit - len(log), 0, round(len(log) / limit, 4))
+                else:
+                    retry = max(1, math.ceil(log[0] + window - now))
+                    decision = Decision(False, 0, retry, 1.0)
+                self._logs[key] = log
+            else:
+                tokens, updated = self._buckets.get(key, (None, None))
+                tokens, decision = _token_bucket_step(
+                    tokens, updated, limit=limit, window=window, now=now
+                )
+                self._buckets[key] = (tokens, now)
+            self._record(scope, decision, now, limit, window)
+        return decision
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {k: dict(v) for k, v in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class SQLiteBackend:
+    """
+    Node-local store shared by every gunicorn worker through one SQLite file
+    in WAL mode. Each decision is a single ``BEGIN IMMEDIATE`` transaction,
+    so concurrent workers serialize on the write lock instead of racing.
+    """
+
+    _SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS buckets ("
+        " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS hits (key TEXT NOT NULL, ts REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS hits_key_ts ON hits (key, ts)",
+        "CREATE TABLE IF NOT EXISTS scope_stats ("
+        " scope TEXT PRIMARY KEY, allowed INTEGER NOT NULL DEFAULT 0,"
+        " limited INTEGER NOT NULL DEFAULT 0, peak_usage REAL NOT NULL DEFAULT 0,"
+        " last_usage REAL NOT NULL DEFAULT 0, updated REAL NOT NULL DEFAULT 0,"
+        " lim INTEGER NOT NULL DEFAULT 0, win INTEGER NOT NULL DEFAULT 0)",
+    ]
+
+    def __init__(self, options: dict[str, Any]):
+        path = options.get("PATH") or Path(settings.BASE_DIR) / "cache" / "ratelimit.sqlite3"
+        self.path = Path(path)
+        self.timeout = float(options.get("TIMEOUT") or 5)
+        self.purge_probability = float(options.get("PURGE_PROBABILITY") or 0.01)
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self.path), timeout=self.timeout, isolation_level=None, check_same_thread=False
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            for stmt in self._SCHEMA:
+                conn.execute(stmt)
+            self._local.conn = conn
+        return conn
+
+    def _purge(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM buckets WHERE expires < ?", (now,))
+        conn.execute("DELETE FROM hits WHERE ts < ?", (now - 86400,))
+
+    def hit(self, scope: str, key: str, *, limit: int, window: int, algorithm: str) -> Decision:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if algorithm == ALGORITHM_SLIDING_LOG:
+                conn.execute("DELETE FROM hits WHERE key = ? AND ts <= ?", (key, now - window))
+                count, oldest = conn.execute(
+                    "SELECT COUNT(*), MIN(ts) FROM hits WHERE key = ?", (key,)
+                ).fetchone()
+                if count < limit:
+                    conn.execute("INSERT INTO hits (key, ts) VALUES (?, ?)", (key, now))
+                    decision = Decision(True, limit - count - 1, 0, round((count + 1) / limit, 4))
+                else:
+                    retry = max(1, math.ceil(float(oldest) + window - now))
+                    decision = Decision(False, 0, retry, 1.0)
+            else:
+                row = conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                tokens, decision = _token_bucket_step(
+                    row[0] if row else None,
+                    row[1] if row else None,
+                    limit=limit,
+                    window=window,
+                    now=now,
+                )
+                conn.execute(
+                    "INSERT INTO buckets (key, tokens, updated, expires) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(key) DO UPDATE SET"
+                    " tokens = excluded.tokens, updated = excluded.updated, expires = excluded.expires",
+                    (key, tokens, now, now + window),
+                )
+            conn.execute(
+                "INSERT INTO scope_stats"
+                " (scope, allowed, limited, peak_usage, last_usage, updated, lim, win)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(scope) DO UPDATE SET"
+                " allowed = allowed + excluded.allowed, limited = limited + excluded.limited,"
+                " peak_usage = MAX(peak_usage, excluded.peak_usage),"
+                " last_usage = excluded.last_usage, updated = excluded.updated,"
+                " lim = excluded.lim, win = excluded.win",
+                (
+                    scope,
+                    1 if decision.allowed else 0,
+                    0 if decision.allowed else 1,
+                    decision.usage,
+                    decision.usage,
+                    now,
+                    limit,
+                    window,
+                ),
+            )
+            if random.random() < self.purge_probability:
+                self._purge(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT scope, allowed, limited, peak_usage, last_usage, updated, lim, win"
+            " FROM scope_stats"
+        )
+        return {
+            str(scope): {
+                "allowed": int(allowed),
+                "limited": int(limited),
+                "peakUsage": float(peak),
+                "lastUsage": float(last),
+                "updatedAt": float(updated),
+                "limit": int(lim),
+                "windowSeconds": int(win),
+            }
+            for scope, allowed, limited, peak, last, updated, lim, win in rows
+        }
+
+    def reset_stats(self) -> None:
+        self._conn().execute("DELETE FROM scope_stats")
+
+
+_REDIS_TOKEN_BUCKET = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local rate = limit / window
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1])
+local updated = tonumber(state[2])
+if tokens == nil or updated == nil then
+  tokens = limit
+else
+  tokens = math.min(limit, tokens + math.max(0, now - updated) * rate)
+end
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry = math.max(1, math.ceil((1 - tokens) / rate))
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], window)
+local usage = 1 - (tokens / limit)
+return {allowed, math.floor(tokens), retry, tostring(usage)}
+"""
+
+_REDIS_SLIDING_LOG = """
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local member = ARGV[4]
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+if count < limit then
+  redis.call('ZADD', KEYS[1], now, member)
+  redis.call('EXPIRE', KEYS[1], window)
+  return {1, limit - count - 1, 0, tostring((count + 1) / limit)}
+end
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+local retry = math.max(1, math.ceil(tonumber(oldest[2]) + window - now))
+return {0, 0, retry, '1'}
+"""
+
+_REDIS_RECORD = """
+redis.call('HINCRBY', KEYS[1], ARGV[1], 1)
+local peak = tonumber(redis.call('HGET', KEYS[1], 'peakUsage') or '0')
+local usage = tonumber(ARGV[2])
+if usage > peak then
+  redis.call('HSET', KEYS[1], 'peakUsage', ARGV[2])
+end
+redis.call('HSET', KEYS[1], 'lastUsage', ARGV[2], 'updatedAt', ARGV[3], 'limit', ARGV[5], 'windowSeconds', ARGV[6])
+redis.call('SADD', KEYS[2], ARGV[4])
+return 1
+"""
+
+
+class RedisBackend:
+    """
+    Shared store for multi-node deployments. Speaks the Redis protocol through
+    the optional ``redis`` package, so any compatible server (or a local
+    stand-in such as ``redis-server`` on a developer machine) can back it.
+    """
+
+    def __init__(self, options: dict[str, Any]):
+        try:
+            import redis  # type: ignore[import-not-found]
+        except Exception as exc:
+            raise ImproperlyConfigured(
+                "RATE_LIMIT BACKEND 'redis' requires the 'redis' package."
+            ) from exc
+        client = options.get("CLIENT")
+        self.client = client or redis.Redis.from_url(
+            str(options.get("URL") or "redis://localhost:6379/0")
+        )
+        self.prefix = str(options.get("PREFIX") or "rl")
+        self._token_bucket = self.client.register_script(_REDIS_TOKEN_BUCKET)
+        self._sliding_log = self.client.register_script(_REDIS_SLIDING_LOG)
+        self._record = self.client.register_script(_REDIS_RECORD)
+
+    def hit(self, scope: str, key: str, *, limit: int, window: int, algorithm: str) -> Decision:
+        now = time.time()
+        rkey = f"{self.prefix}:{algorithm}:{key}"
+        if algorithm == ALGORITHM_SLIDING_LOG:
+            member = f"{now:.6f}:{random.random():.8f}"
+            raw = self._sliding_log(keys=[rkey], args=[limit, window, now, member])
+        else:
+            raw = self._token_bucket(keys=[rkey], args=[limit, window, now])
+        decision = Decision(
+            bool(int(raw[0])), int(raw[1]), int(raw[2]), round(float(raw[3]), 4)
+        )
+        self._record(
+            keys=[f"{self.prefix}:stats:{scope}", f"{self.prefix}:stats"],
+            args=[
+                "allowed" if decision.allowed else "limited",
+                decision.usage,
+                now,
+                scope,
+                limit,
+                window,
+            ],
+        )
+        return decision
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for raw_scope in self.client.smembers(f"{self.prefix}:stats"):
+            scope = raw_scope.decode() if isinstance(raw_scope, bytes) else str(raw_scope)
+            row = {
+                (k.decode() if isinstance(k, bytes) else str(k)): v
+                for k, v in self.client.hgetall(f"{self.prefix}:stats:{scope}").items()
+            }
+            out[scope] = {
+                "allowed": int(row.get("allowed") or 0),
+                "limited": int(row.get("limited") or 0),
+                "peakUsage": float(row.get("peakUsage") or 0),
+                "lastUsage": float(row.get("lastUsage") or 0),
+                "updatedAt": float(row.get("updatedAt") or 0),
+                "limit": int(row.get("limit") or 0),
+                "windowSeconds": int(row.get("windowSeconds") or 0),
+            }
+        return out
+
+    def reset_stats(self) -> None:
+        scopes = list(self.client.smembers(f"{self.prefix}:stats"))
+        keys = [
+            f"{self.prefix}:stats:{s.decode() if isinstance(s, bytes) else s}" for s in scopes
+        ]
+        self.client.delete(f"{self.prefix}:stats", *keys)
+
+
+BACKENDS: dict[str, type] = {
+    "memory": MemoryBackend,
+    "sqlite": SQLiteBackend,
+    "redis": RedisBackend,
+}
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+
+
+def _config() -> dict[str, Any]:
+    conf = getattr(settings, "RATE_LIMIT", None)
+    return dict(conf) if isinstance(conf, dict) else {}
+
+
+def get_backend() -> Any:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                conf = _config()
+                name = str(conf.get("BACKEND") or "sqlite")
+                backend_cls = BACKENDS.get(name)
+                if backend_cls is None:
+                    raise ImproperlyConfigured(f"Unknown RATE_LIMIT BACKEND: {name}")
+                _backend = backend_cls(conf)
+    return _backend
+
+
+def reset_backend() -> None:
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+
+def hit(scope: str, ident: str, *, limit: int, window_seconds: int) -> Decision:
+    lim = max(1, int(limit))
+    win = max(1, int(window_seconds))
+    algorithm = str(_config().get("ALGORITHM") or ALGORITHM_TOKEN_BUCKET)
+    if algorithm not in ALGORITHMS:
+        algorithm = ALGORITHM_TOKEN_BUCKET
+    return get_backend().hit(
+        scope, f"{scope}:{ident}", limit=lim, window=win, algorithm=algorithm
+    )
+
+
+def scope_stats() -> list[dict[str, Any]]:
+    rows = get_backend().stats()
+    items: list[dict[str, Any]] = []
+    for scope in sorted(rows):
+        row = rows[scope]
+        items.append(
+            {
+                "scope": scope,
+                "limit": int(row.get("limit") or 0),
+                "windowSeconds": int(row.get("windowSeconds") or 0),
+                "allowed": int(row.get("allowed") or 0),
+                "limited": int(row.get("limited") or 0),
+                "peakUsage": float(row.get("peakUsage") or 0),
+                "lastUsage": float(row.get("lastUsage") or 0),
+                "updatedAt": float(row.get("updatedAt") or 0),
+            }
+        )
+    return items
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import logging
+from datetime import date
+from decimal import Decimal
+from typing import Any
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models.functions import ExtractMonth
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from website import payroll
+from website.models import AttendanceProjectDayRollup
+from website.models import AttendanceWorkerMonthRollup
+from website.models import WorkerAttendance
+
+
+logger = logging.getLogger(__name__)
+
+WRITE_BATCH_SIZE = 500
+# Dates per refresh query; keeps the IN lists of a large import bounded.
+REFRESH_CHUNK = 200
+COUNTERS = (
+    ("present", WorkerAttendance.STATUS_PRESENT),
+    ("half_day", WorkerAttendance.STATUS_HALF_DAY),
+    ("absent", WorkerAttendance.STATUS_ABSENT),
+    ("leave", WorkerAttendance.STATUS_LEAVE),
+)
+UPDATE_FIELDS = [name for name, _status in COUNTERS] + ["hours", "refreshed_at"]
+
+
+def _aggregates() -> dict[str, Any]:
+    out: dict[str, Any] = {name: Count("id", filter=Q(status=status)) for name, status in COUNTERS}
+    out["hours"] = Sum("hours")
+    return out
+
+
+def _values(row: dict[str, Any]) -> dict[str, Any]:
+    out = {name: int(row[name] or 0) for name, _status in COUNTERS}
+    out["hours"] = row["hours"] or Decimal("0")
+    return out
+
+
+def refresh_project_days(dates: Iterable[date]) -> None:
+    """
+    Recompute the (project, day) rollup of every project on these days:
+    one grouped query, an upsert of the groups found and a delete of the
+    rollup rows that no longer have attendance behind them.
+    """
+    days = sorted(set(dates))
+    now = timezone.now()
+    for i in range(0, len(days), REFRESH_CHUNK):
+        chunk = days[i : i + REFRESH_CHUNK]
+        rows = (
+            WorkerAttendance.objects.filter(date__in=chunk, project__isnull=False)
+            .order_by()
+            .values("project_id", "date")
+            .annotate(**_aggregates())
+        )
+        objs = [
+            AttendanceProjectDayRollup(project_id=r["project_id"], date=r["date"], refreshed_at=now, **_values(r))
+            for r in rows
+        ]
+        with transaction.atomic():
+            if objs:
+                AttendanceProjectDayRollup.objects.bulk_create(
+                    objs,
+                    batch_size=WRITE_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=["project", "date"],
+                    update_fields=UPDATE_FIELDS,
+                )
+            AttendanceProjectDayRollup.objects.filter(date__in=chunk, refreshed_at__lt=now).delete()
+
+
+def refresh_worker_months(keys: Iterable[tuple[int, int, int]]) -> None:
+    """
+    Recompute the (worker, year, month) rollup for these keys, the same
+    way as ``refresh_project_days``.
+    """
+    now = timezone.now()
+    by_period: dict[tuple[int, int], set[int]] = {}
+    for worker_id, year, month in keys:
+        by_period.setdefault((year, month), set()).add(worker_id)
+    for (year, month), worker_ids in sorted(by_period.items()):
+        start, end = payroll.month_range(year, month)
+        rows = (
+            WorkerAttendance.objects.filter(worker_id__in=worker_ids, date__gte=start, date__lt=end)
+            .order_by()
+            .values("worker_id")
+            .annotate(**_aggregates())
+        )
+        objs = [
+            AttendanceWorkerMonthRollup(
+                worker_id=r["worker_id"], year=year, month=month, refreshed_at=now, **_values(r)
+            )
+            for r in rows
+        ]
+        with transaction.atomic():
+            if objs:
+                AttendanceWorkerMonthRollup.objects.bulk_create(
+                    objs,
+                    batch_size=WRITE_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=["worker", "year", "month"],
+                    update_fields=UPDATE_FIELDS,
+                )
+            AttendanceWorkerMonthRollup.objects.filter(
+                worker_id__in=worker_ids, year=year, month=month, refreshed_at__lt=now
+            ).delete()
+
+
+def refresh(keys: Iterable[tuple[int, date]]) -> None:
+    keys = {(int(w), d) for w, d in keys if w and d}
+    if not keys:
+        return
+    refresh_project_days(d for _w, d in keys)
+    refresh_worker_months({(w, d.year, d.month) for w, d in keys})
+
+
+def refresh_later(keys: Iterable[tuple[int, date]]) -> None:
+    """
+    Refresh the rollups for these (worker id, attendance date) keys once
+    the current transaction commits, so they are computed from committed
+    rows.
+    """
+    keys = {(int(w), d) for w, d in keys if w and d}
+    if keys:
+        transaction.on_commit(lambda: _refresh_logged(keys))
+
+
+def _refresh_logged(keys: set[tuple[int, date]]) -> None:
+    try:
+        refresh(keys)
+    except Exception:
+        # The attendance change itself is committed; rebuild_rollups
+        # repairs whatever a failed refresh left behind.
+        logger.exception("Failed to refresh attendance rollups")
+
+
+def rebuild(*, date_from: date | None = None, date_to: date | None = None) -> dict[str, int]:
+    """
+    Recompute both rollups from WorkerAttendance, one month at a time,
+    optionally limited to ``date_from``..``date_to`` (inclusive). Rollup
+    rows of months without attendance are removed.
+    """
+    qs = WorkerAttendance.objects.all()
+    if date_from:
+        qs = qs.filter(date__gte=date_from)
+    if date_to:
+        qs = qs.filter(date__lte=date_to)
+    periods = sorted(
+        {
+            (int(r["year"]), int(r["month"]))
+            for r in qs.order_by()
+            .annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+            .values("year", "month")
+            .distinct()
+        }
+    )
+    now = timezone.now()
+    for year, month in periods:
+        start, end = payroll.month_range(year, month)
+        month_qs = WorkerAttendance.objects.filter(date__gte=start, date__lt=end)
+        days = list(month_qs.order_by().values_list("date", flat=True).distinct())
+        workers = set(month_qs.order_by().values_list("worker_id", flat=True).distinct())
+        refresh_project_days(days)
+        refresh_worker_months((w, year, month) for w in workers)
+    # Anything not refreshed above has no attendance left behind it.
+    stale_days = AttendanceProjectDayRollup.objects.filter(refreshed_at__lt=now)
+    stale_months = AttendanceWorkerMonthRollup.objects.filter(refreshed_at__lt=now)
+    if date_from:
+        stale_days = stale_days.filter(date__gte=date_from)
+        stale_months = stale_months.filter(
+            Q(year__gt=date_from.year) | Q(year=date_from.year, month__gte=date_from.month)
+        )
+    if date_to:
+        stale_days = stale_days.filter(date__lte=date_to)
+        stale_months = stale_months.filter(
+            Q(year__lt=date_to.year) | Q(year=date_to.year, month__lte=date_to.month)
+        )
+    stale_days.delete()
+    stale_months.delete()
+    return {
+        "months": len(periods),
+        "projectDays": AttendanceProjectDayRollup.objects.count(),
+        "workerMonths": AttendanceWorkerMonthRollup.objects.count(),
+    }
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import time
+from typing import Any
+from typing import Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+from website.spa_shell import negotiate_encoding
+
+
+VERSION_KEY = "site_api:version"
+
+
+def _timeout() -> int:
+    return int(getattr(settings, "SITE_API_SNAPSHOT_TIMEOUT", 3600) or 3600)
+
+
+def current_version() -> int:
+    try:
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(VERSION_KEY, version, None):
+                version = cache.get(VERSION_KEY) or version
+        return int(version)
+    except Exception:
+        return 0
+
+
+def bump_version() -> None:
+    try:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+    except Exception:
+        pass
+
+
+def _on_content_change(sender: Any, **kwargs: Any) -> None:
+    # Bump after commit so a concurrent request cannot rebuild a snapshot
+    # from the old rows and store it under the new version.
+    transaction.on_commit(bump_version)
+
+
+def _on_page_change(sender: Any, **kwargs: Any) -> None:
+    transaction.on_commit(bump_version)
+
+
+def snapshot_models() -> list[type]:
+    from wagtail.images import get_image_model
+    from wagtail.models import Site
+
+    from website.models import CompanySettings
+    from website.models import HomeAIFeature
+    from website.models import HomeAIMetric
+    from website.models import HomePageSettings
+    from website.models import HomeStat
+    from website.models import HomeTimelineStep
+    from website.models import HomeTrustBadge
+    from website.models import SiteVisibilitySettings
+    from website.models import TeamMember
+    from website.models import Testimonial
+
+    return [
+        Site,
+        get_image_model(),
+        CompanySettings,
+        HomePageSettings,
+        SiteVisibilitySettings,
+        TeamMember,
+        Testimonial,
+        HomeTrustBadge,
+        HomeStat,
+        HomeTimelineStep,
+        HomeAIFeature,
+        HomeAIMetric,
+    ]
+
+
+def snapshot_page_models() -> list[type]:
+    from website.models import ProjectIndexPage
+    from website.models import ProjectPage
+    from website.models import ServiceIndexPage
+    from website.models import ServicePage
+
+    return [ServiceIndexPage, ServicePage, ProjectIndexPage, ProjectPage]
+
+
+def connect_signals() -> None:
+    for model in snapshot_models():
+        uid = f"site_snapshots:{model._meta.label_lower}"
+        post_save.connect(_on_content_change, sender=model, dispatch_uid=f"{uid}:save")
+        post_delete.connect(_on_content_change, sender=model, dispatch_uid=f"{uid}:delete")
+
+    from wagtail.signals import page_published
+    from wagtail.signals import page_unpublished
+    from wagtail.signals import post_page_move
+
+    # Draft saves do not change the public payload; only publishing,
+    # unpublishing, moving and deleting pages do.
+    page_published.connect(_on_page_change, dispatch_uid="site_snapshots:page_published")
+    page_unpublished.connect(_on_page_change, dispatch_uid="site_snapshots:page_unpublished")
+    post_page_move.connect(_on_page_change, dispatch_uid="site_snapshots:page_move")
+    for model in snapshot_page_models():
+        uid = f"site_snapshots:{model._meta.label_lower}"
+        post_delete.connect(_on_page_change, sender=model, dispatch_uid=f"{uid}:delete")
+
+
+def _origin(request: HttpRequest) -> str:
+    try:
+        origin = request.build_absolute_uri("/")
+    except Exception:
+        origin = ""
+    return hashlib.sha1(origin.encode("utf-8")).hexdigest()[:12]
+
+
+def site_id_for_request(request: HttpRequest, resolve: Callable[[HttpRequest], Any]) -> int:
+    key = f"site_api:site:{_origin(request)}:{current_version()}"
+    site_id = cache.get(key)
+    if site_id is None:
+        site = resolve(request)
+        site_id = int(getattr(site, "pk", 0) or 0)
+        cache.set(key, site_id, _timeout())
+    return int(site_id)
+
+
+def accepted_encoding(request: HttpRequest) -> str:
+    return negotiate_encoding(request, ("gzip",))
+
+
+def get_or_build(
+    request: HttpRequest,
+    name: str,
+    site_id: int,
+    build: Callable[[], bytes],
+    *,
+    variant: str = "",
+    encoding: str = "",
+) -> tuple[str, bytes]:
+    key = f"site_api:{name}:{site_id}:{_origin(request)}:{variant}:{encoding}:{current_version()}"
+    cached = cache.get(key)
+    if isinstance(cached, tuple) and len(cached) == 2:
+        return cached
+    body = build()
+    if encoding == "gzip":
+        body = gzip.compress(body, compresslevel=9, mtime=0)
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    cache.set(key, (etag, body), _timeout())
+    return etag, body
+
+
+def conditional_response(
+    request: HttpRequest,
+    etag: str,
+    body: bytes,
+    *,
+    content_type: str = "application/json",
+    encoding: str = "",
+) -> HttpResponse:
+    if_none_match = str(request.META.get("HTTP_IF_NONE_MATCH") or "")
+    if if_none_match:
+        tags = parse_etags(if_none_match)
+        weak = "W/" + etag
+        if "*" in tags or etag in tags or weak in tags:
+            resp: HttpResponse = HttpResponseNotModified()
+            resp["ETag"] = etag
+            resp["Cache-Control"] = "no-cache"
+            if encoding:
+                patch_vary_headers(resp, ("Accept-Encoding",))
+            return resp
+    resp = HttpResponse(body, content_type=content_type)
+    resp["ETag"] = etag
+    resp["Cache-Control"] = "no-cache"
+    if encoding:
+        patch_vary_headers(resp, ("Accept-Encoding",))
+        if encoding != "identity":
+            resp["Content-Encoding"] = encoding
+    return resp
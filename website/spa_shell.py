@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+from typing import Sequence
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseNotModified
+from django.templatetags.static import static
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+
+SPA_DIR = Path(__file__).resolve().parent / "static" / "website" / "samarqand_spa"
+INDEX_NAME = "index.html"
+COMPILED_NAME = "shell.html"
+MANIFEST_NAME = "manifest.json"
+ASSETS_DIR = "assets"
+COMPRESSIBLE_SUFFIXES = {".js", ".mjs", ".css", ".html", ".json", ".map", ".svg", ".txt", ".wasm"}
+# Vite emits content-hashed names such as ``index-DfkxZLTa.js``.
+HASHED_ASSET_RE = re.compile(r"-[A-Za-z0-9_-]{8,}\.[A-Za-z0-9]+$")
+
+_lock = threading.Lock()
+_cached: tuple[Any, CompiledShell | None] | None = None
+
+
+@dataclass(frozen=True)
+class CompiledShell:
+    html: str
+    body: bytes
+    gzip: bytes
+    br: bytes
+    etag: str
+
+    def encoded(self, encoding: str) -> bytes:
+        if encoding == "br":
+            return self.br
+        if encoding == "gzip":
+            return self.gzip
+        return self.body
+
+
+def _brotli() -> Any:
+    try:
+        import brotli  # type: ignore[import-not-found]
+    except Exception:
+        return None
+    return brotli
+
+
+def _candidate_dirs() -> list[Path]:
+    dirs = [SPA_DIR]
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if static_root:
+        dirs.append(Path(static_root) / "website" / "samarqand_spa")
+    return dirs
+
+
+def rewrite_root_paths(html: str) -> str:
+    if not html:
+        return ""
+    base = static("website/samarqand_spa")
+
+    def repl(match: re.Match[str]) -> str:
+        quote = match.group(1)
+        path = match.group(2)
+        if path.startswith("//") or "://" in path:
+            return match.group(0)
+        if not (path.startswith("/assets/") or path.startswith("/@vite/")):
+            return match.group(0)
+        if path.startswith("/"):
+            path = path[1:]
+        return f"{quote}{base.rstrip('/')}/{path}{quote}"
+
+    html = re.sub(r'([\"\'])(\/(?!\/)[^\"\']+)\1', repl, html)
+    return html
+
+
+def compile_html(html: str) -> CompiledShell:
+    body = html.encode("utf-8")
+    brotli = _brotli()
+    return CompiledShell(
+        html=html,
+        body=body,
+        gzip=gzip.compress(body, compresslevel=9, mtime=0),
+        br=brotli.compress(body, quality=11) if brotli else b"",
+        etag=hashlib.sha1(body).hexdigest(),
+    )
+
+
+def compile_index(directory: Path) -> CompiledShell | None:
+    index_path = directory / INDEX_NAME
+    if not index_path.exists():
+        return None
+    return compile_html(rewrite_root_paths(index_path.read_text(encoding="utf-8")))
+
+
+def write_artifacts(directory: Path) -> list[Path]:
+    """
+    Compile ``index.html`` in ``directory`` into ``shell.html`` plus its
+    ``.gz`` (and ``.br`` when brotli is installed) siblings.
+    """
+    shell = compile_index(directory)
+    if shell is None:
+        return []
+    written = []
+    for suffix, data in (("", shell.body), (".gz", shell.gzip), (".br", shell.br)):
+        path = directory / f"{COMPILED_NAME}{suffix}"
+        if not data:
+            path.unlink(missing_ok=True)
+            continue
+        path.write_bytes(data)
+        written.append(path)
+    return written
+
+
+def precompress_assets(directory: Path) -> dict[str, Any]:
+    """
+    Write ``.gz`` and ``.br`` siblings for the built assets and a
+    ``manifest.json`` describing them. A variant is only kept when it is
+    smaller than the original.
+    """
+    brotli = _brotli()
+    files: dict[str, Any] = {}
+    assets = directory / ASSETS_DIR
+    for path in sorted(assets.rglob("*")) if assets.exists() else []:
+        if not path.is_file() or path.suffix in {".gz", ".br"}:
+            continue
+        data = path.read_bytes()
+        encodings: dict[str, int] = {}
+        if path.suffix in COMPRESSIBLE_SUFFIXES:
+            variants = {"gzip": (".gz", gzip.compress(data, compresslevel=9, mtime=0))}
+            if brotli:
+                variants["br"] = (".br", brotli.compress(data, quality=11))
+            for encoding, (suffix, compressed) in variants.items():
+                target = path.with_name(path.name + suffix)
+                if len(compressed) < len(data):
+                    target.write_bytes(compressed)
+                    encodings[encoding] = len(compressed)
+                else:
+                    target.unlink(missing_ok=True)
+        files[path.relative_to(directory).as_posix()] = {
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "size": len(data),
+            "hashed": bool(HASHED_ASSET_RE.search(path.name)),
+            "encodings": encodings,
+        }
+    manifest = {"version": 1, "files": files}
+    (directory / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    return manifest
+
+
+def _stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _load_artifacts(directory: Path) -> CompiledShell | None:
+    body = (directory / COMPILED_NAME).read_bytes()
+    gz_path = directory / f"{COMPILED_NAME}.gz"
+    br_path = directory / f"{COMPILED_NAME}.br"
+    if not gz_path.exists():
+        return compile_html(body.decode("utf-8"))
+    return CompiledShell(
+        html=body.decode("utf-8"),
+        body=body,
+        gzip=gz_path.read_bytes(),
+        br=br_path.read_bytes() if br_path.exists() else b"",
+        etag=hashlib.sha1(body).hexdigest(),
+    )
+
+
+def get_shell() -> CompiledShell | None:
+    """
+    Return the compiled shell, rebuilding it only when ``index.html`` or the
+    build-time artifact changes on disk.
+    """
+    global _cached
+
+    for directory in _candidate_dirs():
+        index_stamp = _stamp(directory / INDEX_NAME)
+        if index_stamp is None:
+            continue
+        compiled_stamp = _stamp(directory / COMPILED_NAME)
+        key = (directory, index_stamp, compiled_stamp)
+        cached = _cached
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with _lock:
+            if compiled_stamp is not None and compiled_stamp[0] >= index_stamp[0]:
+                shell = _load_artifacts(directory)
+            else:
+                shell = compile_index(directory)
+            _cached = (key, shell)
+        return shell
+    return None
+
+
+def negotiate_encoding(request: HttpRequest, offered: Sequence[str]) -> str:
+    """
+    Pick the first coding in ``offered`` that the client accepts, or
+    "identity".
+    """
+    accepted: set[str] = set()
+    accept = str(request.META.get("HTTP_ACCEPT_ENCODING") or "").lower()
+    for part in accept.split(","):
+        token, _, params = part.strip().partition(";")
+        params = params.replace(" ", "")
+        q = 1.0
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(token.strip())
+    for coding in offered:
+        if coding in accepted or "*" in accepted:
+            return coding
+    return "identity"
+
+
+def shell_response(request: HttpRequest) -> HttpResponse | None:
+    shell = get_shell()
+    if shell is None:
+        return None
+    offered = ("br", "gzip") if shell.br else ("gzip",)
+    encoding = negotiate_encoding(request, offered)
+    etag = f'"{shell.etag}"' if encoding == "identity" else f'"{shell.etag}-{encoding}"'
+
+    if_none_match = str(request.META.get("HTTP_IF_NONE_MATCH") or "")
+    if if_none_match:
+        tags = parse_etags(if_none_match)
+        if "*" in tags or etag in tags or "W/" + etag in tags:
+            resp: HttpResponse = HttpResponseNotModified()
+            resp["ETag"] = etag
+            resp["Cache-Control"] = "no-cache"
+            patch_vary_headers(resp, ("Accept-Encoding",))
+            return resp
+
+    resp = HttpResponse(shell.encoded(encoding), content_type="text/html; charset=utf-8")
+    resp["ETag"] = etag
+    resp["Cache-Control"] = "no-cache"
+    if encoding != "identity":
+        resp["Content-Encoding"] = encoding
+    patch_vary_headers(resp, ("Accept-Encoding",))
+    return resp
@@ -0,0 +1,500 @@
+import json
+import shutil
+import tempfile
+from datetime import date
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Site
+
+from website import analytics
+from website import attendance
+from website import payroll
+from website.models import ProjectGalleryImage
+from website.models import ProjectIndexPage
+from website.models import ProjectPage
+from website.models import ServiceIndexPage
+from website.models import ServicePage
+from website.models import TeamMember
+from website.models import Worker
+from website.models import WorkerAttendance
+from website.models import WorkerPayrollDirtyPeriod
+from website.models import WorkerPayrollEntry
+
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PublicListingQueryCountTests(TestCase):
+    # The public listings resolve pages and images in bulk, so the number of
+    # queries a request makes must not grow with the number of rows.
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        root = Site.objects.get(is_default_site=True).root_page
+        cls.services = root.add_child(
+            instance=ServiceIndexPage(title="Services", slug="services")
+        )
+        cls.projects = root.add_child(
+            instance=ProjectIndexPage(title="Projects", slug="projects")
+        )
+
+    def _image(self):
+        return get_image_model().objects.create(
+            title="image", file=get_test_image_file()
+        )
+
+    def _add_services(self, count):
+        for _ in range(count):
+            n = ServicePage.objects.count()
+            self.services.add_child(
+                instance=ServicePage(
+                    title=f"Service {n}",
+                    slug=f"service-{n}",
+                    cover_image=self._image(),
+                )
+            )
+
+    def _add_projects(self, count):
+        # Alternate between a gallery-only project and one with a cover
+        # image, so every count includes the gallery fallback query.
+        for _ in range(count):
+            n = ProjectPage.objects.count()
+            with_cover = n % 2 == 1
+            page = self.projects.add_child(
+                instance=ProjectPage(
+                    title=f"Project {n}",
+                    slug=f"project-{n}",
+                    cover_image=self._image() if with_cover else None,
+                )
+            )
+            if not with_cover:
+                for sort_order in range(2):
+                    ProjectGalleryImage.objects.create(
+                        page=page, image=self._image(), sort_order=sort_order
+                    )
+
+    def _add_team(self, count):
+        for _ in range(count):
+            n = TeamMember.objects.count()
+            TeamMember.objects.create(name=f"Member {n}", image=self._image())
+
+    def _count_queries(self, url, expected_items):
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        items = response.json()["result"]["items"]
+        self.assertEqual(len(items), expected_items)
+        self.assertTrue(all(item["imageUrl"] for item in items))
+        return len(ctx.captured_queries)
+
+    def _assert_constant(self, url, add):
+        add(1)
+        one = self._count_queries(url, 1)
+        add(5)
+        many = self._count_queries(url, 6)
+        self.assertEqual(one, many)
+
+    def test_site_services(self):
+        self._assert_constant("/api/site/services", self._add_services)
+
+    def test_site_projects(self):
+        self._assert_constant("/api/site/projects", self._add_projects)
+
+    def test_site_team(self):
+        self._assert_constant("/api/site/team", self._add_team)
+
+
+class OpsIndexPlanTests(TestCase):
+    # Runs against the configured database (SQLite, or PostgreSQL with
+    # DB_ENGINE=postgres). The tables are empty, so PostgreSQL is told to
+    # avoid sequential scans: the test is about the index being usable.
+
+    def _plan(self, qs):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return qs.explain()
+
+    def test_attendance_month_range_uses_date_index(self):
+        qs = WorkerAttendance.objects.filter(
+            date__gte=date(2026, 3, 1), date__lt=date(2026, 4, 1)
+        ).order_by("-date", "-id")
+        self.assertIn("ops_att_date_id_idx", self._plan(qs))
+
+    def test_payroll_period_lookup_uses_worker_period_index(self):
+        qs = WorkerPayrollEntry.objects.filter(
+            worker_id=1,
+            year=2026,
+            month=3,
+            kind=WorkerPayrollEntry.KIND_SALARY,
+            source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
+        )
+        self.assertIn("ops_pay_worker_period_idx", self._plan(qs))
+
+
+def _attendance(worker, day, status=WorkerAttendance.STATUS_PRESENT, **kwargs):
+    kwargs.setdefault("state", WorkerAttendance.STATE_APPROVED)
+    return WorkerAttendance.objects.create(
+        worker=worker, date=day, status=status, **kwargs
+    )
+
+
+def _salary_entry(worker, year, month, **kwargs):
+    return WorkerPayrollEntry.objects.create(
+        worker=worker,
+        year=year,
+        month=month,
+        kind=WorkerPayrollEntry.KIND_SALARY,
+        source=WorkerPayrollEntry.SOURCE_AUTO_ATTENDANCE,
+        **kwargs,
+    )
+
+
+class PayrollGenerateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.new = Worker.objects.create(name="New", daily_cost=Decimal("100"))
+        cls.old = Worker.objects.create(name="Old", daily_cost=Decimal("50"))
+        _attendance(cls.new, date(2026, 1, 5))
+        _attendance(cls.new, date(2026, 1, 6), WorkerAttendance.STATUS_HALF_DAY)
+        # Draft attendance does not count.
+        _attendance(cls.new, date(2026, 1, 7), state=WorkerAttendance.STATE_DRAFT)
+        _attendance(cls.new, date(2026, 2, 2))
+        _attendance(cls.old, date(2026, 1, 5))
+        _attendance(cls.old, date(2026, 2, 2))
+        _attendance(cls.old, date(2026, 2, 3))
+        cls.approved = _salary_entry(
+            cls.old,
+            2026,
+            1,
+            amount=Decimal("1"),
+            status=WorkerPayrollEntry.STATUS_APPROVED,
+        )
+        cls.draft = _salary_entry(cls.old, 2026, 2, amount=Decimal("1"))
+
+    def _generate(self, dry_run=False):
+        return payroll.generate_periods(
+            [self.new, self.old], periods=[(2026, 1), (2026, 2)], dry_run=dry_run
+        )
+
+    def _amounts(self):
+        return {
+            (e.worker_id, e.month): e.amount
+            for e in WorkerPayrollEntry.objects.filter(year=2026)
+        }
+
+    def test_creates_updates_and_skips_across_months(self):
+        result = self._generate()
+        self.assertEqual(
+            (result["createdCount"], result["updatedCount"], result["skippedCount"]),
+            (2, 1, 1),
+        )
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(
+            self._amounts(),
+            {
+                (self.new.id, 1): Decimal("150.00"),
+                (self.new.id, 2): Decimal("100.00"),
+                # Left draft: untouched.
+                (self.old.id, 1): Decimal("1.00"),
+                (self.old.id, 2): Decimal("100.00"),
+            },
+        )
+        statuses = {
+            (r["workerId"], r["month"]): r["status"] for r in result["results"]
+        }
+        self.assertEqual(
+            statuses,
+            {
+                (self.new.id, 1): "created",
+                (self.new.id, 2): "created",
+                (self.old.id, 1): "skipped",
+                (self.old.id, 2): "updated",
+            },
+        )
+        created = WorkerPayrollEntry.objects.get(worker=self.new, month=1)
+        self.assertIn(created.id, {r["entryId"] for r in result["results"]})
+
+    def test_second_run_updates_in_place(self):
+        self._generate()
+        result = self._generate()
+        self.assertEqual(
+            (result["createdCount"], result["updatedCount"], result["skippedCount"]),
+            (0, 3, 1),
+        )
+        self.assertEqual(WorkerPayrollEntry.objects.count(), 4)
+
+    def test_dry_run_writes_nothing(self):
+        before = self._amounts()
+        result = self._generate(dry_run=True)
+        self.assertEqual(self._amounts(), before)
+        self.assertEqual(
+            sorted(r["status"] for r in result["results"]),
+            ["skipped", "would_create", "would_create", "would_update"],
+        )
+
+    def test_clears_dirty_marks_of_recomputed_periods_only(self):
+        earlier = timezone.now() - timedelta(minutes=5)
+        later = timezone.now() + timedelta(minutes=5)
+        marks = {
+            "recomputed": (self.new, 1, earlier),
+            "skipped": (self.old, 1, earlier),
+            "other_period": (self.new, 3, earlier),
+            # Marked after the run started: a change the run may have missed.
+            "newer": (self.old, 2, later),
+        }
+        for worker, month, marked_at in marks.values():
+            WorkerPayrollDirtyPeriod.objects.create(
+                worker=worker, year=2026, month=month, marked_at=marked_at
+            )
+        self._generate()
+        left = set(
+            WorkerPayrollDirtyPeriod.objects.values_list("worker_id", "month")
+        )
+        self.assertEqual(
+            left, {(self.old.id, 1), (self.new.id, 3), (self.old.id, 2)}
+        )
+
+    def test_generate_dirty_recomputes_marked_periods(self):
+        WorkerPayrollDirtyPeriod.objects.create(
+            worker=self.new, year=2026, month=2, marked_at=timezone.now()
+        )
+        result = payroll.generate_dirty(dry_run=False)
+        self.assertEqual(result["dirtyCount"], 1)
+        self.assertEqual(result["createdCount"], 1)
+        self.assertEqual(
+            set(WorkerPayrollEntry.objects.values_list("worker_id", "month")),
+            {(self.new.id, 2), (self.old.id, 1), (self.old.id, 2)},
+        )
+        self.assertFalse(WorkerPayrollDirtyPeriod.objects.exists())
+
+
+class AttendanceGridTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Worker.objects.create(name="First")
+        cls.second = Worker.objects.create(name="Second")
+
+    def _upsert(self, cells, dry_run=False):
+        return attendance.upsert_grid(
+            cells, defaults={"date": "2026-03-02"}, dry_run=dry_run
+        )
+
+    def test_any_locked_cell_rejects_the_whole_grid(self):
+        locked = _attendance(
+            self.first, date(2026, 3, 2), state=WorkerAttendance.STATE_LOCKED
+        )
+        result = self._upsert(
+            [
+                {"workerId": self.second.id, "status": "present"},
+                {"workerId": self.first.id, "status": "absent"},
+            ]
+        )
+        self.assertEqual(
+            result["errors"],
+            [{"index": 1, "error": "attendance_locked", "id": locked.id}],
+        )
+        self.assertFalse(WorkerAttendance.objects.filter(worker=self.second).exists())
+        locked.refresh_from_db()
+        self.assertEqual(locked.status, WorkerAttendance.STATUS_PRESENT)
+
+    def test_duplicate_cells_are_rejected(self):
+        result = self._upsert(
+            [
+                {"workerId": self.first.id},
+                {"workerId": self.second.id},
+                {"workerId": self.first.id, "date": "2026-03-02"},
+            ]
+        )
+        self.assertEqual(
+            result["errors"],
+            [{"index": 2, "error": "duplicate_cell", "duplicateOf": 0}],
+        )
+        self.assertFalse(WorkerAttendance.objects.exists())
+
+    def test_creates_updates_and_reports_unchanged(self):
+        cells = [
+            {"workerId": self.first.id, "hours": "8"},
+            {"workerId": self.second.id, "status": "absent"},
+        ]
+        result = self._upsert(cells)
+        self.assertEqual(result["errors"], [])
+        self.assertEqual(result["createdCount"], 2)
+        self.assertEqual(WorkerAttendance.objects.count(), 2)
+
+        cells[1]["status"] = "leave"
+        result = self._upsert(cells)
+        self.assertEqual(
+            (result["createdCount"], result["updatedCount"], result["unchangedCount"]),
+            (0, 1, 1),
+        )
+        self.assertEqual(
+            [r["status"] for r in result["results"]], ["unchanged", "updated"]
+        )
+        self.assertEqual(
+            WorkerAttendance.objects.get(worker=self.second).status,
+            WorkerAttendance.STATUS_LEAVE,
+        )
+
+    def test_dry_run_writes_nothing(self):
+        result = self._upsert([{"workerId": self.first.id}], dry_run=True)
+        self.assertEqual(result["createdCount"], 1)
+        self.assertFalse(WorkerAttendance.objects.exists())
+
+
+class PayrollCloseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = Worker.objects.create(name="Worker", daily_cost=Decimal("80"))
+        cls.other = Worker.objects.create(name="Other", daily_cost=Decimal("60"))
+        _attendance(cls.worker, date(2026, 5, 4))
+        _attendance(cls.other, date(2026, 5, 4))
+        # An existing draft salary, a manual draft bonus and an approved
+        # advance of the same period.
+        _salary_entry(cls.other, 2026, 5, amount=Decimal("1"))
+        WorkerPayrollEntry.objects.create(
+            worker=cls.other,
+            year=2026,
+            month=5,
+            kind=WorkerPayrollEntry.KIND_BONUS,
+            amount=Decimal("10"),
+        )
+        WorkerPayrollEntry.objects.create(
+            worker=cls.worker,
+            year=2026,
+            month=5,
+            kind=WorkerPayrollEntry.KIND_ADVANCE,
+            amount=Decimal("5"),
+            status=WorkerPayrollEntry.STATUS_APPROVED,
+        )
+
+    def _close(self, dry_run):
+        return payroll.close_period(
+            2026,
+            5,
+            user=None,
+            mark_paid=True,
+            allow_pending=False,
+            dry_run=dry_run,
+        )
+
+    def test_dry_run_reports_what_the_close_does(self):
+        preview = self._close(dry_run=True)
+        self.assertEqual(
+            WorkerAttendance.objects.filter(
+                state=WorkerAttendance.STATE_APPROVED
+            ).count(),
+            2,
+        )
+        self.assertFalse(
+            WorkerPayrollEntry.objects.filter(
+                worker=self.worker, kind=WorkerPayrollEntry.KIND_SALARY
+            ).exists()
+        )
+        closed = self._close(dry_run=False)
+        self.assertFalse(closed["blocked"])
+        self.assertEqual(preview["attendance"], closed["attendance"])
+        self.assertEqual(preview["generation"], closed["generation"])
+        self.assertEqual(preview["entries"], closed["entries"])
+        self.assertEqual(closed["generation"]["createdCount"], 1)
+        self.assertEqual(closed["entries"], {"approvedCount": 3, "paidCount": 4})
+        self.assertEqual(
+            set(WorkerPayrollEntry.objects.values_list("status", flat=True)),
+            {WorkerPayrollEntry.STATUS_PAID},
+        )
+
+    def test_pending_attendance_blocks_the_close(self):
+        _attendance(self.worker, date(2026, 5, 5), state=WorkerAttendance.STATE_REVIEW)
+        for dry_run in (True, False):
+            result = self._close(dry_run=dry_run)
+            self.assertTrue(result["blocked"])
+            self.assertEqual(result["attendance"]["pendingCount"], 1)
+        self.assertFalse(
+            WorkerPayrollEntry.objects.filter(
+                status=WorkerPayrollEntry.STATUS_PAID
+            ).exists()
+        )
+
+
+@override_settings(OPS_ANALYTICS_REFRESH_SECONDS=0)
+class AnalyticsPivotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser(
+            "admin", "admin@example.com", "x"
+        )
+        ali = Worker.objects.create(name="Ali", daily_cost=Decimal("80"))
+        sami = Worker.objects.create(name="Sami", daily_cost=Decimal("60"))
+        for offset in range(6):
+            day = date(2026, 4, 27) + timedelta(days=offset)
+            _attendance(ali, day, hours=Decimal("8") - offset)
+            if offset % 2:
+                _attendance(sami, day, status=WorkerAttendance.STATUS_ABSENT)
+
+    def setUp(self):
+        # Cubes live for the process; drop snapshots of other tests' rows.
+        analytics._cubes.clear()
+        self.addCleanup(analytics._cubes.clear)
+
+    def _pivot(self, body):
+        self.client.force_login(self.user)
+        return self.client.post(
+            "/api/admin/ops/analytics/pivot",
+            data=json.dumps({"dataset": "attendance", **body}),
+            content_type="application/json",
+        )
+
+    def test_engines_agree(self):
+        if analytics._numpy() is None:
+            self.skipTest("numpy is not installed")
+        query = {
+            "group_by": ["worker", "month"],
+            "measures": [
+                "count",
+                "sum:hours",
+                "avg:hours",
+                "min:hours",
+                "max:hours",
+            ],
+            "filters": {"status": ["present", "absent"]},
+        }
+        results = {}
+        for name in ("numpy", "python"):
+            with override_settings(OPS_ANALYTICS_ENGINE=name):
+                results[name] = analytics.pivot("attendance", **query)
+        self.assertEqual(results["numpy"]["engine"], "numpy")
+        self.assertEqual(results["numpy"]["rows"], results["python"]["rows"])
+        self.assertEqual(results["python"]["rowCount"], 4)
+
+    def test_bad_filters_are_rejected(self):
+        for filters in (
+            {"worker": [[1]]},
+            {"worker": {"id": 1}},
+            {"state": True},
+            {"date": {"from": ["2026-05-01"]}},
+        ):
+            with self.subTest(filters=filters):
+                response = self._pivot({"filters": filters})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    response.json()["error"]["code"], "invalid_filter"
+                )
+        response = self._pivot({"filters": {"worker": "999"}})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,751 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Iterator
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from website import attendance
+from website import punch_log
+from website.models import OpsTimeclockImportedFile
+from website.models import OpsTimeclockImportRun
+from website.models import ProjectPage
+from website.models import Worker
+from website.models import WorkerAttendance
+
+
+logger = logging.getLogger(__name__)
+
+IMPORT_NOTE = "Imported from time clock"
+WRITE_BATCH_SIZE = 500
+STREAM_CHUNK_SIZE = 500
+STREAM_READ_SIZE = 1 << 16
+# A "running" run whose last chunk is older than this is presumed dead
+# (its worker was killed) and may be resumed.
+RESUME_STALE_SECONDS = 120
+KEEP_ROWS = 200
+# JSON item exports, or raw punch logs that are paired on import.
+IMPORT_SUFFIXES = {".json"} | punch_log.PUNCH_SUFFIXES
+ALLOWED_STATUSES = {
+    WorkerAttendance.STATUS_PRESENT,
+    WorkerAttendance.STATUS_ABSENT,
+    WorkerAttendance.STATUS_HALF_DAY,
+    WorkerAttendance.STATUS_LEAVE,
+}
+
+_USE_DEFAULT_PROJECT = -1
+
+
+@dataclass
+class ParsedItem:
+    index: int
+    worker_id: int
+    time_clock_id: str
+    date: date | None
+    date_error: str
+    project_id: int
+    error: str
+    hours: Decimal | None
+    status: str
+    notes: str
+    source_error: str = ""
+    source_line: int = 0
+
+
+def _int(raw: Any) -> int:
+    try:
+        return int(raw or 0) or 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _decimal(raw: Any) -> Decimal | None:
+    if raw in {"", None}:
+        return None
+    try:
+        return Decimal(str(raw))
+    except Exception:
+        return None
+
+
+def _parse_hours(raw: dict[str, Any]) -> tuple[Decimal | None, str]:
+    if raw.get("hours") is not None:
+        return _decimal(raw.get("hours")), ""
+    check_in = str(raw.get("checkIn") or "").strip()
+    check_out = str(raw.get("checkOut") or "").strip()
+    if check_in and check_out:
+        try:
+            t1 = datetime.strptime(check_in, "%H:%M")
+            t2 = datetime.strptime(check_out, "%H:%M")
+        except Exception:
+            return None, "invalid_time_range"
+        minutes = int((t2 - t1).total_seconds() // 60)
+        if minutes < 0:
+            minutes += 24 * 60
+        return _decimal(round(minutes / 60, 2)), ""
+    check_in_at = str(raw.get("checkInAt") or "").strip()
+    check_out_at = str(raw.get("checkOutAt") or "").strip()
+    if check_in_at and check_out_at:
+        try:
+            t1 = datetime.fromisoformat(check_in_at.replace("Z", "+00:00"))
+            t2 = datetime.fromisoformat(check_out_at.replace("Z", "+00:00"))
+            minutes = int((t2 - t1).total_seconds() // 60)
+        except Exception:
+            return None, "invalid_time_range"
+        if minutes < 0:
+            return None, "invalid_time_range"
+        return _decimal(round(minutes / 60, 2)), ""
+    return None, ""
+
+
+def parse_item(index: int, raw: Any) -> ParsedItem | None:
+    """
+    Validate one raw item without touching the database. Returns None for
+    items that are not objects at all.
+    """
+    if not isinstance(raw, dict):
+        return None
+
+    att_date = None
+    date_error = ""
+    try:
+        val = str(raw.get("date") or "").strip()
+        att_date = date.fromisoformat(val) if val else None
+        if att_date is None:
+            date_error = "missing_date"
+    except Exception:
+        date_error = "invalid_date"
+
+    project_id = _USE_DEFAULT_PROJECT
+    if raw.get("projectId") is not None:
+        project_id = _int(raw.get("projectId"))
+
+    hours, error = _parse_hours(raw)
+    status = str(raw.get("status") or "").strip()
+    if not error:
+        if not status and hours is None:
+            error = "missing_status_or_time"
+        elif not status:
+            status = (
+                WorkerAttendance.STATUS_PRESENT
+                if (hours is not None and hours > 0)
+                else WorkerAttendance.STATUS_ABSENT
+            )
+        if not error and status not in ALLOWED_STATUSES:
+            error = "invalid_status"
+
+    return ParsedItem(
+        index=index,
+        worker_id=_int(raw.get("workerId")),
+        time_clock_id=str(raw.get("timeClockId") or "").strip(),
+        date=att_date,
+        date_error=date_error,
+        project_id=project_id,
+        error=error,
+        hours=hours,
+        status=status,
+        notes=str(raw.get("notes") or "").strip(),
+        source_error=str(raw.get("sourceError") or ""),
+        source_line=_int(raw.get("sourceLine")),
+    )
+
+
+def _resolve_workers(parsed: list[ParsedItem]) -> tuple[dict[int, Worker], dict[str, Worker]]:
+    ids = {p.worker_id for p in parsed if p.worker_id}
+    clock_ids = {p.time_clock_id for p in parsed if not p.worker_id and p.time_clock_id}
+    by_id = Worker.objects.only("id", "name", "time_clock_id").in_bulk(ids) if ids else {}
+    by_clock: dict[str, Worker] = {}
+    if clock_ids:
+        for w in Worker.objects.only("id", "name", "time_clock_id").filter(time_clock_id__in=clock_ids):
+            by_clock[str(w.time_clock_id)] = w
+    return by_id, by_clock
+
+
+def _resolve_projects(parsed: list[ParsedItem]) -> set[int]:
+    ids = {p.project_id for p in parsed if p.project_id > 0}
+    if not ids:
+        return set()
+    return set(ProjectPage.objects.filter(pk__in=ids).values_list("pk", flat=True))
+
+
+def _load_existing(
+    pairs: set[tuple[int, date]], *, for_update: bool
+) -> dict[tuple[int, date], WorkerAttendance]:
+    if not pairs:
+        return {}
+    qs = WorkerAttendance.objects.filter(
+        worker_id__in={w for w, _ in pairs},
+        date__in={d for _, d in pairs},
+    )
+    if for_update:
+        qs = qs.select_for_update()
+    return {(a.worker_id, a.date): a for a in qs if (a.worker_id, a.date) in pairs}
+
+
+def process_items(
+    items: list[Any],
+    *,
+    dry_run: bool,
+    default_project: Any,
+    index_offset: int = 0,
+) -> tuple[int, int, list[dict[str, Any]], list[dict[str, Any]]]:
+    """
+    Import time clock items into WorkerAttendance.
+
+    Runs as a fixed number of queries regardless of the item count: workers
+    by id and by time clock id, projects, existing attendance for the whole
+    (worker, date) set, then chunked bulk_create / bulk_update. Returns
+    ``(created_count, updated_count, errors, results)``; each item yields at
+    most one error, checked in the same order as the per-item import did.
+    """
+    parsed: list[ParsedItem] = []
+    errors: list[dict[str, Any]] = []
+    invalid: set[int] = set()
+    for offset, raw in enumerate(items):
+        item = parse_item(index_offset + offset, raw)
+        if item is None:
+            invalid.add(index_offset + offset)
+        else:
+            parsed.append(item)
+
+    by_id, by_clock = _resolve_workers(parsed)
+    known_projects = _resolve_projects(parsed)
+
+    def worker_for(p: ParsedItem) -> Worker | None:
+        if p.worker_id:
+            return by_id.get(p.worker_id)
+        if p.time_clock_id:
+            return by_clock.get(p.time_clock_id)
+        return None
+
+    pairs: set[tuple[int, date]] = set()
+    for p in parsed:
+        w = worker_for(p)
+        if w is not None and p.date is not None:
+            pairs.add((w.id, p.date))
+
+    default_project_id = getattr(default_project, "pk", None)
+
+    with transaction.atomic():
+        rows = _load_existing(pairs, for_update=not dry_run)
+        to_create: dict[tuple[int, date], WorkerAttendance] = {}
+        to_update: dict[tuple[int, date], WorkerAttendance] = {}
+        pending_results: list[tuple[dict[str, Any], WorkerAttendance]] = []
+        created_count = 0
+        updated_count = 0
+        results: list[dict[str, Any]] = []
+
+        parsed_by_index = {p.index: p for p in parsed}
+        for index in range(index_offset, index_offset + len(items)):
+            if index in invalid:
+                errors.append({"index": index, "error": "invalid_item"})
+                continue
+            p = parsed_by_index[index]
+            if p.source_error:
+                # Rows the punch log parser could not read.
+                errors.append({"index": index, "error": p.source_error, "line": p.source_line})
+                continue
+            w = worker_for(p)
+            if w is None:
+                errors.append(
+                    {
+                        "index": index,
+                        "error": "worker_not_found",
+                        "workerId": p.worker_id or None,
+                        "timeClockId": p.time_clock_id or None,
+                    }
+                )
+                continue
+            if p.date_error or p.date is None:
+                errors.append({"index": index, "error": p.date_error or "missing_date"})
+                continue
+            if p.project_id > 0 and p.project_id not in known_projects:
+                errors.append({"index": index, "error": "project_not_found", "projectId": p.project_id})
+                continue
+            if p.error:
+                errors.append({"index": index, "error": p.error})
+                continue
+
+            key = (w.id, p.date)
+            row = rows.get(key)
+            if row is not None and getattr(row, "state", "") == WorkerAttendance.STATE_LOCKED:
+                errors.append({"index": index, "error": "attendance_locked", "id": row.id})
+                continue
+            created = row is None
+            if row is None:
+                row = WorkerAttendance(worker_id=w.id, date=p.date)
+                rows[key] = row
+                to_create[key] = row
+                created_count += 1
+            else:
+                updated_count += 1
+                if key not in to_create:
+                    to_update[key] = row
+
+            row.status = p.status
+            row.hours = p.hours
+            if p.project_id == _USE_DEFAULT_PROJECT:
+                row.project_id = default_project_id
+            else:
+                row.project_id = p.project_id or None
+            if p.notes:
+                row.notes = p.notes
+            elif not row.notes:
+                row.notes = IMPORT_NOTE
+
+            result = {
+                "index": index,
+                "id": row.id,
+                "workerId": w.id,
+                "workerName": w.name,
+                "date": p.date.isoformat(),
+                "created": created,
+            }
+            if dry_run:
+                result["dryRun"] = True
+            else:
+                pending_results.append((result, row))
+            results.append(result)
+
+        if not dry_run:
+            if to_create:
+                WorkerAttendance.objects.bulk_create(
+                    list(to_create.values()), batch_size=WRITE_BATCH_SIZE
+                )
+            if to_update:
+                now = timezone.now()
+                for row in to_update.values():
+                    row.updated_at = now
+                WorkerAttendance.objects.bulk_update(
+                    list(to_update.values()),
+                    ["status", "hours", "project", "notes", "updated_at"],
+                    batch_size=WRITE_BATCH_SIZE,
+                )
+            for result, row in pending_results:
+                result["id"] = row.id
+            # Bulk writes send no model signals.
+            attendance.changed(
+                (row.worker_id, row.date) for row in [*to_create.values(), *to_update.values()]
+            )
+
+    return created_count, updated_count, errors, results
+
+
+# Folder import
+
+
+def folder_dir() -> Path:
+    dir_raw = str(os.environ.get("TIME_CLOCK_IMPORT_DIR") or "").strip()
+    if not dir_raw:
+        raise StreamError("timeclock_import_dir_not_set")
+    base_dir = Path(dir_raw)
+    if not base_dir.is_dir():
+        raise StreamError("timeclock_import_dir_not_found")
+    return base_dir
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(STREAM_READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_folder_files(
+    base_dir: Path,
+    limit: int,
+    *,
+    skip_imported: bool = True,
+    min_age: float = 0.0,
+) -> list[Path]:
+    """
+    Return up to ``limit`` export files, oldest first. With
+    ``skip_imported`` files whose content was already imported are left
+    out; ``min_age`` skips files modified in the last N seconds (still
+    being written).
+    """
+    stats = []
+    for p in base_dir.iterdir():
+        if p.suffix.lower() not in IMPORT_SUFFIXES or p.name.startswith("."):
+            continue
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        if p.is_file() and time.time() - st.st_mtime >= min_age:
+            stats.append((p, st))
+    stats.sort(key=lambda item: item[1].st_mtime_ns)
+    if not skip_imported:
+        return [p for p, _st in stats[:limit]]
+
+    known = {
+        f.name: f for f in OpsTimeclockImportedFile.objects.filter(name__in=[p.name for p, _st in stats])
+    }
+    selected: list[Path] = []
+    for p, st in stats:
+        if len(selected) >= limit:
+            break
+        record = known.get(p.name)
+        # Unchanged size and mtime: trust the recorded hash without re-reading.
+        if record and record.size == st.st_size and record.mtime_ns == st.st_mtime_ns:
+            continue
+        try:
+            sha = file_sha256(p)
+        except OSError:
+            continue
+        if (record and record.sha256 == sha) or OpsTimeclockImportedFile.objects.filter(sha256=sha).exists():
+            # Touched or copied under a new name, same content.
+            OpsTimeclockImportedFile.objects.update_or_create(
+                name=p.name,
+                defaults={"sha256": sha, "size": st.st_size, "mtime_ns": st.st_mtime_ns},
+            )
+            continue
+        selected.append(p)
+    return selected
+
+
+def record_imported_file(
+    path: Path,
+    *,
+    run: OpsTimeclockImportRun | None,
+    items_count: int,
+    error: str = "",
+    sha256: str = "",
+) -> None:
+    try:
+        st = path.stat()
+        sha256 = sha256 or file_sha256(path)
+    except OSError:
+        return
+    OpsTimeclockImportedFile.objects.update_or_create(
+        name=path.name,
+        defaults={
+            "sha256": sha256,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "items_count": items_count,
+            "error": error,
+            "run": run,
+        },
+    )
+
+
+class StreamError(ValueError):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.code = code
+
+
+class _JsonReader:
+    def __init__(self, fh: Any):
+        self.fh = fh
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.fh.read(STREAM_READ_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise StreamError("invalid_json")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                obj, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise StreamError("invalid_json") from None
+            # A value ending exactly at the buffer edge may be truncated
+            # (e.g. a number); read on before trusting it.
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+
+def iter_file_items(path: Path) -> Iterator[Any]:
+    """
+    Yield the items of a time clock export one by one, holding only one
+    read buffer in memory. Accepts a top-level list or {"items": [...]};
+    raw punch logs are paired into items first.
+    """
+    if path.suffix.lower() in punch_log.PUNCH_SUFFIXES:
+        yield from punch_log.items_from_file(path)
+        return
+    with path.open(encoding="utf-8-sig") as fh:
+        reader = _JsonReader(fh)
+        first = reader.peek()
+        if first == "{":
+            reader.take("{")
+            while True:
+                if reader.peek() == "}":
+                    raise StreamError("missing_items")
+                key = reader.value()
+                reader.take(":")
+                if key == "items" and reader.peek() == "[":
+                    break
+                reader.value()
+                if reader.peek() == ",":
+                    reader.take(",")
+        elif first != "[":
+            raise StreamError("invalid_json")
+        reader.take("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.value()
+            ch = reader.peek()
+            if ch == "]":
+                return
+            reader.take(",")
+
+
+def _fingerprint(path: Path) -> dict[str, int]:
+    st = path.stat()
+    return {"size": st.st_size, "mtimeNs": st.st_mtime_ns}
+
+
+def start_stream_run(
+    paths: list[Path],
+    *,
+    actor: Any,
+    role: str,
+    source: str,
+    dry_run: bool,
+    default_project: Any,
+    chunk_size: int,
+) -> OpsTimeclockImportRun:
+    return OpsTimeclockImportRun.objects.create(
+        actor=actor,
+        role=role,
+        source=source,
+        dry_run=dry_run,
+        default_project=default_project,
+        status=OpsTimeclockImportRun.STATUS_RUNNING,
+        chunk_size=max(1, chunk_size),
+        errors=[],
+        results=[],
+        progress={
+            "files": [
+                {
+                    "name": p.name,
+                    "fingerprint": _fingerprint(p),
+                    "sha256": file_sha256(p),
+                    "itemsDone": 0,
+                    "done": False,
+                }
+                for p in paths
+            ]
+        },
+    )
+
+
+def claim_for_resume(run_id: int) -> OpsTimeclockImportRun | None:
+    """
+    Atomically take over a failed or abandoned streaming run. Returns None
+    when the run is finished, unknown, or still owned by a live worker.
+    """
+    stale = timezone.now() - timedelta(seconds=RESUME_STALE_SECONDS)
+    claimed = (
+        OpsTimeclockImportRun.objects.filter(pk=run_id, progress__isnull=False)
+        .filter(
+            Q(status=OpsTimeclockImportRun.STATUS_FAILED)
+            | Q(status=OpsTimeclockImportRun.STATUS_RUNNING, updated_at__lt=stale)
+        )
+        .update(status=OpsTimeclockImportRun.STATUS_RUNNING, updated_at=timezone.now(), last_error="")
+    )
+    if not claimed:
+        return None
+    return OpsTimeclockImportRun.objects.select_related("default_project").get(pk=run_id)
+
+
+_PROGRESS_FIELDS = [
+    "items_count",
+    "processed_count",
+    "created_count",
+    "updated_count",
+    "error_count",
+    "errors",
+    "results",
+    "progress",
+    "status",
+    "last_error",
+    "finished_at",
+    "updated_at",
+]
+
+
+def _add_errors(run: OpsTimeclockImportRun, errors: list[dict[str, Any]]) -> None:
+    run.error_count += len(errors)
+    run.errors = (list(run.errors or []) + errors)[:KEEP_ROWS]
+
+
+def _commit_chunk(run: OpsTimeclockImportRun, entry: dict[str, Any], chunk: list[Any]) -> None:
+    # The chunk and the progress that records it commit together, so a
+    # resumed run never re-applies or skips a chunk. The new progress is
+    # written from locals and only copied onto ``run`` / ``entry`` once the
+    # transaction has committed: the failure path in run_stream saves
+    # ``run``, and must not persist progress for a chunk that rolled back.
+    with transaction.atomic():
+        created, updated, errors, results = process_items(
+            chunk,
+            dry_run=run.dry_run,
+            default_project=run.default_project,
+            index_offset=run.processed_count,
+        )
+        items_done = int(entry.get("itemsDone") or 0) + len(chunk)
+        progress = dict(run.progress or {})
+        progress["files"] = [
+            {**f, "itemsDone": items_done} if f is entry else f for f in progress.get("files", [])
+        ]
+        fields = {
+            "processed_count": run.processed_count + len(chunk),
+            "items_count": run.processed_count + len(chunk),
+            "created_count": run.created_count + created,
+            "updated_count": run.updated_count + updated,
+            "error_count": run.error_count + len(errors),
+            "errors": (list(run.errors or []) + errors)[:KEEP_ROWS],
+            "results": (list(run.results or []) + results)[:KEEP_ROWS],
+            "progress": progress,
+            "updated_at": timezone.now(),
+        }
+        OpsTimeclockImportRun.objects.filter(pk=run.pk).update(**fields)
+    for name, value in fields.items():
+        if name != "progress":
+            setattr(run, name, value)
+    entry["itemsDone"] = items_done
+
+
+class _Stopped(Exception):
+    pass
+
+
+def run_stream(
+    run: OpsTimeclockImportRun,
+    base_dir: Path,
+    *,
+    should_stop: Callable[[], bool] | None = None,
+) -> OpsTimeclockImportRun:
+    """
+    Import (or resume) a streaming run file by file, committing every
+    ``run.chunk_size`` items. ``should_stop`` is polled after each chunk;
+    a stopped run is left failed so it can be resumed later.
+    """
+    chunk_size = run.chunk_size or STREAM_CHUNK_SIZE
+
+    def checkpoint() -> None:
+        if should_stop is not None and should_stop():
+            raise _Stopped()
+
+    try:
+        for entry in (run.progress or {}).get("files", []):
+            if entry.get("done"):
+                continue
+            checkpoint()
+            path = base_dir / str(entry.get("name") or "")
+            skip = int(entry.get("itemsDone") or 0)
+            error = ""
+            if not path.is_file():
+                error = "file_not_found"
+            elif _fingerprint(path) != entry.get("fingerprint"):
+                error = "file_changed"
+            else:
+                chunk: list[Any] = []
+                seen = 0
+                try:
+                    for raw in iter_file_items(path):
+                        seen += 1
+                        if seen <= skip:
+                            continue
+                        if isinstance(raw, dict) and raw.get("sourceFile") is None:
+                            raw = {**raw, "sourceFile": path.name}
+                        chunk.append(raw)
+                        if len(chunk) >= chunk_size:
+                            _commit_chunk(run, entry, chunk)
+                            chunk = []
+                            checkpoint()
+                except StreamError as exc:
+                    error = exc.code
+                if chunk:
+                    _commit_chunk(run, entry, chunk)
+                if not error and seen == 0:
+                    error = "missing_items"
+            if error:
+                _add_errors(run, [{"file": path.name, "error": error}])
+            entry["done"] = True
+            with transaction.atomic():
+                run.save(update_fields=_PROGRESS_FIELDS)
+                if not run.dry_run and error not in {"file_not_found", "file_changed"}:
+                    record_imported_file(
+                        path,
+                        run=run,
+                        items_count=int(entry.get("itemsDone") or 0),
+                        error=error,
+                        sha256=str(entry.get("sha256") or ""),
+                    )
+        run.status = OpsTimeclockImportRun.STATUS_COMPLETED
+        run.finished_at = timezone.now()
+        run.save(update_fields=_PROGRESS_FIELDS)
+    except _Stopped:
+        run.status = OpsTimeclockImportRun.STATUS_FAILED
+        run.last_error = "cancelled"
+        run.save(update_fields=_PROGRESS_FIELDS)
+    except Exception as exc:
+        logger.exception("Time clock import run %s failed", run.pk)
+        run.status = OpsTimeclockImportRun.STATUS_FAILED
+        run.last_error = str(exc)[:1000]
+        run.save(update_fields=_PROGRESS_FIELDS)
+    return run
+
+
+def run_summary(run: OpsTimeclockImportRun) -> dict[str, Any]:
+    return {
+        "runId": run.id,
+        "status": run.status,
+        "dryRun": bool(run.dry_run),
+        "files": [str(f.get("name") or "") for f in (run.progress or {}).get("files", [])],
+        "chunkSize": int(run.chunk_size or 0),
+        "processedCount": int(run.processed_count or 0),
+        "createdCount": int(run.created_count or 0),
+        "updatedCount": int(run.updated_count or 0),
+        "errorCount": int(run.error_count or 0),
+        "lastError": run.last_error,
+    }